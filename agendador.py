@@ -0,0 +1,330 @@
+"""
+Agendador de prospectos pendentes.
+
+Monta a fila de trabalho a partir da tabela `prospectos` do banco Django,
+ordenando por prioridade, score de conversão, tentativas já gastas e idade.
+Para evitar que leads de prioridade baixa fiquem parados para sempre, a
+prioridade efetiva sobe um nível a cada HORAS_POR_NIVEL horas de espera.
+
+A seleção lê só duas janelas pequenas, ambas servidas por índices parciais:
+os K melhores pela ordenação base e os K mais antigos (onde estão os leads
+envelhecidos). O ranking final com envelhecimento é feito em Python sobre
+essas ~2K linhas, então escolher o próximo lote continua O(log n) mesmo com
+a tabela crescendo.
+
+Com a fila vazia, o agendador espera o aviso (LISTEN/NOTIFY, ver
+aviso_fila.py) de um prospecto novo em vez de consultar a cada intervalo.
+
+Uso:
+    python3 agendador.py               # roda em loop
+    python3 agendador.py --uma-vez     # processa um lote e sai
+    python3 agendador.py --abas 4      # lote dividido em 4 abas de um só Chrome (lote_abas.py)
+"""
+import os
+import argparse
+import datetime
+import logging
+from collections import namedtuple
+import psycopg2
+from main_refatorado import DB_CONFIG_DJANGO, processar_lote, infraestrutura_liberada, migrar_esquema
+from lote_abas import processar_lote_abas
+import coletor_orfaos
+import servidor_saude
+import drenagem
+from aviso_fila import AvisoFila
+from politica_retentativa import MAX_TENTATIVAS, predicado_sql
+from migracoes import FILTRO_PENDENTES
+
+logger = logging.getLogger(__name__)
+
+HORAS_POR_NIVEL = float(os.environ.get('AGENDADOR_HORAS_POR_NIVEL', '6'))
+TAMANHO_LOTE = int(os.environ.get('AGENDADOR_TAMANHO_LOTE', '10'))
+INTERVALO_POLL = int(os.environ.get('AGENDADOR_INTERVALO', '30'))  # Sem LISTEN
+INTERVALO_VARREDURA = int(os.environ.get('AGENDADOR_VARREDURA', '300'))  # Com LISTEN: só rede de segurança
+FATOR_JANELA = 4  # Candidatos lidos de cada índice = lote x fator
+MINUTOS_TRAVADO = 30  # Reservas mais antigas que isso voltam para a fila
+
+# O que pode rodar agora: além do predicado dos índices, orçamento da classe e
+# backoff da última falha (now() não cabe no predicado de um índice parcial)
+FILTRO_PRONTOS = f"{FILTRO_PENDENTES} AND {predicado_sql()}"
+
+COLUNAS = "id, id_prospecto_hubsoft, nome_prospecto, status, prioridade, score_conversao, tentativas_processamento, data_criacao"
+
+ProspectoPendente = namedtuple(
+    'ProspectoPendente',
+    'id id_prospecto_hubsoft nome_prospecto status prioridade score_conversao tentativas data_criacao'
+)
+
+
+def prioridade_efetiva(prospecto, agora):
+    """Prioridade base + um nível por HORAS_POR_NIVEL de espera (envelhecimento)."""
+    horas = max(0.0, (agora - prospecto.data_criacao).total_seconds() / 3600) if prospecto.data_criacao else 0.0
+    return (prospecto.prioridade or 0) + int(horas // HORAS_POR_NIVEL)
+
+
+def chave_ordenacao(prospecto, agora):
+    """Maior prioridade efetiva, maior score, menos tentativas, mais antigo primeiro."""
+    return (
+        -prioridade_efetiva(prospecto, agora),
+        -(prospecto.score_conversao or 0),
+        prospecto.tentativas or 0,
+        prospecto.data_criacao or agora,
+    )
+
+
+class Agendador:
+    """Seleciona e reserva lotes de prospectos pendentes no banco Django."""
+
+    def __init__(self):
+        self.conn = None
+
+    def conectar(self):
+        try:
+            self.conn = psycopg2.connect(**DB_CONFIG_DJANGO)
+            return True
+        except Exception as e:
+            logger.error(f"Agendador: erro ao conectar ao banco Django: {e}")
+            return False
+
+    def desconectar(self):
+        if self.conn:
+            try:
+                self.conn.close()
+            finally:
+                self.conn = None
+
+    def candidatos(self, quantidade):
+        """Lê as duas janelas indexadas (melhores e mais antigos) sem duplicatas."""
+        janela = quantidade * FATOR_JANELA
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT {COLUNAS} FROM prospectos
+            WHERE {FILTRO_PRONTOS}
+            ORDER BY prioridade DESC, score_conversao DESC NULLS LAST, tentativas_processamento, data_criacao
+            LIMIT %s
+        """, (janela,))
+        linhas = cursor.fetchall()
+        cursor.execute(f"""
+            SELECT {COLUNAS} FROM prospectos
+            WHERE {FILTRO_PRONTOS}
+            ORDER BY data_criacao
+            LIMIT %s
+        """, (janela,))
+        linhas += cursor.fetchall()
+        cursor.close()
+        return list({linha[0]: ProspectoPendente(*linha) for linha in linhas}.values())
+
+    def proximo_lote(self, quantidade=TAMANHO_LOTE):
+        """Próximos prospectos em ordem de execução (sem reservar)."""
+        agora = datetime.datetime.now()
+        candidatos = self.candidatos(quantidade)
+        candidatos.sort(key=lambda p: chave_ordenacao(p, agora))
+        return candidatos[:quantidade]
+
+    def reservar_lote(self, quantidade=TAMANHO_LOTE):
+        """
+        Seleciona e marca como 'processando' o próximo lote. A marcação só pega
+        linhas ainda pendentes, então dois workers nunca reservam o mesmo lead.
+        """
+        try:
+            lote = self.proximo_lote(quantidade)
+            if not lote:
+                self.conn.commit()
+                return []
+            cursor = self.conn.cursor()
+            cursor.execute(f"""
+                UPDATE prospectos SET status = 'processando', data_inicio_processamento = %s
+                WHERE id = ANY(%s) AND {FILTRO_PRONTOS}
+                RETURNING id
+            """, (datetime.datetime.now(), [p.id for p in lote]))
+            reservados = {linha[0] for linha in cursor.fetchall()}
+            self.conn.commit()
+            cursor.close()
+            return [p for p in lote if p.id in reservados]
+        except Exception as e:
+            logger.error(f"Agendador: erro ao reservar lote: {e}")
+            self.conn.rollback()
+            return []
+
+    def liberar(self, prospectos):
+        """Devolve à fila, com o status original, prospectos reservados que não rodaram."""
+        if not prospectos:
+            return
+        try:
+            cursor = self.conn.cursor()
+            for p in prospectos:
+                cursor.execute(
+                    "UPDATE prospectos SET status = %s WHERE id = %s AND status = 'processando'",
+                    (p.status, p.id)
+                )
+            self.conn.commit()
+            cursor.close()
+        except Exception as e:
+            logger.error(f"Agendador: erro ao liberar prospectos: {e}")
+            self.conn.rollback()
+
+    def marcar_esgotados(self, prospectos):
+        """Leads que o robô recusou (tentativas esgotadas no banco primário) saem da fila."""
+        if not prospectos:
+            return
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                UPDATE prospectos SET status = 'erro',
+                    tentativas_processamento = GREATEST(tentativas_processamento, %s)
+                WHERE id = ANY(%s)
+            """, (MAX_TENTATIVAS, [p.id for p in prospectos]))
+            self.conn.commit()
+            cursor.close()
+        except Exception as e:
+            logger.error(f"Agendador: erro ao marcar esgotados: {e}")
+            self.conn.rollback()
+
+    def marcar_finalizados(self, prospectos):
+        """Leads já finalizados no banco primário saem da fila como aguardando validação."""
+        if not prospectos:
+            return
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "UPDATE prospectos SET status = 'aguardando_validacao' WHERE id = ANY(%s) AND status = 'processando'",
+                ([p.id for p in prospectos],)
+            )
+            self.conn.commit()
+            cursor.close()
+        except Exception as e:
+            logger.error(f"Agendador: erro ao marcar finalizados: {e}")
+            self.conn.rollback()
+
+    def profundidade(self):
+        """Contagens da fila para o endpoint de saúde (servidor_saude.py)."""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(f"""
+                SELECT COUNT(*) FILTER (WHERE {FILTRO_PRONTOS}),
+                       COUNT(*) FILTER (WHERE {FILTRO_PENDENTES}),
+                       COUNT(*) FILTER (WHERE status = 'processando')
+                FROM prospectos
+                WHERE {FILTRO_PENDENTES} OR status = 'processando'
+            """)
+            prontos, pendentes, processando = cursor.fetchone()
+            self.conn.commit()
+            cursor.close()
+            return {'prontos': prontos, 'pendentes': pendentes, 'processando': processando}
+        except Exception as e:
+            logger.error(f"Agendador: erro ao medir a fila: {e}")
+            self.conn.rollback()
+            return {}
+
+    def segundos_ate_liberacao(self):
+        """Até o próximo backoff vencer (proxima_tentativa_em), que não gera aviso; inf se nenhum."""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(f"""
+                SELECT EXTRACT(EPOCH FROM MIN(proxima_tentativa_em) - now()) FROM prospectos
+                WHERE {FILTRO_PENDENTES} AND proxima_tentativa_em > now()
+            """)
+            segundos = cursor.fetchone()[0]
+            self.conn.commit()
+            cursor.close()
+            return float(segundos) if segundos is not None else float('inf')
+        except Exception as e:
+            logger.error(f"Agendador: erro ao consultar próximo backoff: {e}")
+            self.conn.rollback()
+            return float('inf')
+
+    def recuperar_travados(self):
+        """Reservas antigas (worker morto no meio do lote) voltam para 'aguardando'."""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                UPDATE prospectos SET status = 'aguardando'
+                WHERE status = 'processando' AND data_inicio_processamento < %s
+            """, (datetime.datetime.now() - datetime.timedelta(minutes=MINUTOS_TRAVADO),))
+            if cursor.rowcount:
+                logger.info(f"♻️ {cursor.rowcount} prospectos travados devolvidos à fila")
+            self.conn.commit()
+            cursor.close()
+        except Exception as e:
+            logger.error(f"Agendador: erro ao recuperar travados: {e}")
+            self.conn.rollback()
+
+
+def esperar_novos(agendador, aviso, intervalo):
+    """Fila vazia: dorme até um aviso de prospecto novo (ou o intervalo antigo, sem LISTEN)."""
+    if aviso.ativo or aviso.conectar():
+        aviso.esperar(min(INTERVALO_VARREDURA, agendador.segundos_ate_liberacao()))
+    else:
+        drenagem.esperar(intervalo)
+
+
+def executar_fila(tamanho_lote=TAMANHO_LOTE, intervalo=INTERVALO_POLL, uma_vez=False, abas=1):
+    """
+    Loop do robô: reserva o próximo lote por prioridade e processa numa sessão só (ou em `abas` abas).
+    No SIGTERM para de reservar, drena o lote em andamento (drenagem.py) e sai limpo.
+    """
+    drenagem.instalar()
+    # Esquema dos dois bancos (migracoes.py), antes de reservar o primeiro lote
+    migrar_esquema()
+    agendador = Agendador()
+    if not agendador.conectar():
+        logger.error("❌ Agendador: falha ao conectar ao banco Django")
+        return
+    # Chrome/perfis de workers que morreram (inclusive reinícios do systemd), agora e periodicamente
+    coletor_orfaos.iniciar_supervisor()
+    servidor_saude.iniciar()
+    aviso = AvisoFila(DB_CONFIG_DJANGO)
+
+    try:
+        while not drenagem.drenando():
+            agendador.recuperar_travados()
+            servidor_saude.atualizar_fila(**agendador.profundidade())
+            # Hubsoft/banco fora do ar (disjuntor.py): não reserva nada até a sonda passar
+            if not infraestrutura_liberada():
+                if uma_vez:
+                    break
+                drenagem.esperar(intervalo)
+                continue
+            lote = agendador.reservar_lote(tamanho_lote)
+            if lote:
+                logger.info(f"📋 Fila: {len(lote)} prospectos reservados")
+                itens = [(p.nome_prospecto, p.id_prospecto_hubsoft) for p in lote]
+                resultados = {}
+                try:
+                    resultados = processar_lote_abas(itens, abas) if abas > 1 else processar_lote(itens)
+                finally:
+                    # Não alcançados (falha de login, drenagem, prazo estourado) e ainda em backoff
+                    # voltam para a fila; recusados saem dela
+                    agendador.liberar([
+                        p for p in lote if resultados.get(str(p.id_prospecto_hubsoft), "adiado") == "adiado"
+                    ])
+                agendador.marcar_esgotados([
+                    p for p in lote if resultados.get(str(p.id_prospecto_hubsoft)) == "ignorado"
+                ])
+                agendador.marcar_finalizados([
+                    p for p in lote if resultados.get(str(p.id_prospecto_hubsoft)) == "finalizado"
+                ])
+            if uma_vez:
+                break
+            if not lote:
+                esperar_novos(agendador, aviso, intervalo)
+    finally:
+        aviso.desconectar()
+        agendador.desconectar()
+        servidor_saude.parar()
+        if drenagem.drenando():
+            logger.info("🛑 Drenagem concluída: agendador encerrado")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Processa a fila de prospectos pendentes por prioridade')
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Prospectos por sessão do navegador')
+    parser.add_argument('--intervalo', type=int, default=INTERVALO_POLL, help='Segundos entre consultas com a fila vazia (sem LISTEN/NOTIFY)')
+    parser.add_argument('--uma-vez', action='store_true', help='Processa um único lote e sai')
+    parser.add_argument('--abas', type=int, default=1, help='Prospectos simultâneos em abas de um único Chrome (backend CDP)')
+    args, _ = parser.parse_known_args()
+    try:
+        executar_fila(args.lote, args.intervalo, args.uma_vez, args.abas)
+    except KeyboardInterrupt:
+        # Prazo de drenagem estourado: os finally já fecharam Chrome e conexões
+        logger.warning("🛑 Agendador interrompido")
@@ -0,0 +1,106 @@
+"""
+Desativa as animações do Angular Material durante a automação.
+
+Boa parte das pausas entre cliques existe só para esperar md-menu,
+md-select-menu e md-dialog terminarem de abrir/fechar. Em toda carga de
+página é injetado um estilo que zera transições/animações CSS e, assim que o
+Angular sobe, um $animate.enabled(false). Com durações zeradas o
+$animateCss do Material resolve na hora, então as pausas de animação podem
+encolher (FATOR_PAUSAS_SEM_ANIMACAO). Pausas que esperam resposta do Hubsoft
+(troca de tela do wizard, SALVAR) não encolhem.
+
+verificar() confere se nada ficou preso esperando um callback de animação
+(elementos parados com classes ng-enter/ng-leave/md-leave ou animações
+ainda rodando): se acontecer, desligue com DESATIVAR_ANIMACOES=false.
+"""
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+DESATIVAR_ANIMACOES = os.environ.get('DESATIVAR_ANIMACOES', 'true').lower() != 'false'
+# Fração das pausas de animação que continua valendo com as animações desligadas
+FATOR_PAUSAS_SEM_ANIMACAO = float(os.environ.get('FATOR_PAUSAS_SEM_ANIMACAO', '0.25'))
+
+SCRIPT_SEM_ANIMACOES = r"""
+(function () {
+    if (window.__roboAnimacoes) { return; }
+    var estado = window.__roboAnimacoes = { css: false, animate: false };
+    var CSS = '*, *::before, *::after {' +
+        ' transition: none !important; transition-duration: 0s !important; transition-delay: 0s !important;' +
+        ' animation-duration: 0s !important; animation-delay: 0s !important; scroll-behavior: auto !important; }';
+
+    function estilo() {
+        var alvo = document.head || document.documentElement;
+        if (!alvo) { return false; }
+        var el = document.createElement('style');
+        el.id = 'robo-sem-animacoes';
+        el.textContent = CSS;
+        alvo.appendChild(el);
+        return estado.css = true;
+    }
+
+    // O injector só existe depois do bootstrap do app: tenta até conseguir
+    function angularSemAnimacao() {
+        try {
+            var injector = window.angular && angular.element(document.body).injector();
+            if (!injector) { return false; }
+            injector.get('$animate').enabled(false);
+            return estado.animate = true;
+        } catch (e) {
+            return false;
+        }
+    }
+
+    if (!estilo()) { document.addEventListener('DOMContentLoaded', estilo); }
+    if (!angularSemAnimacao()) {
+        var tentativas = 0;
+        var timer = setInterval(function () {
+            if (angularSemAnimacao() || ++tentativas > 300) { clearInterval(timer); }
+        }, 100);
+    }
+})();
+"""
+
+SCRIPT_VERIFICAR = r"""
+var estado = window.__roboAnimacoes || {};
+var presos = document.querySelectorAll('.ng-enter, .ng-leave, .ng-animate, .md-leave, .ng-hide-animate');
+var rodando = document.getAnimations ? document.getAnimations().filter(function (a) { return a.playState === 'running'; }) : [];
+return {
+    css: !!estado.css,
+    animate: !!estado.animate,
+    presos: Array.prototype.slice.call(presos, 0, 5).map(function (el) { return el.tagName.toLowerCase() + '.' + ((el.className || '') + '').split(' ').join('.'); }),
+    rodando: rodando.length
+};
+"""
+
+
+def desativar(driver):
+    """
+    Registra o script para toda nova página e o aplica na atual.
+    Retorna o fator a aplicar nas pausas fixas (1.0 se as animações seguem ligadas).
+    """
+    if not DESATIVAR_ANIMACOES:
+        return 1.0
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": SCRIPT_SEM_ANIMACOES})
+        driver.execute_script(SCRIPT_SEM_ANIMACOES)
+    except Exception as e:
+        logger.error(f"Não foi possível desativar as animações: {e}")
+        return 1.0
+    return FATOR_PAUSAS_SEM_ANIMACAO
+
+
+def verificar(driver):
+    """Confere que nenhum elemento ficou esperando o fim de uma animação. Retorna True se ok."""
+    if not DESATIVAR_ANIMACOES:
+        return True
+    try:
+        estado = driver.execute_script(SCRIPT_VERIFICAR) or {}
+    except Exception:
+        return True  # Página em transição: não dá para afirmar nada
+    if estado.get('presos') or estado.get('rodando'):
+        logger.error(f"Animações desativadas, mas há elementos aguardando animação: {estado}. "
+                     f"Se o wizard travar, use DESATIVAR_ANIMACOES=false")
+        return False
+    return True
@@ -0,0 +1,94 @@
+"""
+Entrada de prospectos por LISTEN/NOTIFY no lugar da espera fixa entre consultas.
+
+Com a fila vazia o agendador dormia AGENDADOR_INTERVALO segundos, e todo lead
+novo esperava em média metade disso para começar. Agora um trigger na tabela
+`prospectos` do banco Django (migração 4 em migracoes.py) avisa (NOTIFY) quando um prospecto entra como
+'aguardando', seja num INSERT ou quando alguém devolve um erro para a fila.
+O agendador escuta numa conexão própria e acorda em milissegundos.
+
+A consulta periódica continua como rede de segurança, agora lenta
+(AGENDADOR_VARREDURA). Ela cobre avisos perdidos numa reconexão, prospectos
+cujo backoff venceu e bancos onde o trigger não pôde ser criado. Sem conexão
+de escuta, vale o intervalo antigo.
+"""
+import os
+import time
+import select
+import logging
+import psycopg2
+import drenagem
+
+logger = logging.getLogger(__name__)
+
+CANAL = 'prospectos_pendentes'
+# Janela para juntar uma rajada de inserts num lote só
+AGRUPAR_S = float(os.environ.get('AVISO_AGRUPAR_S', '0.2'))
+
+
+class AvisoFila:
+    """Conexão dedicada que faz LISTEN no canal da fila."""
+
+    def __init__(self, config):
+        self.config = config
+        self.conn = None
+
+    def conectar(self):
+        try:
+            self.conn = psycopg2.connect(**self.config)
+            self.conn.autocommit = True
+            cursor = self.conn.cursor()
+            cursor.execute(f"LISTEN {CANAL}")
+            cursor.close()
+            logger.info(f"👂 Escutando novos prospectos (LISTEN {CANAL})")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ LISTEN indisponível ({e}); usando a consulta periódica")
+            self.desconectar()
+            return False
+
+    def desconectar(self):
+        if self.conn:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+            self.conn = None
+
+    @property
+    def ativo(self):
+        return self.conn is not None
+
+    def _receber(self):
+        self.conn.poll()
+        recebidos = len(self.conn.notifies)
+        self.conn.notifies.clear()
+        return recebidos
+
+    def esperar(self, timeout):
+        """
+        Dorme até um aviso, o timeout ou o pedido de drenagem. Retorna quantos
+        avisos chegaram (0 no timeout). Sem conexão, só dorme.
+        """
+        if not self.ativo:
+            drenagem.esperar(timeout)
+            return 0
+        limite = time.monotonic() + timeout
+        try:
+            recebidos = self._receber()
+            # Fatias de 1s: a drenagem também acorda o loop
+            while not recebidos and not drenagem.drenando():
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    return 0
+                if select.select([self.conn], [], [], min(1.0, restante))[0]:
+                    recebidos = self._receber()
+            if recebidos:
+                time.sleep(AGRUPAR_S)
+                recebidos += self._receber()
+            return recebidos
+        except Exception as e:
+            # Conexão caiu: reconecta na próxima espera; o que se perdeu a varredura pega
+            logger.warning(f"⚠️ Conexão de escuta perdida: {e}")
+            self.desconectar()
+            return 0
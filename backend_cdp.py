@@ -0,0 +1,599 @@
+"""
+Backend alternativo que fala o Chrome DevTools Protocol direto, sem chromedriver.
+
+No Selenium cada find_element, click, execute_script e cada poll do
+WebDriverWait (0,5s por padrão) é uma requisição HTTP ao chromedriver, que
+por sua vez fala CDP com o Chrome. Aqui a conexão é um websocket único
+(asyncio + wsproto, que já vem como dependência do Selenium):
+
+- esperas orientadas a eventos: um MutationObserver na página resolve uma
+  Promise assim que o elemento aparece/fica clicável, sem polling;
+- várias abas/contextos podem ser dirigidos pelo mesmo event loop
+  (NavegadorCDP.nova_aba), cada um com sua sessão CDP.
+
+DriverCDP expõe, de forma síncrona, o subconjunto da API do WebDriver que as
+etapas do main_refatorado.py usam (get, find_element, execute_script,
+save_screenshot, ...), então as mesmas funções de etapa rodam nos dois
+backends. Ative com BACKEND_NAVEGADOR=cdp.
+"""
+import os
+import json
+import time
+import base64
+import shutil
+import asyncio
+import logging
+import threading
+import signal
+import subprocess
+import concurrent.futures
+from urllib.parse import urlparse
+from wsproto import WSConnection, ConnectionType
+from wsproto.events import Request, AcceptConnection, RejectConnection, TextMessage, Ping, CloseConnection
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import NoSuchElementException, JavascriptException, TimeoutException, WebDriverException
+
+logger = logging.getLogger(__name__)
+
+BINARIOS_CHROME = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser')
+TIMEOUT_COMANDO = 30
+TIMEOUT_INICIO = 20
+
+# Teclas especiais do Selenium -> (key, code, keyCode, texto) do CDP
+TECLAS = {
+    Keys.ENTER: ('Enter', 'Enter', 13, '\r'),
+    Keys.RETURN: ('Enter', 'Enter', 13, '\r'),
+    Keys.TAB: ('Tab', 'Tab', 9, ''),
+    Keys.ESCAPE: ('Escape', 'Escape', 27, ''),
+    Keys.BACKSPACE: ('Backspace', 'Backspace', 8, ''),
+}
+
+# Localiza um elemento por XPath ou CSS (By.* do Selenium convertido em _seletor)
+JS_BUSCAR = """
+function __buscar(tipo, valor) {
+    if (tipo === 'xpath') {
+        return document.evaluate(valor, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    return document.querySelector(valor);
+}
+function __clicavel(el) {
+    return !!(el && (el.offsetWidth || el.offsetHeight || el.getClientRects().length) && !el.disabled);
+}
+"""
+
+# Espera orientada a eventos: resolve com o elemento, ou null se surgir evento
+# no monitor de erros do Hubsoft (para o Python checar) ou se estourar o tempo
+JS_AGUARDAR = JS_BUSCAR + """
+(function (tipo, valor, clicavel, timeoutMs) {
+    function pronto() {
+        var el = __buscar(tipo, valor);
+        return (el && (!clicavel || __clicavel(el))) ? el : null;
+    }
+    function eventoMonitor() {
+        return !!(window.__roboMonitor && window.__roboMonitor.fila.length);
+    }
+    return new Promise(function (resolve) {
+        var el = pronto();
+        if (el || eventoMonitor()) { resolve(el); return; }
+        var observer, timer;
+        function fim(valor) { observer.disconnect(); clearTimeout(timer); resolve(valor); }
+        observer = new MutationObserver(function () {
+            var achado = pronto();
+            if (achado) { fim(achado); } else if (eventoMonitor()) { fim(null); }
+        });
+        observer.observe(document, { childList: true, subtree: true, attributes: true });
+        timer = setTimeout(function () { fim(null); }, timeoutMs);
+    });
+})(%s, %s, %s, %d)
+"""
+
+
+class ErroCDP(WebDriverException):
+    """Erro retornado pelo Chrome para um comando CDP."""
+
+
+class TempoEsgotadoCDP(ErroCDP):
+    """Comando CDP sem resposta do Chrome dentro do timeout."""
+
+
+def _seletor(by, valor):
+    """Converte um localizador By.* do Selenium em ('xpath'|'css', seletor)."""
+    if by == By.XPATH:
+        return 'xpath', valor
+    if by == By.CSS_SELECTOR:
+        return 'css', valor
+    if by == By.NAME:
+        return 'css', f'[name="{valor}"]'
+    if by == By.ID:
+        return 'css', f'#{valor}'
+    if by == By.CLASS_NAME:
+        return 'css', f'.{valor}'
+    if by == By.TAG_NAME:
+        return 'css', valor
+    raise ValueError(f"Localizador não suportado no backend CDP: {by}")
+
+
+class ConexaoCDP:
+    """Cliente websocket CDP (asyncio + wsproto) com comandos e eventos multiplexados."""
+
+    def __init__(self):
+        self.ws = WSConnection(ConnectionType.CLIENT)
+        self.reader = None
+        self.writer = None
+        self.proximo_id = 0
+        self.pendentes = {}  # id -> Future
+        self.ouvintes = []  # (metodo, session_id, callback)
+        self.comandos_enviados = 0  # Para o benchmark de round trips
+        self.tarefa_leitura = None
+
+    async def conectar(self, url_ws):
+        url = urlparse(url_ws)
+        self.reader, self.writer = await asyncio.open_connection(url.hostname, url.port)
+        self.writer.write(self.ws.send(Request(host=url.netloc, target=url.path)))
+        await self.writer.drain()
+        while True:
+            dados = await self.reader.read(65536)
+            self.ws.receive_data(dados or None)
+            for evento in self.ws.events():
+                if isinstance(evento, AcceptConnection):
+                    self.tarefa_leitura = asyncio.ensure_future(self._ler())
+                    return
+                if isinstance(evento, RejectConnection):
+                    raise ErroCDP(f"Websocket CDP recusado ({evento.status_code})")
+            if not dados:
+                raise ErroCDP("Conexão CDP encerrada durante o handshake")
+
+    async def _ler(self):
+        partes = []
+        try:
+            while True:
+                dados = await self.reader.read(1 << 20)
+                self.ws.receive_data(dados or None)
+                for evento in self.ws.events():
+                    if isinstance(evento, TextMessage):
+                        partes.append(evento.data)
+                        if evento.message_finished:
+                            self._despachar(json.loads(''.join(partes)))
+                            partes = []
+                    elif isinstance(evento, Ping):
+                        self.writer.write(self.ws.send(evento.response()))
+                    elif isinstance(evento, CloseConnection):
+                        return
+                if not dados:
+                    return
+        finally:
+            for futuro in self.pendentes.values():
+                if not futuro.done():
+                    futuro.set_exception(ErroCDP("Conexão CDP encerrada"))
+            self.pendentes.clear()
+
+    def _despachar(self, mensagem):
+        if 'id' in mensagem:
+            futuro = self.pendentes.pop(mensagem['id'], None)
+            if futuro and not futuro.done():
+                if 'error' in mensagem:
+                    futuro.set_exception(ErroCDP(mensagem['error'].get('message', str(mensagem['error']))))
+                else:
+                    futuro.set_result(mensagem.get('result', {}))
+            return
+        metodo, sessao = mensagem.get('method'), mensagem.get('sessionId')
+        for ouvinte in list(self.ouvintes):
+            if ouvinte[0] == metodo and ouvinte[1] in (None, sessao):
+                ouvinte[2](mensagem.get('params', {}))
+
+    async def enviar(self, metodo, params=None, session_id=None, timeout=TIMEOUT_COMANDO):
+        self.proximo_id += 1
+        mensagem = {'id': self.proximo_id, 'method': metodo, 'params': params or {}}
+        if session_id:
+            mensagem['sessionId'] = session_id
+        futuro = asyncio.get_running_loop().create_future()
+        self.pendentes[mensagem['id']] = futuro
+        self.comandos_enviados += 1
+        try:
+            self.writer.write(self.ws.send(TextMessage(data=json.dumps(mensagem))))
+            await self.writer.drain()
+            return await asyncio.wait_for(futuro, timeout)
+        except asyncio.TimeoutError:
+            raise TempoEsgotadoCDP(f"{metodo} sem resposta em {timeout:.0f}s") from None
+        finally:
+            # Resposta que chegar depois do timeout é descartada pelo _despachar
+            self.pendentes.pop(mensagem['id'], None)
+
+    def ouvir(self, metodo, callback, session_id=None):
+        ouvinte = (metodo, session_id, callback)
+        self.ouvintes.append(ouvinte)
+        return ouvinte
+
+    def remover_ouvinte(self, ouvinte):
+        if ouvinte in self.ouvintes:
+            self.ouvintes.remove(ouvinte)
+
+    async def esperar_evento(self, metodo, session_id=None, timeout=TIMEOUT_COMANDO):
+        futuro = asyncio.get_running_loop().create_future()
+        ouvinte = self.ouvir(metodo, lambda p: futuro.done() or futuro.set_result(p), session_id)
+        try:
+            return await asyncio.wait_for(futuro, timeout)
+        finally:
+            self.remover_ouvinte(ouvinte)
+
+    async def fechar(self):
+        try:
+            self.writer.write(self.ws.send(CloseConnection(code=1000)))
+            await self.writer.drain()
+        except Exception:
+            pass
+        if self.tarefa_leitura:
+            self.tarefa_leitura.cancel()
+        self.writer.close()
+
+
+class AbaCDP:
+    """Uma aba (target) do Chrome, acessada por uma sessão CDP 'flatten'."""
+
+    def __init__(self, conexao, target_id, session_id):
+        self.conexao = conexao
+        self.target_id = target_id
+        self.session_id = session_id
+
+    async def comando(self, metodo, params=None, timeout=TIMEOUT_COMANDO):
+        return await self.conexao.enviar(metodo, params, self.session_id, timeout)
+
+    async def preparar(self):
+        await self.comando('Page.enable')
+        await self.comando('Runtime.enable')
+
+    async def ir(self, url, timeout=TIMEOUT_COMANDO):
+        carregou = asyncio.ensure_future(self.conexao.esperar_evento('Page.loadEventFired', self.session_id, timeout))
+        await self.comando('Page.navigate', {'url': url})
+        await carregou
+
+    async def avaliar(self, expressao, aguardar_promise=False, por_valor=True, timeout=TIMEOUT_COMANDO):
+        resposta = await self.comando('Runtime.evaluate', {
+            'expression': expressao,
+            'awaitPromise': aguardar_promise,
+            'returnByValue': por_valor,
+        }, timeout)
+        if 'exceptionDetails' in resposta:
+            detalhes = resposta['exceptionDetails']
+            raise JavascriptException(detalhes.get('exception', {}).get('description') or detalhes.get('text'))
+        return resposta['result']
+
+    async def chamar(self, object_id, funcao, argumentos=(), por_valor=True, aguardar_promise=False, timeout=TIMEOUT_COMANDO):
+        resposta = await self.comando('Runtime.callFunctionOn', {
+            'objectId': object_id,
+            'functionDeclaration': funcao,
+            'arguments': list(argumentos),
+            'returnByValue': por_valor,
+            'awaitPromise': aguardar_promise,
+        }, timeout)
+        if 'exceptionDetails' in resposta:
+            detalhes = resposta['exceptionDetails']
+            raise JavascriptException(detalhes.get('exception', {}).get('description') or detalhes.get('text'))
+        return resposta['result']
+
+    async def buscar(self, by, valor):
+        tipo, seletor = _seletor(by, valor)
+        resultado = await self.avaliar(
+            JS_BUSCAR + f"__buscar({json.dumps(tipo)}, {json.dumps(seletor)})", por_valor=False
+        )
+        return resultado.get('objectId')
+
+    async def buscar_todos(self, by, valor):
+        tipo, seletor = _seletor(by, valor)
+        if tipo == 'xpath':
+            expressao = (f"(function(){{var r=document.evaluate({json.dumps(seletor)},document,null,"
+                         f"XPathResult.ORDERED_NODE_SNAPSHOT_TYPE,null),l=[];"
+                         f"for(var i=0;i<r.snapshotLength;i++){{l.push(r.snapshotItem(i));}}return l;}})()")
+        else:
+            expressao = f"Array.prototype.slice.call(document.querySelectorAll({json.dumps(seletor)}))"
+        lista = await self.avaliar(expressao, por_valor=False)
+        propriedades = await self.comando('Runtime.getProperties', {'objectId': lista['objectId'], 'ownProperties': True})
+        return [
+            p['value']['objectId'] for p in propriedades['result']
+            if p['name'].isdigit() and p.get('value', {}).get('objectId')
+        ]
+
+    async def aguardar_elemento(self, by, valor, clicavel, timeout):
+        """Espera por evento (MutationObserver). Retorna objectId ou None."""
+        tipo, seletor = _seletor(by, valor)
+        expressao = JS_AGUARDAR % (json.dumps(tipo), json.dumps(seletor), 'true' if clicavel else 'false', int(timeout * 1000))
+        try:
+            resultado = await self.avaliar(expressao, aguardar_promise=True, por_valor=False, timeout=timeout + 5)
+        except TempoEsgotadoCDP:
+            # Chrome travado não é navegação: não adianta esperar de novo
+            raise
+        except ErroCDP as e:
+            # Navegação no meio da espera destrói o contexto: quem chamou tenta de novo
+            logger.debug(f"Espera CDP interrompida: {e}")
+            return None
+        return resultado.get('objectId')
+
+    async def clicar(self, object_id):
+        """Clique nativo (mouse) no centro do elemento, como o WebElement.click()."""
+        centro = await self.chamar(object_id, """function () {
+            this.scrollIntoView({block: 'center', inline: 'center'});
+            var r = this.getBoundingClientRect();
+            return [r.left + r.width / 2, r.top + r.height / 2];
+        }""")
+        x, y = centro['value']
+        for tipo in ('mouseMoved', 'mousePressed', 'mouseReleased'):
+            await self.comando('Input.dispatchMouseEvent', {
+                'type': tipo, 'x': x, 'y': y, 'button': 'left', 'clickCount': 1
+            })
+
+    async def digitar(self, object_id, texto):
+        await self.chamar(object_id, "function () { this.focus(); }")
+        buffer = ''
+        for caractere in texto:
+            if caractere in TECLAS:
+                if buffer:
+                    await self.comando('Input.insertText', {'text': buffer})
+                    buffer = ''
+                key, code, codigo, texto_tecla = TECLAS[caractere]
+                for tipo in ('keyDown', 'keyUp'):
+                    params = {'type': tipo, 'key': key, 'code': code,
+                              'windowsVirtualKeyCode': codigo, 'nativeVirtualKeyCode': codigo}
+                    if tipo == 'keyDown' and texto_tecla:
+                        params['text'] = texto_tecla
+                    await self.comando('Input.dispatchKeyEvent', params)
+            else:
+                buffer += caractere
+        if buffer:
+            await self.comando('Input.insertText', {'text': buffer})
+
+    async def screenshot(self):
+        resposta = await self.comando('Page.captureScreenshot', {'format': 'png'})
+        return base64.b64decode(resposta['data'])
+
+
+class NavegadorCDP:
+    """Processo do Chrome + conexão CDP de nível de navegador, num event loop próprio."""
+
+    def __init__(self, processo, conexao, loop, thread, temp_dir):
+        self.processo = processo
+        self.conexao = conexao
+        self.loop = loop
+        self.thread = thread
+        self.temp_dir = temp_dir
+
+    @classmethod
+    def iniciar(cls, headless, temp_dir, argumentos_extras=()):
+        """Abre o Chrome com --remote-debugging-port e conecta ao websocket do navegador."""
+        binario = os.environ.get('CHROME_BIN') or next(filter(None, map(shutil.which, BINARIOS_CHROME)), None)
+        if not binario:
+            raise WebDriverException("Chrome não encontrado (defina CHROME_BIN)")
+
+        argumentos = [
+            binario, '--remote-debugging-port=0', f'--user-data-dir={temp_dir}',
+            '--no-sandbox', '--disable-dev-shm-usage', '--no-first-run', '--disable-default-apps',
+            '--window-size=1920,1080', 'about:blank',
+        ]
+        if headless:
+            argumentos[1:1] = ['--headless=new', '--disable-gpu', '--force-device-scale-factor=1']
+        argumentos[1:1] = list(argumentos_extras)
+        # Grupo de processos próprio: o Chrome e os renderers podem ser encerrados juntos (ver coletor_orfaos.py)
+        processo = subprocess.Popen(argumentos, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+        # O Chrome grava a porta escolhida e o caminho do websocket neste arquivo
+        arquivo_porta = os.path.join(temp_dir, 'DevToolsActivePort')
+        limite = time.monotonic() + TIMEOUT_INICIO
+        while not os.path.exists(arquivo_porta) or os.path.getsize(arquivo_porta) == 0:
+            if processo.poll() is not None or time.monotonic() > limite:
+                processo.kill()
+                raise WebDriverException("Chrome não abriu a porta de depuração")
+            time.sleep(0.05)
+        with open(arquivo_porta) as f:
+            porta, caminho = f.read().split('\n')[:2]
+
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name='cdp-loop', daemon=True)
+        thread.start()
+        conexao = ConexaoCDP()
+        try:
+            asyncio.run_coroutine_threadsafe(conexao.conectar(f"ws://127.0.0.1:{porta}{caminho}"), loop).result(TIMEOUT_INICIO)
+        except Exception:
+            processo.kill()
+            loop.call_soon_threadsafe(loop.stop)
+            raise
+        return cls(processo, conexao, loop, thread, temp_dir)
+
+    def executar(self, coro, timeout=None):
+        """Roda uma corrotina no loop do navegador a partir de código síncrono."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    async def criar_contexto(self):
+        """Contexto isolado (cookies/storage próprios) dentro do mesmo processo."""
+        resposta = await self.conexao.enviar('Target.createBrowserContext', {'disposeOnDetach': True})
+        return resposta['browserContextId']
+
+    async def nova_aba(self, contexto=None):
+        params = {'url': 'about:blank'}
+        if contexto:
+            params['browserContextId'] = contexto
+        target = await self.conexao.enviar('Target.createTarget', params)
+        sessao = await self.conexao.enviar('Target.attachToTarget', {'targetId': target['targetId'], 'flatten': True})
+        aba = AbaCDP(self.conexao, target['targetId'], sessao['sessionId'])
+        await aba.preparar()
+        return aba
+
+    async def fechar_aba(self, aba):
+        try:
+            await self.conexao.enviar('Target.closeTarget', {'targetId': aba.target_id})
+        except ErroCDP:
+            pass
+
+    def fechar(self):
+        try:
+            self.executar(self.conexao.enviar('Browser.close'), 5)
+        except Exception:
+            pass
+        try:
+            self.executar(self.conexao.fechar(), 5)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        try:
+            self.processo.wait(10)
+        except subprocess.TimeoutExpired:
+            self.processo.kill()
+        # Renderers/zygote que sobreviveram ao processo principal
+        try:
+            os.killpg(self.processo.pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+class ElementoCDP:
+    """Equivalente mínimo do WebElement, apontando para um objectId remoto."""
+
+    def __init__(self, driver, object_id):
+        self._driver = driver
+        self.object_id = object_id
+
+    def _chamar(self, funcao):
+        return self._driver._executar(self._driver.aba.chamar(self.object_id, funcao)).get('value')
+
+    def click(self):
+        self._driver._executar(self._driver.aba.clicar(self.object_id))
+
+    def clear(self):
+        self._chamar("""function () {
+            this.focus(); this.value = '';
+            this.dispatchEvent(new Event('input', {bubbles: true}));
+            this.dispatchEvent(new Event('change', {bubbles: true}));
+        }""")
+
+    def send_keys(self, *valores):
+        self._driver._executar(self._driver.aba.digitar(self.object_id, ''.join(str(v) for v in valores)))
+
+    def is_displayed(self):
+        return bool(self._chamar("function () { return !!(this.offsetWidth || this.offsetHeight || this.getClientRects().length); }"))
+
+    def is_enabled(self):
+        return bool(self._chamar("function () { return !this.disabled; }"))
+
+    @property
+    def text(self):
+        return self._chamar("function () { return this.innerText; }") or ''
+
+
+class DriverCDP:
+    """
+    Fachada síncrona com a API de WebDriver usada pelas etapas, sobre uma AbaCDP.
+    Várias fachadas podem compartilhar o mesmo NavegadorCDP (uma por aba).
+    """
+
+    def __init__(self, navegador, aba, dono_do_navegador=True):
+        self.navegador = navegador
+        self.aba = aba
+        self.dono_do_navegador = dono_do_navegador
+        self.timeout_script = TIMEOUT_COMANDO
+
+    @classmethod
+    def iniciar(cls, headless, temp_dir):
+        navegador = NavegadorCDP.iniciar(headless, temp_dir)
+        try:
+            aba = navegador.executar(navegador.nova_aba(), TIMEOUT_INICIO)
+        except Exception:
+            navegador.fechar()
+            raise
+        return cls(navegador, aba)
+
+    @property
+    def comandos_enviados(self):
+        return self.navegador.conexao.comandos_enviados
+
+    def _executar(self, coro, timeout=None):
+        """Roda no loop do navegador com os timeouts como no Selenium (TimeoutException)."""
+        try:
+            return self.navegador.executar(coro, timeout)
+        except (TempoEsgotadoCDP, asyncio.TimeoutError, concurrent.futures.TimeoutError) as e:
+            raise TimeoutException(str(e) or "Tempo esgotado esperando o navegador") from e
+
+    @staticmethod
+    def _argumento(valor):
+        if isinstance(valor, ElementoCDP):
+            return {'objectId': valor.object_id}
+        return {'value': valor}
+
+    def get(self, url):
+        self._executar(self.aba.ir(url))
+
+    @property
+    def current_url(self):
+        return self._executar(self.aba.avaliar("location.href"))['value']
+
+    def execute_script(self, script, *args):
+        """Mesma semântica do Selenium: corpo de função com 'arguments' e 'return'."""
+        funcao = f"function () {{ {script}\n}}"
+        elementos = [a for a in args if isinstance(a, ElementoCDP)]
+        if elementos:
+            resultado = self._executar(self.aba.chamar(
+                elementos[0].object_id, funcao, [self._argumento(a) for a in args]
+            ))
+        else:
+            resultado = self._executar(self.aba.avaliar(f"({funcao}).apply(null, {json.dumps(list(args))})"))
+        return resultado.get('value')
+
+    def execute_async_script(self, script, *args):
+        """Como no Selenium: o último argumento é o callback que encerra o script."""
+        funcao = (f"function () {{ var __args = Array.prototype.slice.call(arguments); "
+                  f"return new Promise(function (__resolve) {{ __args.push(__resolve); "
+                  f"(function () {{ {script}\n}}).apply(null, __args); }}); }}")
+        elementos = [a for a in args if isinstance(a, ElementoCDP)]
+        if elementos:
+            resultado = self._executar(self.aba.chamar(
+                elementos[0].object_id, funcao, [self._argumento(a) for a in args],
+                aguardar_promise=True, timeout=self.timeout_script
+            ))
+        else:
+            resultado = self._executar(self.aba.avaliar(
+                f"({funcao}).apply(null, {json.dumps(list(args))})", aguardar_promise=True, timeout=self.timeout_script
+            ))
+        return resultado.get('value')
+
+    def set_script_timeout(self, time_to_wait):
+        self.timeout_script = time_to_wait
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self._executar(self.aba.comando(cmd, cmd_args))
+
+    def find_element(self, by=By.ID, value=None):
+        object_id = self._executar(self.aba.buscar(by, value))
+        if not object_id:
+            raise NoSuchElementException(f"Elemento não encontrado: {by}={value}")
+        return ElementoCDP(self, object_id)
+
+    def find_elements(self, by=By.ID, value=None):
+        return [ElementoCDP(self, o) for o in self._executar(self.aba.buscar_todos(by, value))]
+
+    def aguardar_elemento(self, localizador, clicavel, timeout):
+        """Espera orientada a eventos usada pelo EsperaMonitorada. Retorna ElementoCDP ou None."""
+        object_id = self._executar(self.aba.aguardar_elemento(localizador[0], localizador[1], clicavel, timeout))
+        return ElementoCDP(self, object_id) if object_id else None
+
+    def save_screenshot(self, filename):
+        with open(filename, 'wb') as f:
+            f.write(self._executar(self.aba.screenshot()))
+        return True
+
+    def set_window_size(self, width, height):
+        self._executar(self.aba.comando('Emulation.setDeviceMetricsOverride', {
+            'width': width, 'height': height, 'deviceScaleFactor': 1, 'mobile': False
+        }))
+
+    def maximize_window(self):
+        try:
+            janela = self._executar(self.navegador.conexao.enviar('Browser.getWindowForTarget', {'targetId': self.aba.target_id}))
+            self._executar(self.navegador.conexao.enviar('Browser.setWindowBounds', {
+                'windowId': janela['windowId'], 'bounds': {'windowState': 'maximized'}
+            }))
+        except ErroCDP:
+            pass  # Headless não tem gerenciador de janelas
+
+    def quit(self):
+        if self.dono_do_navegador:
+            self.navegador.fechar()
+        else:
+            self._executar(self.navegador.fechar_aba(self.aba))
@@ -0,0 +1,145 @@
+"""
+Benchmark: backend Selenium (chromedriver + polling) x backend CDP (eventos).
+
+Serve localmente uma página que imita o ritmo do wizard do Hubsoft: a cada
+clique, o próximo botão aparece depois de um atraso aleatório (semente fixa)
+e fica alguns ms desabilitado, como durante as animações do Angular Material.
+Cada backend percorre a mesma sequência usando a API de espera das etapas
+(EsperaMonitorada.clicavel + clique via execute_script) e o relatório mostra
+tempo total, latência entre o botão ficar pronto e o clique, e quantos
+comandos foram enviados ao navegador.
+
+Uso (precisa do Chrome instalado):
+    python3 benchmarks/benchmark_backends.py [--passos 30] [--visivel]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from main_refatorado import criar_opcoes_chrome
+from monitor_hubsoft import MonitorHubsoft, EsperaMonitorada
+from tempos_etapas import percentil
+from backend_cdp import DriverCDP
+
+PAGINA = """<!doctype html>
+<html><body>
+<div id="area"></div>
+<script>
+var atrasos = %s;
+window.__prontoEm = {};
+function criar(n) {
+    var b = document.createElement('button');
+    b.id = 'b' + n; b.textContent = 'Passo ' + n; b.disabled = true;
+    b.onclick = function () { b.remove(); if (n + 1 < atrasos.length) { setTimeout(function () { criar(n + 1); }, atrasos[n + 1]); } };
+    document.getElementById('area').appendChild(b);
+    setTimeout(function () { b.disabled = false; window.__prontoEm[n] = performance.now(); }, 30);
+}
+criar(0);
+</script>
+</body></html>
+"""
+
+
+def servir(passos):
+    aleatorio = random.Random(42)
+    atrasos = [0] + [aleatorio.randint(50, 300) for _ in range(passos - 1)]
+    corpo = (PAGINA % atrasos).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_port}/"
+
+
+def contar_comandos_selenium(driver):
+    contador = {'n': 0}
+    original = driver.execute
+
+    def execute(*args, **kwargs):
+        contador['n'] += 1
+        return original(*args, **kwargs)
+
+    driver.execute = execute
+    return lambda: contador['n']
+
+
+def percorrer(driver, url, passos, poll=0.5):
+    driver.get(url)
+    monitor = MonitorHubsoft(driver)
+    monitor.instalar()
+    wait = EsperaMonitorada(driver, 15, monitor, poll_frequency=poll)
+    cliques = []
+    inicio = time.perf_counter()
+    for n in range(passos):
+        botao = wait.clicavel((By.CSS_SELECTOR, f"#b{n}"))
+        driver.execute_script("arguments[0].click();", botao)
+        cliques.append(driver.execute_script("return performance.now();"))
+    total = time.perf_counter() - inicio
+    prontos = driver.execute_script("return window.__prontoEm;")
+    # Latência de reação: do botão ficar habilitado até o clique (ms, relógio da página)
+    latencias = [cliques[n] - prontos[str(n)] for n in range(passos)]
+    return total, latencias
+
+
+def rodar(nome, criar, url, passos, poll=0.5):
+    temp_dir = tempfile.mkdtemp()
+    driver = criar(temp_dir)
+    try:
+        if isinstance(driver, DriverCDP):
+            base = driver.comandos_enviados
+
+            def comandos():
+                return driver.comandos_enviados - base
+        else:
+            comandos = contar_comandos_selenium(driver)
+        total, latencias = percorrer(driver, url, passos, poll)
+        return nome, total, latencias, comandos()
+    finally:
+        driver.quit()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara os backends Selenium e CDP')
+    parser.add_argument('--passos', type=int, default=30)
+    parser.add_argument('--visivel', action='store_true')
+    args = parser.parse_args()
+    headless = not args.visivel
+
+    servidor, url = servir(args.passos)
+    try:
+        resultados = [
+            rodar('selenium (poll 0,5s)', lambda d: webdriver.Chrome(options=criar_opcoes_chrome(headless, d)), url, args.passos),
+            rodar('selenium (poll 0,1s)', lambda d: webdriver.Chrome(options=criar_opcoes_chrome(headless, d)), url, args.passos, 0.1),
+            rodar('cdp (eventos)', lambda d: DriverCDP.iniciar(headless, d), url, args.passos),
+        ]
+    finally:
+        servidor.shutdown()
+
+    print(f"\n{args.passos} passos por backend\n")
+    print(f"{'backend':<22}{'total (s)':>10}{'lat. p50 (ms)':>15}{'lat. p95 (ms)':>15}{'comandos':>10}")
+    for nome, total, latencias, comandos in resultados:
+        print(f"{nome:<22}{total:>10.2f}{percentil(latencias, 50):>15.0f}{percentil(latencias, 95):>15.0f}{comandos:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Benchmark: planos (EXPLAIN) das consultas quentes do robô sobre a tabela prospectos.
+
+Cria um esquema descartável (bench_robo) com uma cópia vazia da estrutura de
+`prospectos`, aplica as migrações do robô (migracoes.py), gera N linhas
+sintéticas com a distribuição de produção (quase tudo finalizado e poucos
+pendentes) e roda EXPLAIN ANALYZE nas consultas do salvar_prospecto, da
+elegibilidade e do agendador.
+
+O benchmark falha (código de saída 1) se alguma consulta fizer Seq Scan em
+prospectos, ou seja, se uma mudança de consulta ou de índice deixar a busca
+proporcional ao tamanho da tabela.
+
+Uso (precisa de acesso ao banco; o esquema bench_robo é apagado no fim):
+    python3 benchmarks/benchmark_consultas.py [--banco django] [--linhas 300000]
+    python3 benchmarks/benchmark_consultas.py --real   # só EXPLAIN, nas tabelas de verdade
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psycopg2
+import migracoes
+from migracoes import FILTRO_PENDENTES
+from main_refatorado import DB_CONFIG, DB_CONFIG_DJANGO
+from agendador import FILTRO_PRONTOS, COLUNAS
+
+ESQUEMA = 'bench_robo'
+
+# Expressão de cada coluna em função de g (generate_series); só entram as que a tabela tiver
+GERADORES = {
+    'id': "g",
+    'id_prospecto_hubsoft': "g::text",
+    'nome_prospecto': "'PROSPECTO ' || g",
+    'status': """CASE WHEN g % 100 < 90 THEN 'finalizado' WHEN g % 100 < 95 THEN 'erro'
+                      WHEN g % 100 < 99 THEN 'aguardando' ELSE 'processando' END""",
+    'tentativas_processamento': "g % 4",
+    'prioridade': "g % 5",
+    'score_conversao': "(g % 1000) / 10.0",
+    'classe_erro': "CASE g % 100 WHEN 90 THEN 'dados' WHEN 91 THEN 'sessao' WHEN 92 THEN 'transitorio' END",
+    'proxima_tentativa_em': "CASE WHEN g % 100 = 92 THEN now() + interval '10 minutes' END",
+    'data_criacao': "now() - (g % 100000) * interval '1 minute'",
+    'data_atualizacao': "now()",
+    'data_processamento': "now()",
+    'data_inicio_processamento': "CASE WHEN g % 100 = 99 THEN now() - interval '1 hour' END",
+}
+
+# (nome, bancos, sql, parâmetros, pode executar com ANALYZE)
+CONSULTAS = [
+    ('salvar_prospecto: busca por id', migracoes.AMBOS,
+     "SELECT id, tentativas_processamento FROM prospectos WHERE id_prospecto_hubsoft = %s", ('123457',), True),
+    ('elegibilidade: lote por id', (migracoes.PRIMARIO,),
+     "SELECT id_prospecto_hubsoft, id, tentativas_processamento, status, classe_erro, proxima_tentativa_em "
+     "FROM prospectos WHERE id_prospecto_hubsoft = ANY(%s)", ([str(i) for i in range(1000, 1010)],), True),
+    ('agendador: janela por prioridade', (migracoes.DJANGO,),
+     f"SELECT {COLUNAS} FROM prospectos WHERE {FILTRO_PRONTOS} "
+     "ORDER BY prioridade DESC, score_conversao DESC NULLS LAST, tentativas_processamento, data_criacao LIMIT %s", (40,), True),
+    ('agendador: janela por idade', (migracoes.DJANGO,),
+     f"SELECT {COLUNAS} FROM prospectos WHERE {FILTRO_PRONTOS} ORDER BY data_criacao LIMIT %s", (40,), True),
+    ('agendador: reserva do lote', (migracoes.DJANGO,),
+     f"UPDATE prospectos SET status = 'processando' WHERE id = ANY(%s) AND {FILTRO_PRONTOS}", (list(range(100, 110)),), False),
+    ('agendador: profundidade da fila', (migracoes.DJANGO,),
+     f"SELECT COUNT(*) FILTER (WHERE {FILTRO_PRONTOS}), COUNT(*) FILTER (WHERE status = 'processando') "
+     f"FROM prospectos WHERE {FILTRO_PENDENTES} OR status = 'processando'", (), True),
+    ('agendador: próxima liberação', (migracoes.DJANGO,),
+     f"SELECT MIN(proxima_tentativa_em) FROM prospectos WHERE {FILTRO_PENDENTES} AND proxima_tentativa_em > now()", (), True),
+    ('agendador: travados', (migracoes.DJANGO,),
+     "UPDATE prospectos SET status = 'aguardando' WHERE status = 'processando' "
+     "AND data_inicio_processamento < now() - interval '30 minutes'", (), False),
+]
+
+
+def preparar_esquema(conn, banco, linhas):
+    cursor = conn.cursor()
+    cursor.execute(f"DROP SCHEMA IF EXISTS {ESQUEMA} CASCADE")
+    cursor.execute(f"CREATE SCHEMA {ESQUEMA}")
+    cursor.execute(f"CREATE TABLE {ESQUEMA}.prospectos (LIKE public.prospectos INCLUDING DEFAULTS)")
+    cursor.execute(f"SET search_path TO {ESQUEMA}, public")
+    # Colunas NOT NULL do modelo Django que o gerador não preenche
+    cursor.execute("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = %s AND table_name = 'prospectos' AND is_nullable = 'NO' AND column_name <> 'id'
+    """, (ESQUEMA,))
+    for (coluna,) in cursor.fetchall():
+        cursor.execute(f"ALTER TABLE prospectos ALTER COLUMN {coluna} DROP NOT NULL")
+
+    inicio = time.monotonic()
+    for migracao in migracoes.pendentes(banco, set()):
+        if migracao.versao != 5:  # O índice único vem depois da carga, como numa tabela antiga
+            migracoes.aplicar_comandos(cursor, migracao)
+    cursor.execute("""
+        SELECT column_name FROM information_schema.columns WHERE table_schema = %s AND table_name = 'prospectos'
+    """, (ESQUEMA,))
+    existentes = {linha[0] for linha in cursor.fetchall()}
+    colunas = [c for c in GERADORES if c in existentes]
+    cursor.execute(f"""
+        INSERT INTO prospectos ({', '.join(colunas)})
+        SELECT {', '.join(GERADORES[c] for c in colunas)} FROM generate_series(1, %s) AS g
+    """, (linhas,))
+    migracoes.aplicar_comandos(cursor, next(m for m in migracoes.MIGRACOES if m.versao == 5))
+    cursor.execute("ANALYZE prospectos")
+    cursor.close()
+    return time.monotonic() - inicio
+
+
+def nos(plano):
+    yield plano
+    for filho in plano.get('Plans', []):
+        yield from nos(filho)
+
+
+def explicar(conn, sql, parametros, analisar):
+    cursor = conn.cursor()
+    opcoes = "ANALYZE, BUFFERS, FORMAT JSON" if analisar else "FORMAT JSON"
+    cursor.execute(f"EXPLAIN ({opcoes}) {sql}", parametros)
+    resultado = cursor.fetchone()[0]
+    cursor.close()
+    resultado = resultado[0] if isinstance(resultado, list) else json.loads(resultado)[0]
+    plano = resultado['Plan']
+    varreduras = [n for n in nos(plano) if n.get('Relation Name') == 'prospectos']
+    indices = sorted({n['Index Name'] for n in varreduras if 'Index Name' in n})
+    sequenciais = [n for n in varreduras if n['Node Type'] == 'Seq Scan']
+    return {
+        'no': plano['Node Type'],
+        'indices': indices,
+        'seq_scan': bool(sequenciais),
+        'ms': resultado.get('Execution Time'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Confere com EXPLAIN que as consultas quentes usam índice')
+    parser.add_argument('--banco', choices=migracoes.AMBOS, default=migracoes.DJANGO)
+    parser.add_argument('--linhas', type=int, default=300000, help='Linhas sintéticas no esquema descartável')
+    parser.add_argument('--real', action='store_true', help='EXPLAIN sem ANALYZE nas tabelas de verdade')
+    args = parser.parse_args()
+
+    config = DB_CONFIG if args.banco == migracoes.PRIMARIO else DB_CONFIG_DJANGO
+    conn = psycopg2.connect(**config)
+    conn.autocommit = True
+    try:
+        if not args.real:
+            segundos = preparar_esquema(conn, args.banco, args.linhas)
+            print(f"\n{args.linhas} linhas sintéticas em {ESQUEMA}.prospectos ({args.banco}) em {segundos:.1f}s\n")
+        falhas = 0
+        print(f"{'consulta':<36}{'nó':<16}{'tempo (ms)':>11}  índices")
+        for nome, bancos, sql, parametros, analisar in CONSULTAS:
+            if args.banco not in bancos:
+                continue
+            plano = explicar(conn, sql, parametros, analisar and not args.real)
+            tempo = f"{plano['ms']:.2f}" if plano['ms'] is not None else '-'
+            marca = '❌ SEQ SCAN' if plano['seq_scan'] else ', '.join(plano['indices'])
+            print(f"{nome:<36}{plano['no']:<16}{tempo:>11}  {marca}")
+            falhas += plano['seq_scan']
+    finally:
+        if not args.real:
+            conn.cursor().execute(f"DROP SCHEMA IF EXISTS {ESQUEMA} CASCADE")
+        conn.close()
+    if falhas:
+        print(f"\n❌ {falhas} consultas sem índice")
+        sys.exit(1)
+    print("\n✅ Todas as consultas usam índice")
+
+
+if __name__ == "__main__":
+    main()
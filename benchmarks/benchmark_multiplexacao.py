@@ -0,0 +1,108 @@
+"""
+Benchmark: um Chrome por prospecto x um Chrome com várias abas (lote_abas.py).
+
+Cada "prospecto" percorre a página local do benchmark_backends (botões que
+aparecem com atraso aleatório, como as telas do wizard). Os dois modelos
+rodam os mesmos N prospectos em paralelo e o relatório mostra tempo total,
+prospectos por minuto e o pico de memória (RSS somado e PSS) da árvore de
+processos do Chrome.
+
+Uso (precisa do Chrome instalado):
+    python3 benchmarks/benchmark_multiplexacao.py [--prospectos 4] [--passos 30]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend_cdp import NavegadorCDP, DriverCDP
+from lote_abas import ARGUMENTOS_MULTIPLEX
+from benchmark_backends import servir, percorrer
+import recursos
+
+
+class PicoMemoria(threading.Thread):
+    """Amostra a memória das árvores de processos a cada 200ms e guarda o pico."""
+
+    def __init__(self, pids):
+        super().__init__(daemon=True)
+        self.pids = pids
+        self.pico = {'rss_mb': 0, 'pss_mb': 0, 'processos': 0}
+        self.parar = threading.Event()
+
+    def run(self):
+        while not self.parar.wait(0.2):
+            amostras = [recursos.amostrar(pid) for pid in list(self.pids)]
+            for chave in self.pico:
+                self.pico[chave] = max(self.pico[chave], sum(a[chave] for a in amostras))
+
+
+def em_paralelo(drivers, url, passos):
+    threads = [threading.Thread(target=percorrer, args=(d, url, passos)) for d in drivers]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - inicio
+
+
+def um_processo_por_prospecto(n, url, passos, headless):
+    diretorios = [tempfile.mkdtemp() for _ in range(n)]
+    drivers = [DriverCDP.iniciar(headless, d) for d in diretorios]
+    monitor = PicoMemoria([d.navegador.processo.pid for d in drivers])
+    monitor.start()
+    try:
+        return em_paralelo(drivers, url, passos), monitor.pico
+    finally:
+        monitor.parar.set()
+        for driver, diretorio in zip(drivers, diretorios):
+            driver.quit()
+            shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def abas_num_processo(n, url, passos, headless):
+    diretorio = tempfile.mkdtemp()
+    navegador = NavegadorCDP.iniciar(headless, diretorio, ARGUMENTOS_MULTIPLEX)
+    drivers = [DriverCDP(navegador, navegador.executar(navegador.nova_aba()), dono_do_navegador=False) for _ in range(n)]
+    monitor = PicoMemoria([navegador.processo.pid])
+    monitor.start()
+    try:
+        return em_paralelo(drivers, url, passos), monitor.pico
+    finally:
+        monitor.parar.set()
+        navegador.fechar()
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara um Chrome por prospecto com abas num Chrome só')
+    parser.add_argument('--prospectos', type=int, default=4)
+    parser.add_argument('--passos', type=int, default=30)
+    parser.add_argument('--visivel', action='store_true')
+    args = parser.parse_args()
+    headless = not args.visivel
+
+    servidor, url = servir(args.passos)
+    try:
+        resultados = [
+            ('1 Chrome por prospecto',) + um_processo_por_prospecto(args.prospectos, url, args.passos, headless),
+            (f'{args.prospectos} abas, 1 Chrome',) + abas_num_processo(args.prospectos, url, args.passos, headless),
+        ]
+    finally:
+        servidor.shutdown()
+
+    print(f"\n{args.prospectos} prospectos em paralelo, {args.passos} passos cada\n")
+    print(f"{'modelo':<26}{'total (s)':>10}{'prosp./min':>12}{'pico RSS (MB)':>15}{'pico PSS (MB)':>15}{'processos':>11}")
+    for nome, total, pico in resultados:
+        print(f"{nome:<26}{total:>10.2f}{args.prospectos / total * 60:>12.1f}"
+              f"{pico['rss_mb']:>15.0f}{pico['pss_mb']:>15.0f}{pico['processos']:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Classificação das falhas de conversão numa taxonomia fixa.
+
+O erro_processamento continua com o texto livre ("ETAPA 6 - ERRO WIZARD TELA
+1: Message: ..."); a classe vai para a coluna classe_erro e decide se vale a
+pena gastar outra tentativa (e outro navegador) no prospecto:
+
+- transitorio: timeout, rede, Hubsoft instável, banco fora do ar;
+- sessao: login perdido/expirado, navegador caiu no meio da execução;
+- dados: o Hubsoft recusou o prospecto (validação, documento duplicado...);
+- interface: a tela mudou (elemento/opção não existe mais no Hubsoft);
+- ja_concluido: o prospecto já foi convertido.
+
+Só transitorio e sessao são tentados de novo. Prospectos de outras classes
+voltam para a fila quando alguém limpa a classe_erro (ex.: depois de corrigir
+o cadastro no Hubsoft).
+
+Uso:
+    python3 classificador_falhas.py --reclassificar    # preenche classe_erro dos erros antigos
+"""
+import re
+import argparse
+from selenium.common.exceptions import (
+    TimeoutException, NoSuchElementException, ElementNotInteractableException, StaleElementReferenceException,
+    ElementClickInterceptedException, InvalidSessionIdException, JavascriptException, WebDriverException,
+)
+from monitor_hubsoft import ErroHubsoft
+from roteiro_wizard import ErroRoteiro
+
+TRANSITORIO = 'transitorio'
+SESSAO = 'sessao'
+DADOS = 'dados'
+INTERFACE = 'interface'
+JA_CONCLUIDO = 'ja_concluido'
+
+CLASSES = (TRANSITORIO, SESSAO, DADOS, INTERFACE, JA_CONCLUIDO)
+RETENTAVEIS = (TRANSITORIO, SESSAO)
+
+# Código do monitor do Hubsoft (ErroHubsoft.codigo) -> classe
+CLASSE_POR_CODIGO = {
+    'SESSAO_EXPIRADA': SESSAO,
+    'LOGIN_INVALIDO': SESSAO,
+    'CPF_DUPLICADO': DADOS,
+    'CAMPO_OBRIGATORIO': DADOS,
+    'ERRO_VALIDACAO': DADOS,
+    'SEM_OPCAO_CONVERTER': DADOS,
+    'ERRO_HUBSOFT': TRANSITORIO,
+}
+
+# Texto do erro (exceção, toast ou erro_processamento antigo), avaliado em ordem
+PADROES = [
+    (JA_CONCLUIDO, re.compile(r"j[aá] (foi )?convertid|j[aá] [eé] cliente|prospecto (j[aá] )?convertido", re.I)),
+    (SESSAO, re.compile(r"\[(SESSAO_EXPIRADA|LOGIN_INVALIDO)\]|invalid session id|session deleted|chrome not reachable"
+                        r"|no such window|target window already closed|disconnected|conex[aã]o cdp encerrada", re.I)),
+    (DADOS, re.compile(r"\[(CPF_DUPLICADO|CAMPO_OBRIGATORIO|ERRO_VALIDACAO|SEM_OPCAO_CONVERTER)\]", re.I)),
+    (INTERFACE, re.compile(r"no such element|unable to locate|element not interactable|invalid selector"
+                           r"|javascript error|n[aã]o existe no campo|elemento n[aã]o encontrado", re.I)),
+    (TRANSITORIO, re.compile(r"timeout|timed out|net::err_|connection (refused|reset)|max retries"
+                             r"|could not connect|server closed the connection|\[ERRO_HUBSOFT\]", re.I)),
+]
+
+
+def classificar_texto(texto):
+    """Classe de um erro a partir só do texto. Na dúvida, transitorio (ainda tenta de novo)."""
+    for classe, padrao in PADROES:
+        if padrao.search(texto or ''):
+            return classe
+    return TRANSITORIO
+
+
+def classificar(excecao):
+    """Classe de uma exceção levantada durante a conversão."""
+    if isinstance(excecao, ErroHubsoft):
+        if PADROES[0][1].search(excecao.mensagem or ''):
+            return JA_CONCLUIDO
+        return CLASSE_POR_CODIGO.get(excecao.codigo, TRANSITORIO)
+    if isinstance(excecao, ErroRoteiro):
+        # Elemento ou tela que não apareceu a tempo: o Hubsoft pode só estar lento
+        return TRANSITORIO if excecao.motivo in ('timeout', 'troca_de_tela') else INTERFACE
+    if isinstance(excecao, InvalidSessionIdException):
+        return SESSAO
+    if isinstance(excecao, (TimeoutException, StaleElementReferenceException, ElementClickInterceptedException)):
+        return TRANSITORIO
+    if isinstance(excecao, (NoSuchElementException, ElementNotInteractableException, JavascriptException)):
+        return INTERFACE
+    if isinstance(excecao, WebDriverException):
+        return classificar_texto(excecao.msg or str(excecao))
+    return classificar_texto(str(excecao))
+
+
+def retentavel(classe):
+    """Erros sem classe (gravados antes da classificação) continuam sendo tentados."""
+    return classe is None or classe in RETENTAVEIS
+
+
+def reclassificar(conn):
+    """Preenche classe_erro dos prospectos em erro que ainda não têm classe."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, erro_processamento FROM prospectos WHERE status = 'erro' AND classe_erro IS NULL")
+    linhas = cursor.fetchall()
+    for id_registro, erro in linhas:
+        cursor.execute("UPDATE prospectos SET classe_erro = %s WHERE id = %s", (classificar_texto(erro), id_registro))
+    conn.commit()
+    cursor.close()
+    return len(linhas)
+
+
+if __name__ == "__main__":
+    import psycopg2
+    from main_refatorado import DB_CONFIG, DB_CONFIG_DJANGO
+
+    parser = argparse.ArgumentParser(description='Classificação das falhas de conversão')
+    parser.add_argument('--reclassificar', action='store_true', help='Classifica os erros antigos pelo texto')
+    args = parser.parse_args()
+    if args.reclassificar:
+        for nome, config in (('primário', DB_CONFIG), ('Django', DB_CONFIG_DJANGO)):
+            conn = psycopg2.connect(**config)
+            try:
+                print(f"✅ Banco {nome}: {reclassificar(conn)} erros classificados")
+            finally:
+                conn.close()
+    else:
+        parser.print_help()
@@ -0,0 +1,228 @@
+"""
+Coleta de Chrome/chromedriver órfãos e perfis temporários abandonados.
+
+Cada navegador do robô sobe num grupo de processos próprio e com um perfil
+criado por criar_perfil(), que grava no diretório quem é o dono (pid e
+instante de início do worker) e o grupo do navegador. Se o worker morrer
+entre abrir o Chrome e o driver.quit() (crash, SIGKILL, Restart=always do
+systemd), o coletor encontra o perfil sem dono vivo, mata o grupo inteiro
+(chromedriver, Chrome e renderers) e apaga o diretório.
+
+Só toca no que o robô registrou: perfis PREFIXO_PERFIL com dono gravado e
+chromedriver adotado pelo init cujo grupo ou perfil esteja num desses
+registros. Outros Chrome/chromedriver do mesmo usuário (um teste manual, outro
+serviço) ficam de fora.
+
+Os restos de versões anteriores, sem registro (perfis tmpXXXX de
+tempfile.mkdtemp() puro e qualquer chromedriver pendurado no init), só são
+recolhidos pela limpeza única e explícita com --legado.
+
+Uso:
+    python3 coletor_orfaos.py             # uma coleta (substitui o antigo kill_chrome.py)
+    python3 coletor_orfaos.py --legado    # uma vez, na migração: inclui os restos sem registro
+"""
+import argparse
+import os
+import json
+import glob
+import time
+import shutil
+import signal
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+PREFIXO_PERFIL = 'robo_chrome_'
+ARQUIVO_DONO = '.robo_dono.json'
+INTERVALO_COLETA = float(os.environ.get('INTERVALO_COLETA_ORFAOS', '600'))
+# Na limpeza legada, perfis sem registro só são tocados depois dessa idade (podem estar sendo criados)
+IDADE_PERFIL_SEM_DONO = float(os.environ.get('IDADE_PERFIL_SEM_DONO_HORAS', '6')) * 3600
+NOMES_NAVEGADOR = ('chrome', 'chromium', 'chromedriver')
+
+
+def _stat(pid):
+    with open(f'/proc/{pid}/stat') as f:
+        return f.read().rsplit(')', 1)[1].split()
+
+
+def _inicio(pid):
+    """Instante de início do processo (ticks desde o boot): distingue pid reaproveitado."""
+    try:
+        return int(_stat(pid)[19])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _cmdline(pid):
+    try:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            return [p.decode(errors='replace') for p in f.read().split(b'\0') if p]
+    except OSError:
+        return []
+
+
+def _processos_proprios():
+    """pid -> (ppid, pgid, cmdline) dos processos deste usuário."""
+    uid = os.getuid()
+    processos = {}
+    for nome in os.listdir('/proc'):
+        if not nome.isdigit():
+            continue
+        pid = int(nome)
+        try:
+            if os.stat(f'/proc/{pid}').st_uid != uid:
+                continue
+            campos = _stat(pid)
+            processos[pid] = (int(campos[1]), int(campos[2]), _cmdline(pid))
+        except (OSError, IndexError, ValueError):
+            continue
+    return processos
+
+
+def _eh_navegador(cmdline):
+    return bool(cmdline) and any(n in os.path.basename(cmdline[0]).lower() for n in NOMES_NAVEGADOR)
+
+
+def _matar(pids):
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+def encerrar_grupo(pgid):
+    """Mata o que sobrou do grupo de processos de um navegador (renderers, zygote...)."""
+    if not pgid or pgid == os.getpgid(0):
+        return
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+def criar_perfil():
+    """Diretório de perfil do Chrome registrado em nome deste worker."""
+    diretorio = tempfile.mkdtemp(prefix=PREFIXO_PERFIL)
+    registrar_grupo(diretorio, None)
+    return diretorio
+
+
+def registrar_grupo(diretorio, pgid):
+    """Grava o dono do perfil e o grupo de processos do navegador que o usa."""
+    try:
+        with open(os.path.join(diretorio, ARQUIVO_DONO), 'w') as f:
+            json.dump({'dono': os.getpid(), 'inicio_dono': _inicio(os.getpid()), 'pgid': pgid}, f)
+    except OSError as e:
+        logger.error(f"Não foi possível registrar o perfil {diretorio}: {e}")
+
+
+def _ler_dono(diretorio):
+    try:
+        with open(os.path.join(diretorio, ARQUIVO_DONO)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _dono_vivo(registro):
+    inicio = registro.get('inicio_dono')
+    return inicio is not None and _inicio(registro.get('dono')) == inicio
+
+
+def _perfis_candidatos(legado=False):
+    base = tempfile.gettempdir()
+    candidatos = glob.glob(os.path.join(base, PREFIXO_PERFIL + '*'))
+    if legado:
+        # Perfis antigos, de antes do registro: tmpXXXX com cara de perfil do Chrome
+        candidatos += [d for d in glob.glob(os.path.join(base, 'tmp*'))
+                       if os.path.exists(os.path.join(d, 'Local State'))]
+    return [d for d in candidatos if os.path.isdir(d)]
+
+
+def coletar(legado=False):
+    """
+    Uma passada do coletor. Retorna quantos perfis e processos foram recolhidos.
+    Com `legado`, recolhe também perfis e chromedriver sem registro (ver --legado).
+    """
+    processos = _processos_proprios()
+    em_uso = {}  # diretório de perfil -> pids de navegador usando
+    for pid, (_, _, cmdline) in processos.items():
+        for argumento in cmdline:
+            if argumento.startswith('--user-data-dir='):
+                em_uso.setdefault(argumento.split('=', 1)[1].rstrip('/'), []).append(pid)
+
+    perfis = mortos = 0
+    agora = time.time()
+    grupos_registrados, perfis_registrados = set(), set()
+    for diretorio in _perfis_candidatos(legado):
+        registro = _ler_dono(diretorio)
+        if registro is not None:
+            perfis_registrados.add(diretorio)
+            if registro.get('pgid'):
+                grupos_registrados.add(registro['pgid'])
+            if _dono_vivo(registro):
+                continue
+        elif not legado:
+            continue
+        else:
+            try:
+                idade = agora - os.path.getmtime(diretorio)
+            except OSError:
+                continue
+            if idade < IDADE_PERFIL_SEM_DONO or em_uso.get(diretorio):
+                continue
+
+        # Dono morto: o grupo inteiro do navegador vai junto, se ainda for um navegador
+        pgid = (registro or {}).get('pgid')
+        membros = [pid for pid, (_, g, cmd) in processos.items() if pgid and g == pgid]
+        if membros and any(_eh_navegador(processos[p][2]) for p in membros):
+            encerrar_grupo(pgid)
+            mortos += len(membros)
+        usando = [p for p in em_uso.get(diretorio, []) if p not in membros]
+        _matar(usando)
+        mortos += len(usando)
+        shutil.rmtree(diretorio, ignore_errors=True)
+        perfis += 1
+
+    # chromedriver adotado pelo init: o worker que o abriu já morreu. Só os do robô: grupo
+    # registrado ou Chrome filho usando um perfil registrado (morreu antes do registrar_grupo)
+    perfis_dos_filhos = {}
+    for diretorio, pids in em_uso.items():
+        for pid in pids:
+            perfis_dos_filhos.setdefault(processos[pid][0], set()).add(diretorio)
+    soltos = [pid for pid, (ppid, pgid, cmd) in processos.items()
+              if ppid == 1 and cmd and 'chromedriver' in os.path.basename(cmd[0])
+              and (legado or pgid in grupos_registrados or perfis_dos_filhos.get(pid, set()) & perfis_registrados)]
+    _matar(soltos)
+    mortos += len(soltos)
+
+    if perfis or mortos:
+        logger.info(f"🧹 Coletor: {perfis} perfis temporários e {mortos} processos órfãos recolhidos")
+    return {'perfis': perfis, 'processos': mortos}
+
+
+def iniciar_supervisor(intervalo=INTERVALO_COLETA):
+    """Coleta agora e depois a cada `intervalo` segundos, numa thread de fundo."""
+    def _laco():
+        while True:
+            try:
+                coletar()
+            except Exception as e:
+                logger.error(f"Erro no coletor de órfãos: {e}")
+            time.sleep(intervalo)
+
+    thread = threading.Thread(target=_laco, name='coletor-orfaos', daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Coleta de Chrome/chromedriver órfãos e perfis abandonados')
+    parser.add_argument('--legado', action='store_true',
+                        help='Inclui perfis tmp* e chromedriver sem registro (limpeza única de versões anteriores)')
+    args = parser.parse_args()
+    resultado = coletar(legado=args.legado)
+    print(f"✅ Coleta concluída: {resultado['perfis']} perfis, {resultado['processos']} processos")
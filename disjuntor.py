@@ -0,0 +1,180 @@
+"""
+Disjuntor (circuit breaker) compartilhado entre os workers da máquina.
+
+Quando o Hubsoft ou o banco caem, cada lead abria o Chrome, falhava no login
+(ETAPA 1) ou no conectar_banco, tirava screenshot e gastava uma tentativa.
+Agora as falhas de infraestrutura de todos os workers somam num mesmo
+contador, guardado num arquivo JSON protegido por flock (o banco não serve:
+ele é um dos que caem):
+
+- fechado: tudo normal; DISJUNTOR_LIMIAR falhas seguidas abrem o disjuntor;
+- aberto: ninguém despacha lotes. Depois de DISJUNTOR_ESPERA_S, um único
+  worker roda a sonda barata (SELECT 1 / GET na tela de login, sem Chrome);
+- meio_aberto: a sonda passou e só o worker que sondou volta a trabalhar.
+  O primeiro sucesso fecha o disjuntor; a primeira falha o reabre, com a
+  espera dobrada até DISJUNTOR_ESPERA_MAX_S.
+
+Uso:
+    python3 disjuntor.py            # estado atual
+    python3 disjuntor.py --fechar   # fecha tudo à mão (ex.: depois de trocar a senha)
+"""
+import os
+import json
+import time
+import fcntl
+import logging
+import argparse
+import tempfile
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+ARQUIVO_DISJUNTOR = os.environ.get('ARQUIVO_DISJUNTOR', os.path.join(tempfile.gettempdir(), 'robo_disjuntor.json'))
+LIMIAR_FALHAS = int(os.environ.get('DISJUNTOR_LIMIAR', '3'))
+ESPERA_S = float(os.environ.get('DISJUNTOR_ESPERA_S', '60'))
+ESPERA_MAX_S = float(os.environ.get('DISJUNTOR_ESPERA_MAX_S', '900'))
+
+FECHADO = 'fechado'
+ABERTO = 'aberto'
+MEIO_ABERTO = 'meio_aberto'
+
+
+def _novo():
+    return {'estado': FECHADO, 'falhas': 0, 'aberto_em': None, 'espera': ESPERA_S, 'sonda_pid': None, 'ultimo_erro': None}
+
+
+def _vivo(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+@contextmanager
+def _estado(escrever=True):
+    """Estado de todos os disjuntores, lido e (se `escrever`) regravado sob flock."""
+    with open(ARQUIVO_DISJUNTOR, 'a+') as f:
+        fcntl.flock(f, fcntl.LOCK_EX if escrever else fcntl.LOCK_SH)
+        try:
+            f.seek(0)
+            try:
+                estado = json.loads(f.read() or '{}')
+            except ValueError:
+                estado = {}
+            yield estado
+            if escrever:
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(estado))
+                f.flush()
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class Disjuntor:
+    """Um recurso protegido (ex.: 'hubsoft', 'banco') e a sonda que diz se ele voltou."""
+
+    def __init__(self, nome, sonda, limiar=LIMIAR_FALHAS):
+        self.nome = nome
+        self.sonda = sonda
+        self.limiar = limiar
+
+    def _abrir(self, circuito, motivo):
+        if circuito['estado'] != FECHADO:
+            circuito['espera'] = min(ESPERA_MAX_S, circuito['espera'] * 2)
+        circuito.update(estado=ABERTO, aberto_em=time.time(), sonda_pid=None)
+        logger.error(f"⛔ Disjuntor {self.nome} aberto por {circuito['espera']:.0f}s "
+                     f"({circuito['falhas']} falhas seguidas): {motivo}")
+
+    def registrar_falha(self, motivo=''):
+        """Falha de infraestrutura (login, conexão com o banco)."""
+        with _estado() as estado:
+            circuito = estado.setdefault(self.nome, _novo())
+            circuito['falhas'] += 1
+            circuito['ultimo_erro'] = str(motivo)[:300]
+            if circuito['estado'] == MEIO_ABERTO or (circuito['estado'] == FECHADO and circuito['falhas'] >= self.limiar):
+                self._abrir(circuito, circuito['ultimo_erro'])
+
+    def registrar_sucesso(self):
+        # Caminho comum (nada a zerar) só com trava compartilhada
+        with _estado(escrever=False) as estado:
+            circuito = estado.get(self.nome)
+        if circuito is None or (circuito['estado'] == FECHADO and circuito['falhas'] == 0):
+            return
+        with _estado() as estado:
+            circuito = estado.get(self.nome)
+            if circuito is None or (circuito['estado'] == FECHADO and circuito['falhas'] == 0):
+                return
+            if circuito['estado'] != FECHADO:
+                logger.info(f"✅ Disjuntor {self.nome} fechado: serviço de volta")
+            estado[self.nome] = _novo()
+
+    def bloqueado(self):
+        """Se este processo deve parar de despachar (sem sondar)."""
+        with _estado(escrever=False) as estado:
+            circuito = estado.get(self.nome)
+        if circuito is None or circuito['estado'] == FECHADO:
+            return False
+        if circuito['estado'] == MEIO_ABERTO:
+            return circuito['sonda_pid'] != os.getpid() and _vivo(circuito['sonda_pid'])
+        return True
+
+    def liberado(self):
+        """
+        Se este processo pode despachar. Com o disjuntor aberto e a espera
+        vencida, o primeiro worker que chegar roda a sonda; os demais esperam.
+        """
+        if not self.bloqueado():
+            return True
+        with _estado() as estado:
+            circuito = estado.setdefault(self.nome, _novo())
+            if circuito['estado'] == MEIO_ABERTO:
+                # Quem sondava morreu: este worker assume a meia abertura
+                circuito['sonda_pid'] = os.getpid()
+                return True
+            if time.time() - circuito['aberto_em'] < circuito['espera'] or _vivo(circuito['sonda_pid']):
+                return False
+            circuito['sonda_pid'] = os.getpid()
+
+        try:
+            self.sonda()
+            erro = None
+        except Exception as e:
+            erro = e
+        with _estado() as estado:
+            circuito = estado.setdefault(self.nome, _novo())
+            if erro is None:
+                circuito.update(estado=MEIO_ABERTO, sonda_pid=os.getpid())
+                logger.info(f"🩺 Disjuntor {self.nome}: sonda ok, meio aberto (um worker testa antes dos demais)")
+                return True
+            circuito['ultimo_erro'] = str(erro)[:300]
+            self._abrir(circuito, f"sonda falhou: {erro}")
+            return False
+
+
+def situacao():
+    with _estado(escrever=False) as estado:
+        return estado
+
+
+def fechar_todos():
+    with _estado() as estado:
+        estado.clear()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Disjuntor compartilhado dos workers')
+    parser.add_argument('--fechar', action='store_true', help='Fecha todos os disjuntores')
+    args = parser.parse_args()
+    if args.fechar:
+        fechar_todos()
+        print("✅ Disjuntores fechados")
+    for nome, circuito in situacao().items():
+        aberto_em = time.strftime('%H:%M:%S', time.localtime(circuito['aberto_em'])) if circuito['aberto_em'] else '-'
+        print(f"{nome}: {circuito['estado']} ({circuito['falhas']} falhas, aberto às {aberto_em}, "
+              f"espera {circuito['espera']:.0f}s) {circuito['ultimo_erro'] or ''}")
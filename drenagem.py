@@ -0,0 +1,81 @@
+"""
+Drenagem no SIGTERM: parar de pegar leads e sair limpo dentro da janela do systemd.
+
+O gestao_leads_bot.service manda SIGTERM e, TimeoutStopSec=30 depois, SIGKILL.
+Antes, um deploy matava o worker no meio do wizard e a tentativa era perdida.
+Agora o SIGTERM só pede a drenagem:
+
+- o agendador para de reservar lotes e as filas param de pegar prospectos;
+- o prospecto em andamento termina se as etapas que faltam cabem no prazo
+  (estimativa pelo histórico de duração das etapas); senão é interrompido
+  num ponto seguro, antes de uma ETAPA começar, e devolvido à fila sem gastar a
+  tentativa. A ETAPA 9 (SALVAR) nunca começa sem caber no prazo;
+- se o prazo PRAZO_DRENAGEM_S estourar (ou chegar um segundo SIGTERM), a
+  thread principal é interrompida (KeyboardInterrupt) e os finally fecham
+  Chrome e conexões antes do SIGKILL.
+"""
+import os
+import time
+import signal
+import logging
+import threading
+import servidor_saude
+
+logger = logging.getLogger(__name__)
+
+# Abaixo do TimeoutStopSec=30: sobra tempo para fechar o Chrome e as conexões
+PRAZO_DRENAGEM_S = float(os.environ.get('PRAZO_DRENAGEM_S', '22'))
+
+_pedido = threading.Event()
+_prazo = None
+
+
+class InterrompidoPorDrenagem(Exception):
+    """Prospecto interrompido num ponto seguro porque o processo está encerrando."""
+
+
+def instalar():
+    """Trata SIGTERM pedindo a drenagem (chamar da thread principal)."""
+    signal.signal(signal.SIGTERM, _ao_sinal)
+
+
+def _ao_sinal(signum, frame):
+    if _pedido.is_set():
+        logger.warning("⛔ Segundo SIGTERM: encerrando sem esperar a drenagem")
+        raise KeyboardInterrupt
+    pedir(f"sinal {signal.Signals(signum).name}")
+
+
+def pedir(motivo='encerramento'):
+    """Inicia a drenagem; depois de PRAZO_DRENAGEM_S interrompe a thread principal."""
+    global _prazo
+    if _pedido.is_set():
+        return
+    _prazo = time.monotonic() + PRAZO_DRENAGEM_S
+    _pedido.set()
+    servidor_saude.marcar_drenagem()
+    logger.warning(f"🛑 Drenagem iniciada ({motivo}): nenhum prospecto novo, prazo de {PRAZO_DRENAGEM_S:.0f}s")
+    vigia = threading.Timer(PRAZO_DRENAGEM_S, _estourar)
+    vigia.daemon = True
+    vigia.start()
+
+
+def _estourar():
+    logger.error(f"⏱️ Prazo de drenagem ({PRAZO_DRENAGEM_S:.0f}s) estourado: interrompendo o processo")
+    signal.pthread_kill(threading.main_thread().ident, signal.SIGINT)
+
+
+def drenando():
+    return _pedido.is_set()
+
+
+def restante():
+    """Segundos até o fim do prazo (infinito fora da drenagem)."""
+    if not _pedido.is_set():
+        return float('inf')
+    return max(0.0, _prazo - time.monotonic())
+
+
+def esperar(segundos):
+    """time.sleep que acorda na hora se a drenagem for pedida. Retorna True se drenando."""
+    return _pedido.wait(segundos)
@@ -0,0 +1,95 @@
+"""
+Pré-filtro de elegibilidade em lote.
+
+Resolve de uma vez, com uma única consulta `= ANY(%s)` no banco primário,
+quais prospectos de um lote podem rodar, quais já esgotaram as tentativas,
+quais falharam por um motivo que outra tentativa não resolve (classe_erro,
+ver classificador_falhas.py) e quais ainda estão no intervalo de espera da última falha (proxima_tentativa_em,
+ver politica_retentativa.py) e quais já foram finalizados. O resultado fica
+em cache durante o lote e também guarda (id, tentativas) de cada linha, para
+o salvar_prospecto não precisar buscar de novo o registro no primeiro status
+da execução.
+"""
+import logging
+import datetime
+from classificador_falhas import retentavel
+from politica_retentativa import MAX_TENTATIVAS, esgotado
+
+logger = logging.getLogger(__name__)
+
+
+class ResultadoElegibilidade:
+    """Conjuntos de IDs do Hubsoft separados por situação."""
+
+    def __init__(self):
+        self.executaveis = set()
+        self.esgotados = set()
+        self.nao_retentaveis = {}  # id_prospecto_hubsoft -> classe_erro
+        self.adiados = {}  # id_prospecto_hubsoft -> proxima_tentativa_em
+        self.finalizados = set()
+        self.registros = {}  # id_prospecto_hubsoft -> (id, tentativas_processamento)
+
+    def situacao(self, id_prospecto):
+        id_prospecto = str(id_prospecto)
+        if id_prospecto in self.finalizados:
+            return "finalizado"
+        if id_prospecto in self.esgotados:
+            return "esgotado"
+        if id_prospecto in self.nao_retentaveis:
+            return "nao_retentavel"
+        if id_prospecto in self.adiados:
+            return "adiado"
+        return "executavel"
+
+
+class ServicoElegibilidade:
+    """Classifica lotes de prospectos consultando o banco primário uma vez por lote."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cache = {}  # id_prospecto_hubsoft -> (id, tentativas, status, classe_erro, proxima_tentativa_em)
+
+    def classificar(self, ids_prospectos):
+        ids = [str(i) for i in ids_prospectos]
+        faltantes = [i for i in ids if i not in self.cache]
+        if faltantes:
+            try:
+                cursor = self.conn.cursor()
+                cursor.execute(
+                    "SELECT id_prospecto_hubsoft, id, tentativas_processamento, status, classe_erro, "
+                    "proxima_tentativa_em FROM prospectos WHERE id_prospecto_hubsoft = ANY(%s)",
+                    (faltantes,)
+                )
+                for id_hubsoft, id_registro, tentativas, status, classe_erro, proxima in cursor.fetchall():
+                    self.cache[str(id_hubsoft)] = (id_registro, tentativas or 0, status, classe_erro, proxima)
+                cursor.close()
+            except Exception as e:
+                # Mesmo comportamento do check antigo: na dúvida, deixa rodar
+                logger.warning(f"⚠️ Erro ao verificar tentativas: {e}")
+                try:
+                    self.conn.rollback()
+                except Exception:
+                    pass
+
+        resultado = ResultadoElegibilidade()
+        agora = datetime.datetime.now()
+        for id_prospecto in ids:
+            registro = self.cache.get(id_prospecto)
+            if registro is None:
+                resultado.executaveis.add(id_prospecto)
+                continue
+            id_registro, tentativas, status, classe_erro, proxima = registro
+            resultado.registros[id_prospecto] = (id_registro, tentativas)
+            if status == 'finalizado':
+                resultado.finalizados.add(id_prospecto)
+            elif tentativas >= MAX_TENTATIVAS:
+                resultado.esgotados.add(id_prospecto)
+            elif status == 'erro' and not retentavel(classe_erro):
+                resultado.nao_retentaveis[id_prospecto] = classe_erro
+            elif status == 'erro' and esgotado(classe_erro, tentativas):
+                resultado.esgotados.add(id_prospecto)
+            elif status == 'erro' and proxima is not None and proxima > agora:
+                resultado.adiados[id_prospecto] = proxima
+            else:
+                resultado.executaveis.add(id_prospecto)
+        return resultado
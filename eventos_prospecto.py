@@ -0,0 +1,146 @@
+"""
+Histórico append-only das ETAPAS de cada prospecto (tabela prospecto_eventos).
+
+O salvar_prospecto sobrescreve a linha de `prospectos` a cada ETAPA. Assim a
+trilha de uma tentativa, o tempo de cada ETAPA e o erro das tentativas
+anteriores se perdiam, e qualquer análise tinha de ser refeita a partir do
+syslog. Agora cada fim de ETAPA (sucesso, erro ou repetição) e cada desfecho
+fora das ETAPAS (já convertido, erro geral, devolvido na drenagem) vira uma
+linha nova em prospecto_eventos, no banco primário.
+
+Nada disso custa ida ao banco no caminho do lead:
+- registrar() só põe o evento num buffer em memória;
+- uma thread descarrega o buffer com um INSERT de várias linhas a cada
+  EVENTOS_INTERVALO_S segundos, ou antes disso quando junta EVENTOS_LOTE eventos;
+- o que sobrar é descarregado no fim do processo (atexit).
+
+Banco fora do ar: os eventos esperam no buffer até EVENTOS_MAX_PENDENTES, e
+depois os mais antigos são descartados (o robô nunca para por causa do
+histórico). Um SIGKILL perde no máximo o último intervalo.
+
+A tabela é particionada por mês em ts (migração 6 em migracoes.py). A
+partição do mês é criada pelo próprio gravador, e meses antigos saem com
+DROP TABLE prospecto_eventos_AAAA_MM, sem DELETE.
+
+Exemplo: p90 de cada ETAPA na última semana
+    SELECT etapa, percentile_cont(0.9) WITHIN GROUP (ORDER BY duracao_ms)
+    FROM prospecto_eventos WHERE ts > now() - interval '7 days' AND classe_erro IS NULL AND etapa IS NOT NULL
+    GROUP BY etapa ORDER BY etapa;
+"""
+import os
+import atexit
+import datetime
+import logging
+import threading
+import collections
+import psycopg2
+from psycopg2.extras import execute_values
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE = int(os.environ.get('EVENTOS_LOTE', '200'))
+INTERVALO_S = float(os.environ.get('EVENTOS_INTERVALO_S', '5'))
+MAX_PENDENTES = int(os.environ.get('EVENTOS_MAX_PENDENTES', '10000'))
+
+# Tabela e garantir_particao_eventos(): migração 6 (migracoes.py), na inicialização do robô
+COLUNAS = ('ts', 'run_id', 'id_prospecto_hubsoft', 'tentativa', 'etapa', 'repeticao',
+           'status', 'duracao_ms', 'classe_erro', 'erro')
+SQL_INSERIR = f"INSERT INTO prospecto_eventos ({', '.join(COLUNAS)}) VALUES %s"
+
+
+class RegistroEventos:
+    """Buffer de eventos com descarga em lote numa conexão própria."""
+
+    _compartilhado = None
+    _lock_instancia = threading.Lock()
+
+    def __init__(self, db_config):
+        self.db_config = db_config
+        self.conn = None
+        self.pendentes = collections.deque()
+        self.lock = threading.Lock()  # Buffer (threads dos workers)
+        self.lock_descarga = threading.Lock()  # Conexão (thread de descarga e atexit)
+        self.acordar = threading.Event()
+        self.thread = None
+        self.descartados = 0
+        self.falhando = False
+
+    @classmethod
+    def compartilhado(cls, db_config):
+        """Instância única por processo (um buffer e uma conexão para todas as threads)."""
+        with cls._lock_instancia:
+            if cls._compartilhado is None:
+                cls._compartilhado = cls(db_config)
+            return cls._compartilhado
+
+    def registrar(self, status, id_prospecto_hubsoft=None, run_id=None, tentativa=None, etapa=None,
+                  repeticao=None, duracao_ms=None, classe_erro=None, erro=None):
+        """Enfileira um evento; não toca o banco."""
+        evento = (datetime.datetime.now(datetime.timezone.utc), run_id,
+                  None if id_prospecto_hubsoft is None else str(id_prospecto_hubsoft),
+                  tentativa, etapa, repeticao, status, duracao_ms, classe_erro, erro[:500] if erro else None)
+        with self.lock:
+            if len(self.pendentes) >= MAX_PENDENTES:
+                self.pendentes.popleft()
+                self.descartados += 1
+            self.pendentes.append(evento)
+            cheio = len(self.pendentes) >= TAMANHO_LOTE
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._laco, name='eventos-prospecto', daemon=True)
+                self.thread.start()
+                atexit.register(self.descarregar)
+        if cheio:
+            self.acordar.set()
+
+    def _laco(self):
+        while True:
+            self.acordar.wait(INTERVALO_S)
+            self.acordar.clear()
+            self.descarregar()
+
+    def _conectar(self):
+        if self.conn is None or self.conn.closed:
+            self.conn = psycopg2.connect(**self.db_config, connect_timeout=5,
+                                         options='-c statement_timeout=10000')
+
+    def descarregar(self):
+        """Grava o que estiver no buffer. Em falha, devolve os eventos ao buffer."""
+        with self.lock_descarga:
+            with self.lock:
+                lote = list(self.pendentes)
+                self.pendentes.clear()
+                descartados, self.descartados = self.descartados, 0
+            if descartados:
+                logger.warning(f"⚠️ {descartados} eventos de prospecto descartados (buffer cheio, banco indisponível)")
+            if not lote:
+                return 0
+            try:
+                self._conectar()
+                cursor = self.conn.cursor()
+                # Limites do lote: cobre a virada do mês no meio dele
+                cursor.execute("SELECT garantir_particao_eventos(%s), garantir_particao_eventos(%s)",
+                               (lote[0][0], lote[-1][0]))
+                execute_values(cursor, SQL_INSERIR, lote, page_size=TAMANHO_LOTE)
+                self.conn.commit()
+                cursor.close()
+            except Exception as e:
+                if not self.falhando:
+                    logger.error(f"❌ Falha ao gravar {len(lote)} eventos de prospecto (mantidos no buffer): {e}")
+                self.falhando = True
+                try:
+                    if self.conn:
+                        self.conn.close()
+                except Exception:
+                    pass
+                self.conn = None
+                with self.lock:
+                    # Mais antigos na frente; o excesso sai pelo começo, como no registrar
+                    self.pendentes.extendleft(reversed(lote))
+                    while len(self.pendentes) > MAX_PENDENTES:
+                        self.pendentes.popleft()
+                        self.descartados += 1
+                return 0
+            if self.falhando:
+                logger.info("✅ Gravação de eventos de prospecto restabelecida")
+                self.falhando = False
+            return len(lote)
@@ -0,0 +1,347 @@
+"""
+Gravador de voo: trilha de cada execução de prospecto para diagnóstico offline.
+
+Durante a execução ficam num buffer circular (memória limitada a
+GRAVADOR_EVENTOS eventos) o início e o fim de cada ETAPA, cada comando
+enviado ao navegador (comando WebDriver no Selenium, método CDP no backend
+CDP) com a latência, as requisições XHR/Fetch/Document do Hubsoft e, na
+falha, a URL, um recorte do DOM e o screenshot. Ao fim da execução a trilha
+vira um JSONL em gravacoes/ se a execução falhou ou foi lenta
+(GRAVADOR_VOO=falhas, padrão), sempre (GRAVADOR_VOO=sempre) ou nunca.
+
+Uso:
+    python3 gravador_voo.py                    # lista as gravações mais recentes
+    python3 gravador_voo.py <arquivo|run_id>   # linha do tempo e cascata da execução
+    python3 gravador_voo.py <run_id> --comandos    # inclui cada comando na linha do tempo
+"""
+import os
+import sys
+import json
+import glob
+import time
+import datetime
+import logging
+import argparse
+import threading
+import collections
+from backend_cdp import DriverCDP
+
+logger = logging.getLogger(__name__)
+
+GRAVADOR_VOO = os.environ.get('GRAVADOR_VOO', 'falhas').lower()
+GRAVADOR_EVENTOS = int(os.environ.get('GRAVADOR_EVENTOS', '5000'))
+# Execuções mais longas que isso são gravadas mesmo com sucesso
+GRAVADOR_LENTO_S = float(os.environ.get('GRAVADOR_LENTO_S', '300'))
+GRAVADOR_DOM_KB = int(os.environ.get('GRAVADOR_DOM_KB', '256'))
+GRAVADOR_MAX_ARQUIVOS = int(os.environ.get('GRAVADOR_MAX_ARQUIVOS', '500'))
+DIRETORIO_GRAVACOES = os.environ.get('DIRETORIO_GRAVACOES', 'gravacoes')
+
+TIPOS_REDE = ('XHR', 'Fetch', 'Document')
+EVENTOS_REDE = ('Network.requestWillBeSent', 'Network.responseReceived',
+                'Network.loadingFinished', 'Network.loadingFailed')
+MAX_REQUISICOES_ABERTAS = 500
+
+
+class GravadorVoo:
+    """Buffer de eventos de uma sessão do navegador, reiniciado a cada execução."""
+
+    def __init__(self, capacidade=GRAVADOR_EVENTOS, modo=GRAVADOR_VOO):
+        self.ativo = modo != 'nunca'
+        self.modo = modo
+        self.eventos = collections.deque(maxlen=capacidade)
+        self.lock = threading.Lock()
+        self.requisicoes = {}  # requestId -> evento de rede ainda aberto
+        self.ouvintes = []
+        self.driver = None
+        self.iniciar(None, None)
+
+    # --- Execução -------------------------------------------------------
+
+    def iniciar(self, run_id, id_prospecto):
+        with self.lock:
+            self.eventos.clear()
+            self.requisicoes.clear()
+            self.total = 0
+        self.run_id = run_id
+        self.prospecto = id_prospecto
+        self.inicio = time.time()
+        self.t0 = time.monotonic()
+
+    def registrar(self, tipo, t=None, **campos):
+        if not self.ativo:
+            return
+        evento = {'t': round((time.monotonic() - self.t0) * 1000 if t is None else t, 1), 'tipo': tipo}
+        evento.update(campos)
+        with self.lock:
+            self.eventos.append(evento)
+            self.total += 1
+
+    def finalizar(self, falhou):
+        """Grava a trilha conforme GRAVADOR_VOO. Retorna o caminho do arquivo ou None."""
+        if not self.ativo or self.run_id is None:
+            return None
+        duracao = time.monotonic() - self.t0
+        # Esvazia o log de performance mesmo sem gravar, senão ele cresce a sessão inteira
+        self.coletar_rede()
+        if self.modo != 'sempre' and not falhou and duracao < GRAVADOR_LENTO_S:
+            return None
+        with self.lock:
+            eventos = list(self.eventos)
+            descartados = self.total - len(eventos)
+        cabecalho = {
+            'tipo': 'cabecalho', 'run_id': self.run_id, 'prospecto': self.prospecto,
+            'inicio': datetime.datetime.fromtimestamp(self.inicio).isoformat(timespec='seconds'),
+            'duracao_ms': int(duracao * 1000), 'resultado': 'falha' if falhou else 'sucesso',
+            'descartados': descartados,
+        }
+        os.makedirs(DIRETORIO_GRAVACOES, exist_ok=True)
+        carimbo = datetime.datetime.fromtimestamp(self.inicio).strftime('%Y%m%d_%H%M%S')
+        arquivo = os.path.join(DIRETORIO_GRAVACOES, f"{carimbo}_{self.prospecto}_{self.run_id}.jsonl")
+        try:
+            with open(arquivo, 'w', encoding='utf-8') as f:
+                for evento in [cabecalho] + eventos:
+                    f.write(json.dumps(evento, ensure_ascii=False, default=str) + '\n')
+        except OSError as e:
+            logger.error(f"Não foi possível gravar a trilha da execução: {e}")
+            return None
+        _limpar_antigas()
+        logger.info(f"🎥 Trilha da execução gravada em {arquivo}")
+        return arquivo
+
+    # --- Instrumentação do driver ----------------------------------------
+
+    def instrumentar(self, driver):
+        """Mede cada comando do driver e passa a receber os eventos de rede da aba."""
+        if not self.ativo:
+            return
+        self.driver = driver
+        if isinstance(driver, DriverCDP):
+            self._instrumentar_cdp(driver)
+        else:
+            self._instrumentar_selenium(driver)
+
+    def _comando(self, nome, inicio, erro):
+        campos = {'nome': nome, 'ms': round((time.monotonic() - inicio) * 1000, 1)}
+        if erro:
+            campos['erro'] = erro
+        self.registrar('comando', t=(inicio - self.t0) * 1000, **campos)
+
+    def _instrumentar_selenium(self, driver):
+        # Todo comando WebDriver (inclusive dos WebElement) passa por driver.execute
+        original = driver.execute
+
+        def execute(comando, params=None):
+            if comando == 'getLog':
+                return original(comando, params)
+            inicio, erro = time.monotonic(), None
+            try:
+                return original(comando, params)
+            except Exception as e:
+                erro = type(e).__name__
+                raise
+            finally:
+                self._comando(comando, inicio, erro)
+
+        driver.execute = execute
+
+    def _instrumentar_cdp(self, driver):
+        aba, conexao = driver.aba, driver.navegador.conexao
+        original = aba.comando
+
+        async def comando(metodo, params=None, timeout=None):
+            inicio, erro = time.monotonic(), None
+            try:
+                if timeout is None:
+                    return await original(metodo, params)
+                return await original(metodo, params, timeout)
+            except Exception as e:
+                erro = type(e).__name__
+                raise
+            finally:
+                self._comando(metodo, inicio, erro)
+
+        aba.comando = comando
+        for metodo in EVENTOS_REDE:
+            self.ouvintes.append(conexao.ouvir(metodo, lambda p, m=metodo: self._rede(m, p), aba.session_id))
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+        except Exception:
+            pass
+
+    def desinstrumentar(self):
+        """Remove os ouvintes de rede (a conexão CDP pode sobreviver à aba)."""
+        if isinstance(self.driver, DriverCDP):
+            for ouvinte in self.ouvintes:
+                self.driver.navegador.conexao.remover_ouvinte(ouvinte)
+        self.ouvintes = []
+
+    def coletar_rede(self):
+        """No Selenium os eventos de rede ficam no log de performance do chromedriver: esvazia ele."""
+        if not self.ativo or self.driver is None or isinstance(self.driver, DriverCDP):
+            return
+        try:
+            entradas = self.driver.get_log('performance')
+        except Exception:
+            return
+        for entrada in entradas or []:
+            try:
+                mensagem = json.loads(entrada['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            if mensagem.get('method') in EVENTOS_REDE:
+                self._rede(mensagem['method'], mensagem.get('params', {}))
+
+    def _rede(self, metodo, params):
+        # Roda na thread do event loop CDP; iniciar() limpa as requisições na thread do worker
+        requisicao_id = params.get('requestId')
+        with self.lock:
+            if metodo == 'Network.requestWillBeSent':
+                if params.get('type') not in TIPOS_REDE or len(self.requisicoes) >= MAX_REQUISICOES_ABERTAS:
+                    return
+                # wallTime é o relógio de parede: vale para eventos lidos depois (log do Selenium)
+                self.requisicoes[requisicao_id] = {
+                    't': (params.get('wallTime', time.time()) - self.inicio) * 1000,
+                    'inicio': params.get('timestamp', 0),
+                    'url': params.get('request', {}).get('url', '')[:200],
+                    'metodo': params.get('request', {}).get('method'),
+                }
+                return
+            aberta = self.requisicoes.get(requisicao_id)
+            if aberta is None:
+                return
+            if metodo == 'Network.responseReceived':
+                aberta['status'] = params.get('response', {}).get('status')
+                return
+            del self.requisicoes[requisicao_id]
+        campos = {k: v for k, v in aberta.items() if k not in ('t', 'inicio')}
+        campos['ms'] = round((params.get('timestamp', aberta['inicio']) - aberta['inicio']) * 1000, 1)
+        if metodo == 'Network.loadingFailed':
+            campos['erro'] = params.get('errorText')
+        # Fora do lock: registrar() também o adquire
+        self.registrar('rede', t=aberta['t'], **campos)
+
+    def instantaneo(self, driver, motivo):
+        """URL e recorte do DOM no momento da falha."""
+        if not self.ativo:
+            return
+        try:
+            url = driver.current_url
+            dom = driver.execute_script("return document.documentElement.outerHTML;") or ''
+        except Exception as e:
+            self.registrar('dom', motivo=motivo, erro=str(e)[:200])
+            return
+        limite = GRAVADOR_DOM_KB * 1024
+        self.registrar('dom', motivo=motivo, url=url, tamanho=len(dom), html=dom[:limite])
+
+
+def _limpar_antigas():
+    arquivos = sorted(glob.glob(os.path.join(DIRETORIO_GRAVACOES, '*.jsonl')))
+    for arquivo in arquivos[:-GRAVADOR_MAX_ARQUIVOS]:
+        try:
+            os.remove(arquivo)
+        except OSError:
+            pass
+
+
+# --- Leitura (CLI) ---------------------------------------------------------
+
+def carregar(caminho_ou_run_id):
+    if os.path.exists(caminho_ou_run_id):
+        arquivo = caminho_ou_run_id
+    else:
+        candidatos = glob.glob(os.path.join(DIRETORIO_GRAVACOES, f"*{caminho_ou_run_id}*.jsonl"))
+        if not candidatos:
+            raise FileNotFoundError(f"Gravação não encontrada: {caminho_ou_run_id}")
+        arquivo = sorted(candidatos)[-1]
+    with open(arquivo, encoding='utf-8') as f:
+        linhas = [json.loads(linha) for linha in f if linha.strip()]
+    return linhas[0], linhas[1:]
+
+
+def etapas(eventos):
+    """(numero, inicio_ms, duracao_ms, codigo_erro) de cada ETAPA gravada."""
+    abertas, resultado = {}, []
+    for evento in eventos:
+        if evento['tipo'] == 'etapa_inicio':
+            abertas[evento['etapa']] = evento['t']
+        elif evento['tipo'] == 'etapa_fim':
+            inicio = abertas.pop(evento['etapa'], evento['t'] - evento.get('ms', 0))
+            resultado.append((evento['etapa'], inicio, evento.get('ms', evento['t'] - inicio), evento.get('codigo_erro')))
+    return resultado
+
+
+def _descrever(evento):
+    tipo = evento['tipo']
+    if tipo == 'etapa_inicio':
+        return f"▶ ETAPA {evento['etapa']}"
+    if tipo == 'etapa_fim':
+        situacao = f"❌ {evento['codigo_erro']}" if evento.get('codigo_erro') else "✅"
+        return f"■ ETAPA {evento['etapa']} {situacao} ({evento.get('ms', 0):.0f} ms)"
+    if tipo == 'comando':
+        return f"  {evento['nome']} {evento['ms']:.0f} ms" + (f" [{evento['erro']}]" if evento.get('erro') else "")
+    if tipo == 'rede':
+        situacao = evento.get('erro') or evento.get('status')
+        return f"  🌐 {evento.get('metodo')} {evento.get('url')} → {situacao} ({evento['ms']:.0f} ms)"
+    if tipo == 'dom':
+        return f"  📄 DOM na falha ({evento.get('motivo')}): {evento.get('url')} ({evento.get('tamanho', 0)} bytes)"
+    if tipo == 'screenshot':
+        return f"  📸 {evento.get('arquivo')}"
+    return f"  {tipo} {json.dumps({k: v for k, v in evento.items() if k not in ('t', 'tipo')}, ensure_ascii=False)[:120]}"
+
+
+def _barra(inicio, duracao, total, largura=50):
+    escala = largura / max(total, 1)
+    deslocamento = min(max(int(inicio * escala), 0), largura - 1)
+    return ' ' * deslocamento + '█' * min(max(1, int(duracao * escala)), largura - deslocamento)
+
+
+def mostrar(cabecalho, eventos, comandos=False, saida=sys.stdout):
+    total = max([cabecalho['duracao_ms']] + [e['t'] + e.get('ms', 0) for e in eventos])
+    print(f"Execução {cabecalho['run_id']} · prospecto {cabecalho['prospecto']} · {cabecalho['inicio']} · "
+          f"{cabecalho['resultado']} em {cabecalho['duracao_ms'] / 1000:.1f}s"
+          + (f" · {cabecalho['descartados']} eventos antigos descartados" if cabecalho.get('descartados') else ""),
+          file=saida)
+
+    print("\nLinha do tempo", file=saida)
+    for evento in sorted(eventos, key=lambda e: e['t']):
+        if evento['tipo'] == 'comando' and not comandos and not evento.get('erro'):
+            continue
+        print(f"{evento['t'] / 1000:>9.3f}s {_descrever(evento)}", file=saida)
+
+    print("\nCascata", file=saida)
+    for numero, inicio, duracao, erro in etapas(eventos):
+        print(f"ETAPA {numero:<3}{duracao / 1000:>8.2f}s |{_barra(inicio, duracao, total):<50}|"
+              + (f" {erro}" if erro else ""), file=saida)
+    rede = [e for e in eventos if e['tipo'] == 'rede']
+    for evento in sorted(rede, key=lambda e: e['t']):
+        rotulo = evento.get('url', '').split('?')[0].rstrip('/').rsplit('/', 1)[-1][:9]
+        print(f"{rotulo:<9}{evento['ms'] / 1000:>8.2f}s |{_barra(evento['t'], evento['ms'], total):<50}|"
+              f" {evento.get('erro') or evento.get('status')}", file=saida)
+
+    lentos = sorted((e for e in eventos if e['tipo'] == 'comando'), key=lambda e: -e['ms'])[:10]
+    if lentos:
+        print("\nComandos mais lentos", file=saida)
+        for evento in lentos:
+            print(f"{evento['t'] / 1000:>9.3f}s {evento['ms']:>9.0f} ms  {evento['nome']}", file=saida)
+
+
+def listar(limite=20, saida=sys.stdout):
+    arquivos = sorted(glob.glob(os.path.join(DIRETORIO_GRAVACOES, '*.jsonl')))[-limite:]
+    if not arquivos:
+        print(f"Nenhuma gravação em {DIRETORIO_GRAVACOES}/", file=saida)
+    for arquivo in arquivos:
+        with open(arquivo, encoding='utf-8') as f:
+            cabecalho = json.loads(f.readline())
+        print(f"{cabecalho['inicio']}  {cabecalho['run_id']}  prospecto {cabecalho['prospecto']:<8} "
+              f"{cabecalho['resultado']:<8}{cabecalho['duracao_ms'] / 1000:>8.1f}s", file=saida)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Linha do tempo e cascata de uma execução gravada')
+    parser.add_argument('gravacao', nargs='?', help='Arquivo .jsonl ou run_id (sem nada, lista as recentes)')
+    parser.add_argument('--comandos', action='store_true', help='Mostra cada comando do navegador na linha do tempo')
+    args = parser.parse_args()
+    if args.gravacao:
+        mostrar(*carregar(args.gravacao), comandos=args.comandos)
+    else:
+        listar()
@@ -0,0 +1,150 @@
+"""
+Limitador de taxa global (token bucket) para as interações com o Hubsoft.
+
+Todos os workers consultam o mesmo balde no banco primário antes de logins,
+buscas e salvamentos do wizard. Cada ação tem seu próprio orçamento
+(taxa por minuto e rajada máxima). O balde pode ficar negativo: quem chega
+com ele vazio reserva a próxima ficha e dorme até a vez dele, então cada
+consulta custa um único UPDATE e as esperas saem em ordem de chegada.
+
+O tempo gasto esperando é acumulado por ação, em memória e na própria
+tabela, para calibrar a concorrência máxima segura. Se o banco falhar, o
+limitador libera a ação (fail-open) para não parar a produção. Se a drenagem
+começar no meio de uma espera que não cabe mais no prazo, o prospecto é
+interrompido ali (InterrompidoPorDrenagem), antes da ação no Hubsoft.
+
+Orçamentos configuráveis pelo .env no formato "fichas_por_minuto/rajada",
+por exemplo LIMITE_LOGIN=6/2.
+"""
+import os
+import time
+import logging
+import threading
+import psycopg2
+import drenagem
+
+logger = logging.getLogger(__name__)
+
+
+def _orcamento(acao, padrao):
+    valor = os.environ.get(f"LIMITE_{acao.upper()}", padrao)
+    por_minuto, rajada = valor.split('/')
+    return float(por_minuto) / 60.0, float(rajada)
+
+
+# acao -> (fichas por segundo, capacidade do balde)
+ORCAMENTOS = {
+    'login': _orcamento('login', '6/2'),
+    'busca': _orcamento('busca', '40/5'),
+    'wizard': _orcamento('wizard', '12/3'),
+}
+
+# Tabela limites_taxa: migração 2 (migracoes.py), na inicialização do robô
+# Reabastece pelo tempo decorrido (relógio do banco, comum a todos) e consome uma ficha
+SQL_CONSUMIR = """
+    UPDATE limites_taxa SET
+        fichas = LEAST(%(capacidade)s,
+                       fichas + EXTRACT(EPOCH FROM clock_timestamp() - atualizado_em) * %(taxa)s) - 1,
+        atualizado_em = clock_timestamp(),
+        consumos = consumos + 1
+    WHERE acao = %(acao)s
+    RETURNING fichas
+"""
+
+
+class LimitadorTaxa:
+    """Token bucket compartilhado entre workers via PostgreSQL."""
+
+    _compartilhado = None
+    _lock_instancia = threading.Lock()
+
+    def __init__(self, db_config, orcamentos=None):
+        self.db_config = db_config
+        self.orcamentos = orcamentos or ORCAMENTOS
+        self.conn = None
+        self.lock = threading.Lock()
+        self.acoes_prontas = set()
+        # Métricas locais do processo: acao -> {consumos, esperas, segundos}
+        self.metricas = {acao: {'consumos': 0, 'esperas': 0, 'segundos': 0.0} for acao in self.orcamentos}
+
+    @classmethod
+    def compartilhado(cls, db_config):
+        """Instância única por processo (uma conexão para todas as threads)."""
+        with cls._lock_instancia:
+            if cls._compartilhado is None:
+                cls._compartilhado = cls(db_config)
+            return cls._compartilhado
+
+    def _conectar(self):
+        if self.conn is None or self.conn.closed:
+            self.conn = psycopg2.connect(**self.db_config)
+            self.conn.autocommit = True
+            self.acoes_prontas.clear()
+
+    def _garantir_acao(self, cursor, acao, capacidade):
+        if acao not in self.acoes_prontas:
+            cursor.execute(
+                "INSERT INTO limites_taxa (acao, fichas) VALUES (%s, %s) ON CONFLICT (acao) DO NOTHING",
+                (acao, capacidade)
+            )
+            self.acoes_prontas.add(acao)
+
+    def aguardar(self, acao):
+        """
+        Bloqueia até haver orçamento para a ação. Retorna os segundos esperados.
+        Lança InterrompidoPorDrenagem se a espera não couber no prazo da drenagem.
+        """
+        taxa, capacidade = self.orcamentos[acao]
+        try:
+            with self.lock:
+                self._conectar()
+                cursor = self.conn.cursor()
+                self._garantir_acao(cursor, acao, capacidade)
+                cursor.execute(SQL_CONSUMIR, {'acao': acao, 'taxa': taxa, 'capacidade': capacidade})
+                fichas = cursor.fetchone()[0]
+                espera = max(0.0, -fichas) / taxa
+                if espera > 0:
+                    cursor.execute(
+                        "UPDATE limites_taxa SET esperas = esperas + 1, espera_total_segundos = espera_total_segundos + %s WHERE acao = %s",
+                        (espera, acao)
+                    )
+                cursor.close()
+
+                metricas = self.metricas[acao]
+                metricas['consumos'] += 1
+                if espera > 0:
+                    metricas['esperas'] += 1
+                    metricas['segundos'] += espera
+        except Exception as e:
+            logger.error(f"Limitador de taxa indisponível ({acao}), seguindo sem limitar: {e}")
+            try:
+                if self.conn:
+                    self.conn.close()
+            except Exception:
+                pass
+            self.conn = None
+            return 0.0
+
+        if espera > 0:
+            logger.info(f"⏳ Limite de taxa '{acao}': aguardando {espera:.1f}s")
+            fim = time.monotonic() + espera
+            if drenagem.esperar(espera):
+                restante = fim - time.monotonic()
+                if restante > drenagem.restante():
+                    raise drenagem.InterrompidoPorDrenagem(
+                        f"limite de taxa '{acao}': faltam {restante:.0f}s de espera, restam {drenagem.restante():.0f}s de prazo")
+                # Cabe no prazo (ou a etapa já começou sabendo da drenagem): cumpre o resto da espera
+                time.sleep(max(0.0, restante))
+        return espera
+
+    def resumo(self):
+        """Métricas locais: consumos, quantas vezes esperou e tempo total esperando."""
+        return {acao: dict(valores) for acao, valores in self.metricas.items()}
+
+    def fechar(self):
+        with self.lock:
+            if self.conn:
+                try:
+                    self.conn.close()
+                finally:
+                    self.conn = None
@@ -0,0 +1,152 @@
+"""
+Logs estruturados do robô: uma linha JSON por evento, emitida sem bloquear.
+
+Cada linha leva, além de nível, subsistema (nome do logger) e mensagem, o
+contexto da execução em andamento: run_id (uma execução de um prospecto),
+prospecto, ETAPA e, quando informados em `extra`, duracao_ms, codigo_erro e
+classe_erro. Isso permite medir vazão e tempo por etapa direto do syslog, por exemplo:
+
+    journalctl -t gestao-leads-bot -o cat | jq 'select(.duracao_ms) | [.etapa, .duracao_ms]'
+
+O logger do chamador só enfileira o registro (QueueHandler); a formatação e a
+escrita na saída acontecem numa thread própria (QueueListener), então logar
+no meio do wizard não espera o stdout/syslog.
+
+Configuração:
+- NIVEL_LOG: nível padrão (INFO);
+- NIVEIS_LOG: níveis por subsistema, ex. "roteiro_wizard=DEBUG,backend_cdp=WARNING";
+- FORMATO_LOG: "json" ou "texto" (padrão: texto num terminal, json fora dele).
+"""
+import os
+import sys
+import json
+import uuid
+import queue
+import atexit
+import logging
+import datetime
+import contextvars
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+NIVEL_LOG = os.environ.get('NIVEL_LOG', 'INFO').upper()
+NIVEIS_LOG = os.environ.get('NIVEIS_LOG', '')
+FORMATO_LOG = os.environ.get('FORMATO_LOG', 'texto' if sys.stdout.isatty() else 'json').lower()
+
+# Campos opcionais copiados do registro para a linha JSON, nesta ordem
+CAMPOS = ('run_id', 'prospecto', 'etapa', 'duracao_ms', 'codigo_erro', 'classe_erro')
+
+# Contexto por thread/tarefa: cada aba do lote_abas.py roda numa thread com o seu
+_run_id = contextvars.ContextVar('run_id', default=None)
+_prospecto = contextvars.ContextVar('prospecto', default=None)
+_etapa = contextvars.ContextVar('etapa', default=None)
+
+_listener = None
+
+
+def iniciar_execucao(id_prospecto=None):
+    """Novo run_id para a execução de um prospecto (ou do login/lote, sem prospecto)."""
+    run_id = uuid.uuid4().hex[:12]
+    _run_id.set(run_id)
+    _prospecto.set(str(id_prospecto) if id_prospecto is not None else None)
+    _etapa.set(None)
+    return run_id
+
+
+def run_id_atual():
+    return _run_id.get()
+
+
+@contextmanager
+def na_etapa(numero):
+    """Marca os logs emitidos dentro do bloco com a ETAPA `numero`."""
+    token = _etapa.set(numero)
+    try:
+        yield
+    finally:
+        _etapa.reset(token)
+
+
+def contexto_atual():
+    return {'run_id': _run_id.get(), 'prospecto': _prospecto.get(), 'etapa': _etapa.get()}
+
+
+class _HandlerFila(QueueHandler):
+    """
+    Enfileira o registro já com o contexto da thread que logou (a thread do
+    listener não o enxerga) e com a mensagem resolvida, sem formatar o resto.
+    """
+
+    def prepare(self, record):
+        for campo, valor in contexto_atual().items():
+            if getattr(record, campo, None) is None:
+                setattr(record, campo, valor)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class FormatadorJson(logging.Formatter):
+    def format(self, record):
+        evento = {
+            'ts': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'subsistema': record.name,
+            'msg': record.getMessage(),
+        }
+        for campo in CAMPOS:
+            valor = getattr(record, campo, None)
+            if valor is not None:
+                evento[campo] = valor
+        if record.exc_text:
+            evento['excecao'] = record.exc_text
+        return json.dumps(evento, ensure_ascii=False, default=str)
+
+
+def _niveis_por_subsistema(texto):
+    niveis = {}
+    for item in texto.split(','):
+        if '=' in item:
+            nome, nivel = item.split('=', 1)
+            niveis[nome.strip()] = nivel.strip().upper()
+    return niveis
+
+
+def configurar(nivel=None, formato=None, saida=None):
+    """
+    Instala o handler em fila no logger raiz. Idempotente: chamadas seguintes
+    (vários módulos de entrada importados juntos) não duplicam as linhas.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    if (formato or FORMATO_LOG) == 'json':
+        formatador = FormatadorJson()
+    else:
+        formatador = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    destino = logging.StreamHandler(saida or sys.stdout)
+    destino.setFormatter(formatador)
+
+    fila = queue.SimpleQueue()
+    raiz = logging.getLogger()
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    raiz.addHandler(_HandlerFila(fila))
+    raiz.setLevel(nivel or NIVEL_LOG)
+    for nome, nivel_subsistema in _niveis_por_subsistema(NIVEIS_LOG).items():
+        logging.getLogger(nome).setLevel(nivel_subsistema)
+
+    _listener = QueueListener(fila, destino)
+    _listener.start()
+    atexit.register(encerrar)
+
+
+def encerrar():
+    """Escreve o que ainda está na fila e para a thread do listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
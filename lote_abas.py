@@ -0,0 +1,210 @@
+"""
+Vários prospectos em paralelo dentro de um único Chrome (backend CDP).
+
+Um processo do Chrome por prospecto custa centenas de MB de RAM. Aqui um só
+navegador hospeda N abas, cada uma com sua própria SessaoHubsoft e seu
+próprio ProspectoProcessor, todas consumindo a mesma fila do lote. Cada aba
+roda numa thread; como as esperas são orientadas a eventos no loop CDP
+compartilhado, enquanto uma aba espera o Hubsoft responder as outras seguem
+trabalhando.
+
+Contextos (MULTIPLEX_CONTEXTOS):
+- "compartilhado" (padrão): abas no mesmo contexto, o login feito na
+  primeira vale para as outras (mesmos cookies/localStorage);
+- "isolado": cada aba num Target.createBrowserContext próprio, com login
+  próprio (passa pelo limitador de taxa de logins).
+
+Memória: as abas do mesmo site dividem processos de renderer, então não há
+como medir uma aba sozinha. Uma VigiaRecursos do navegador mede o Chrome
+inteiro contra LIMITE_MEMORIA_CHROME_MB x abas. Passou do limite, as abas
+terminam o prospecto em andamento e param, e o lote reabre o navegador para
+o resto da fila. Fechar só a aba não devolvia a memória.
+"""
+import os
+import queue
+import shutil
+import threading
+import logging
+from backend_cdp import NavegadorCDP, DriverCDP
+from recursos import LIMITE_MEMORIA_CHROME_MB, VigiaRecursos
+import coletor_orfaos
+import drenagem
+from main_refatorado import (
+    ProspectoProcessor, SessaoHubsoft, ServicoElegibilidade, URL_LOGIN,
+    executar_etapa, consumir_fila, prospecto_elegivel, obter_headless, RESULTADO_RECUSA,
+    infraestrutura_liberada, infraestrutura_bloqueada,
+)
+
+logger = logging.getLogger(__name__)
+
+ABAS_POR_NAVEGADOR = int(os.environ.get('ABAS_POR_NAVEGADOR', '4'))
+MULTIPLEX_CONTEXTOS = os.environ.get('MULTIPLEX_CONTEXTOS', 'compartilhado').lower()
+
+# Abas em segundo plano não podem ter timers/renderização estrangulados pelo Chrome
+ARGUMENTOS_MULTIPLEX = (
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+)
+
+
+class NavegadorCompartilhado:
+    """Chrome único do lote; entrega abas já logadas no Hubsoft."""
+
+    def __init__(self, headless, usuario, senha, abas, contextos=MULTIPLEX_CONTEXTOS):
+        self.headless = headless
+        self.abas = abas
+        self.usuario = usuario
+        self.senha = senha
+        self.isolado = contextos == 'isolado'
+        self.temp_dir = coletor_orfaos.criar_perfil()
+        logger.info(f"⚙️ Configurando o Chrome compartilhado... (Modo headless: {'Sim' if headless else 'Não'}, contextos: {contextos})")
+        try:
+            self.navegador = NavegadorCDP.iniciar(headless, self.temp_dir, ARGUMENTOS_MULTIPLEX)
+        except Exception:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            raise
+        coletor_orfaos.registrar_grupo(self.temp_dir, self.navegador.processo.pid)
+        self.lock_login = threading.Lock()
+        self.logado = False
+        # Memória do Chrome inteiro; a decisão de reciclar é do navegador, não de cada aba
+        self.vigia = VigiaRecursos(self.navegador.processo.pid, limite_mb=LIMITE_MEMORIA_CHROME_MB * abas)
+        self.reciclar = False
+
+    def abrir_sessao(self, processor):
+        """Nova aba com a lista de Prospectos aberta (login só quando necessário)."""
+        contexto = self.navegador.executar(self.navegador.criar_contexto()) if self.isolado else None
+        aba = self.navegador.executar(self.navegador.nova_aba(contexto))
+        sessao = SessaoHubsoft(self.headless, driver=DriverCDP(self.navegador, aba, dono_do_navegador=False))
+        # A vigia da aba só mede o custo de cada prospecto (Chrome inteiro, aproximado); fechar
+        # a aba não devolve a memória do navegador, que é reciclado por precisa_reciclar()
+        sessao.vigia.limite_mb = float('inf')
+        try:
+            if self.isolado:
+                self._login(sessao, processor)
+            else:
+                # Uma aba loga por vez; as demais reaproveitam a sessão do contexto
+                with self.lock_login:
+                    if self.logado and self._reaproveitar_login(sessao, processor):
+                        return sessao
+                    self._login(sessao, processor)
+                    self.logado = True
+        except Exception:
+            sessao.encerrar()
+            raise
+        return sessao
+
+    def _login(self, sessao, processor):
+        executar_etapa(sessao, processor, None, None, 1, self.usuario, self.senha)
+        executar_etapa(sessao, processor, None, None, 2)
+
+    def _reaproveitar_login(self, sessao, processor):
+        sessao.driver.get(URL_LOGIN.rsplit('/login', 1)[0] + '/')
+        sessao.monitor.sessao_ativa = True
+        try:
+            executar_etapa(sessao, processor, None, None, 2)
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Aba não herdou o login ({e}); fazendo login nela")
+            sessao.monitor.sessao_ativa = False
+            return False
+
+    def precisa_reciclar(self):
+        """Chrome acima do limite: as abas param entre prospectos e o lote reabre o navegador."""
+        if not self.reciclar:
+            with self.vigia.lock:
+                memoria = self.vigia.ultima['pss_mb'] if self.vigia.ultima else 0
+            if memoria > self.vigia.limite_mb:
+                logger.info(f"♻️ Chrome compartilhado com {memoria:.0f} MB (limite {self.vigia.limite_mb:.0f} MB); "
+                            "reciclando o navegador depois dos prospectos em andamento")
+                self.reciclar = True
+        return self.reciclar
+
+    def fechar(self):
+        self.vigia.encerrar()
+        try:
+            self.navegador.fechar()
+        finally:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+def trabalhador(navegador, fila, elegibilidade, resultados):
+    """Uma aba: conexões de banco próprias (psycopg2 não é compartilhável entre threads)."""
+    processor = ProspectoProcessor()
+    if not processor.conectar_banco():
+        logger.error("❌ Falha ao conectar ao banco de dados")
+        return
+    try:
+        consumir_fila(fila, lambda: navegador.abrir_sessao(processor), processor, elegibilidade, resultados,
+                      parar=navegador.precisa_reciclar)
+    except Exception as e:
+        # Login/navegação falhou nesta aba: as outras seguem consumindo a fila
+        logger.error(f"ERRO NA ABA: {e}")
+    finally:
+        processor.desconectar_banco()
+
+
+def processar_lote_abas(prospectos, abas=ABAS_POR_NAVEGADOR):
+    """
+    Mesmo contrato do processar_lote, com os prospectos divididos entre
+    `abas` abas de um único Chrome.
+    """
+    resultados = {}
+    if not infraestrutura_liberada():
+        return resultados
+    processor = ProspectoProcessor()
+    if not processor.conectar_banco():
+        logger.error("❌ Falha ao conectar ao banco de dados")
+        return resultados
+
+    headless = obter_headless()
+    usuario = os.environ.get('USUARIO', '')
+    senha = os.environ.get('SENHA', '')
+    if not usuario or not senha:
+        logger.error("❌ Credenciais não encontradas no arquivo .env")
+        processor.desconectar_banco()
+        return resultados
+
+    elegibilidade = ServicoElegibilidade(processor.conn).classificar([p[1] for p in prospectos])
+    processor.desconectar_banco()
+
+    fila = queue.Queue()
+    for nome_filtro, id_prospecto in prospectos:
+        id_prospecto = str(id_prospecto)
+        if prospecto_elegivel(nome_filtro, id_prospecto, elegibilidade):
+            fila.put((nome_filtro, id_prospecto))
+        else:
+            resultados[id_prospecto] = RESULTADO_RECUSA.get(elegibilidade.situacao(id_prospecto), "ignorado")
+
+    if fila.empty():
+        logger.info(f"📦 Lote sem prospectos executáveis ({len(prospectos)} recusados)")
+        return resultados
+
+    abas = max(1, min(abas, fila.qsize()))
+    logger.info(f"📦 Iniciando lote com {len(prospectos)} prospectos em {abas} abas de um único Chrome")
+    while True:
+        try:
+            navegador = NavegadorCompartilhado(headless, usuario, senha, abas)
+        except Exception as e:
+            logger.error(f"ERRO NO LOTE: {e}")
+            return resultados
+
+        try:
+            threads = [
+                threading.Thread(target=trabalhador, args=(navegador, fila, elegibilidade, resultados), name=f"aba-{i + 1}")
+                for i in range(abas)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            navegador.fechar()
+        # Navegador reciclado: o resto da fila segue num Chrome novo
+        if not navegador.reciclar or fila.empty() or drenagem.drenando() or infraestrutura_bloqueada():
+            break
+        abas = max(1, min(abas, fila.qsize()))
+
+    sucessos = sum(1 for r in resultados.values() if r == "sucesso")
+    logger.info(f"📦 Lote finalizado: {sucessos}/{len(prospectos)} convertidos")
+    return resultados
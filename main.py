@@ -17,8 +17,10 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
 import logging
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+import log_estruturado
+
+# Configurar logging (linhas JSON por fila, ver log_estruturado.py)
+log_estruturado.configurar()
 logger = logging.getLogger(__name__)
 
 # Carregar variáveis do arquivo .env
@@ -54,19 +56,19 @@ def main(nome_filtro=None, id_prospecto=None):
     if id_prospecto is None:
         id_prospecto = "1505"
     
-    print(f"Nome para filtro: {nome_filtro}")
-    print(f"ID do prospecto para ação: {id_prospecto}")
+    logger.info(f"Nome para filtro: {nome_filtro}")
+    logger.info(f"ID do prospecto para ação: {id_prospecto}")
     
     # Obter credenciais do .env
     usuario = os.environ.get('USUARIO', '')
     senha = os.environ.get('SENHA', '')
     
     if not usuario:
-        print("AVISO: Email do usuário não encontrado no arquivo .env")
+        logger.warning("AVISO: Email do usuário não encontrado no arquivo .env")
         usuario = input("Digite o email do usuário: ")
     
     if not senha:
-        print("AVISO: Senha não encontrada no arquivo .env")
+        logger.warning("AVISO: Senha não encontrada no arquivo .env")
         senha = input("Digite a senha: ")
     
     # Criar pasta para screenshots
@@ -84,7 +86,7 @@ def main(nome_filtro=None, id_prospecto=None):
     log_filename = f"{requests_dir}/requests_log_{timestamp}.csv"
     network_file = f"{requests_dir}/network_details_{timestamp}.json"
     
-    print(f"Configurando o Chrome... (Modo headless: {'Sim' if headless else 'Não'})")
+    logger.info(f"Configurando o Chrome... (Modo headless: {'Sim' if headless else 'Não'})")
     
     # Configurações do Chrome
     chrome_options = Options()
@@ -117,7 +119,7 @@ def main(nome_filtro=None, id_prospecto=None):
     
     # Tente iniciar o Chrome
     try:
-        print("Iniciando o Chrome...")
+        logger.info("Iniciando o Chrome...")
         driver = webdriver.Chrome(options=chrome_options)
         
         # Configuração para captura de rede usando CDP
@@ -128,7 +130,7 @@ def main(nome_filtro=None, id_prospecto=None):
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"{screenshots_dir}/{timestamp}_{nome}.png"
             driver.save_screenshot(filename)
-            print(f"Screenshot '{nome}' salvo como '{filename}'")
+            logger.info(f"Screenshot '{nome}' salvo como '{filename}'")
             return filename
             
         # Função para registrar requisições com detalhes
@@ -169,7 +171,7 @@ def main(nome_filtro=None, id_prospecto=None):
             all_requests.append(req_entry)
             
             # Log para console
-            print(f"Requisição registrada: {method} {url} ({status_code})")
+            logger.info(f"Requisição registrada: {method} {url} ({status_code})")
             return req_entry
         
         # Configurar interceptação de requisições
@@ -183,7 +185,7 @@ def main(nome_filtro=None, id_prospecto=None):
         
         # Função para iniciar captura de rede para uma etapa específica
         def iniciar_captura_rede(etapa_descricao):
-            print(f"=== Iniciando captura de rede para: {etapa_descricao} ===")
+            logger.info(f"=== Iniciando captura de rede para: {etapa_descricao} ===")
             
             # Limpar logs anteriores
             driver.get_log('browser')
@@ -198,7 +200,7 @@ def main(nome_filtro=None, id_prospecto=None):
         # Função para capturar detalhes de rede durante uma etapa
         def capturar_requisicoes(etapa_descricao):
             etapa_atual = etapa_descricao
-            print(f"Capturando requisições para: {etapa_atual}")
+            logger.info(f"Capturando requisições para: {etapa_atual}")
             
             # Capturar logs de performance
             perf_logs = driver.get_log('performance')
@@ -245,7 +247,7 @@ def main(nome_filtro=None, id_prospecto=None):
                             'mime': resp['response'].get('mimeType', '')
                         }
                 except Exception as e:
-                    print(f"Erro ao processar log: {e}")
+                    logger.error(f"Erro ao processar log: {e}")
             
             # Combinar informações de requisição e resposta
             for req in requisicoes:
@@ -265,7 +267,7 @@ def main(nome_filtro=None, id_prospecto=None):
                     )
             
             count = len(requisicoes)
-            print(f"Capturadas {count} requisições na etapa: {etapa_atual}")
+            logger.debug(f"Capturadas {count} requisições na etapa: {etapa_atual}")
             
             # Salvar continuamente o arquivo de log para não perder dados
             salvar_requisicoes_csv()
@@ -280,7 +282,7 @@ def main(nome_filtro=None, id_prospecto=None):
                 return
             
             total_reqs = len(all_requests)
-            logger.info(f"Salvando {total_reqs} requisições nos arquivos de log...")
+            logger.debug(f"Salvando {total_reqs} requisições nos arquivos de log...")
             
             # Salvamento em CSV
             try:
@@ -292,14 +294,9 @@ def main(nome_filtro=None, id_prospecto=None):
                     writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
                     writer.writeheader()
                     
-                    # Adicionar barra de progresso para arquivos grandes
-                    for i, req in enumerate(all_requests):
-                        writer.writerow(req)
-                        # Mostrar progresso a cada 50 itens
-                        if (i + 1) % 50 == 0 or i + 1 == total_reqs:
-                            logger.info(f"Progresso CSV: {i + 1}/{total_reqs} requisições ({(i + 1) / total_reqs * 100:.1f}%)")
+                    writer.writerows(all_requests)
                 
-                logger.info(f"✅ Arquivo CSV salvo com sucesso em: {log_filename}")
+                logger.debug(f"✅ Arquivo CSV salvo com sucesso em: {log_filename}")
             except Exception as e:
                 logger.error(f"❌ Erro ao salvar arquivo CSV: {e}")
                 # Tentar salvar em um arquivo de backup
@@ -340,7 +337,7 @@ def main(nome_filtro=None, id_prospecto=None):
                     
                     json.dump(sanitized_requests, jsonfile, indent=2, ensure_ascii=False)
                 
-                logger.info(f"✅ Arquivo JSON salvo com sucesso em: {network_file}")
+                logger.debug(f"✅ Arquivo JSON salvo com sucesso em: {network_file}")
             except Exception as e:
                 logger.error(f"❌ Erro ao salvar arquivo JSON: {e}")
                 # Tentar salvar em formato simplificado
@@ -388,36 +385,35 @@ def main(nome_filtro=None, id_prospecto=None):
                     for status, count in status_codes.items():
                         statsfile.write(f"Status {status}: {count} requisições ({count/total_reqs*100:.1f}%)\n")
                 
-                logger.info(f"✅ Arquivo de estatísticas salvo em: {stats_file}")
+                logger.debug(f"✅ Arquivo de estatísticas salvo em: {stats_file}")
             except Exception as e:
                 logger.error(f"❌ Erro ao criar arquivo de estatísticas: {e}")
             
-            print(f"\n📊 Logs de requisições salvos com sucesso!")
-            print(f"📄 CSV: {log_filename}")
-            print(f"📄 JSON: {network_file}")
-            print(f"📄 Estatísticas: {stats_file if 'stats_file' in locals() else 'Não gerado'}")
+            # Chamado a cada captura: resumo só em DEBUG para não inundar o syslog
+            logger.debug(f"📊 Logs de requisições salvos: CSV {log_filename}, JSON {network_file}, "
+                         f"estatísticas {stats_file if 'stats_file' in locals() else 'não gerado'}")
 
     except Exception as e:
-        print(f"Falha ao iniciar o Chrome: {e}")
-        print("Por favor, verifique se o Google Chrome está instalado no sistema.")
+        logger.error(f"Falha ao iniciar o Chrome: {e}")
+        logger.info("Por favor, verifique se o Google Chrome está instalado no sistema.")
         # Tentar capturar screenshot em caso de erro
         try:
             driver.save_screenshot(f"screenshots/erro_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
-            print("Screenshot do erro salvo")
+            logger.info("Screenshot do erro salvo")
         except Exception:
-            print("Não foi possível salvar screenshot do erro")
+            logger.warning("Não foi possível salvar screenshot do erro")
         return
 
     # Navegar para a URL
     try:
-        print("=== ETAPA 1: Acessando a página de login ===")
+        logger.info("=== ETAPA 1: Acessando a página de login ===")
         etapa_atual = iniciar_captura_rede("Acesso à página de login")
         driver.get("https://megalinktelecom.hubsoft.com.br/login")
         capturar_screenshot("01_pagina_login")
         capturar_requisicoes(etapa_atual)
         
         # Aguardar até que o campo de email esteja visível e disponível
-        print("Aguardando carregamento da página...")
+        logger.info("Aguardando carregamento da página...")
         wait = WebDriverWait(driver, 15)  # Aumentando o tempo de espera para 15 segundos
         
         # Tentar vários seletores possíveis para o campo de email
@@ -426,23 +422,23 @@ def main(nome_filtro=None, id_prospecto=None):
             email_input = wait.until(
                 EC.presence_of_element_located((By.NAME, "email"))
             )
-            print("Campo de email localizado pelo atributo 'name'")
+            logger.info("Campo de email localizado pelo atributo 'name'")
         except Exception:
             try:
                 # Segunda tentativa: usar o id="input_0"
                 email_input = wait.until(
                     EC.presence_of_element_located((By.ID, "input_0"))
                 )
-                print("Campo de email localizado pelo atributo 'id'")
+                logger.info("Campo de email localizado pelo atributo 'id'")
             except Exception:
                 # Terceira tentativa: usar um seletor CSS mais genérico
                 email_input = wait.until(
                     EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='email']"))
                 )
-                print("Campo de email localizado pelo seletor CSS")
+                logger.info("Campo de email localizado pelo seletor CSS")
         
-        print("=== ETAPA 2: Preenchendo o campo de email ===")
-        print(f"Preenchendo o campo com o email: {usuario}")
+        logger.info("=== ETAPA 2: Preenchendo o campo de email ===")
+        logger.info(f"Preenchendo o campo com o email: {usuario}")
         email_input.clear()  # Limpar o campo primeiro
         etapa_atual = iniciar_captura_rede("Preenchimento do campo de email")
         email_input.send_keys(usuario)
@@ -452,9 +448,9 @@ def main(nome_filtro=None, id_prospecto=None):
         # Esperar um pouco para garantir que o formulário reconheça a entrada (ativa o botão)
         time.sleep(1)
         
-        print("=== ETAPA 3: Clicando no botão Validar ===")
+        logger.info("=== ETAPA 3: Clicando no botão Validar ===")
         # Localizar o botão "Validar" e clicar nele
-        print("Procurando o botão Validar...")
+        logger.info("Procurando o botão Validar...")
         
         # Tentativas diferentes para localizar o botão
         try:
@@ -462,40 +458,40 @@ def main(nome_filtro=None, id_prospecto=None):
             validar_button = wait.until(
                 EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Validar')]"))
             )
-            print("Botão Validar localizado pelo texto")
+            logger.info("Botão Validar localizado pelo texto")
         except:
             try:
                 # Tentativa 2: Pelo aria-label
                 validar_button = wait.until(
                     EC.element_to_be_clickable((By.XPATH, "//button[@aria-label='Validar']"))
                 )
-                print("Botão Validar localizado pelo aria-label")
+                logger.info("Botão Validar localizado pelo aria-label")
             except:
                 try:
                     # Tentativa 3: Pela classe CSS
                     validar_button = wait.until(
                         EC.element_to_be_clickable((By.CSS_SELECTOR, "button.submit-button"))
                     )
-                    print("Botão Validar localizado pela classe CSS")
+                    logger.info("Botão Validar localizado pela classe CSS")
                 except:
                     # Tentativa 4: Qualquer botão tipo submit
                     validar_button = wait.until(
                         EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit']"))
                     )
-                    print("Botão Validar localizado pelo tipo 'submit'")
+                    logger.info("Botão Validar localizado pelo tipo 'submit'")
         
         # Clicar no botão Validar
-        print("Clicando no botão Validar...")
+        logger.info("Clicando no botão Validar...")
         etapa_atual = iniciar_captura_rede("Clique no botão Validar")
         validar_button.click()
         capturar_screenshot("03_botao_validar_clicado")
         capturar_requisicoes(etapa_atual)
         
-        print("Botão Validar clicado com sucesso!")
+        logger.info("Botão Validar clicado com sucesso!")
         
-        print("=== ETAPA 4: Aguardando o campo de senha ===")
+        logger.info("=== ETAPA 4: Aguardando o campo de senha ===")
         # Aguardar o campo de senha aparecer
-        print("Aguardando o campo de senha...")
+        logger.info("Aguardando o campo de senha...")
         
         # Tentar vários seletores possíveis para localizar o campo de senha
         try:
@@ -503,46 +499,46 @@ def main(nome_filtro=None, id_prospecto=None):
             password_input = wait.until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='password'][name='password']"))
             )
-            print("Campo de senha localizado pelo tipo e nome")
+            logger.info("Campo de senha localizado pelo tipo e nome")
         except:
             try:
                 # Tentativa 2: Pelo ID
                 password_input = wait.until(
                     EC.presence_of_element_located((By.ID, "input_2"))
                 )
-                print("Campo de senha localizado pelo ID")
+                logger.info("Campo de senha localizado pelo ID")
             except:
                 try:
                     # Tentativa 3: Pelo placeholder
                     password_input = wait.until(
                         EC.presence_of_element_located((By.XPATH, "//input[@placeholder='Senha']"))
                     )
-                    print("Campo de senha localizado pelo placeholder")
+                    logger.info("Campo de senha localizado pelo placeholder")
                 except:
                     # Tentativa 4: Qualquer input do tipo password
                     password_input = wait.until(
                         EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='password']"))
                     )
-                    print("Campo de senha localizado pelo tipo 'password'")
+                    logger.info("Campo de senha localizado pelo tipo 'password'")
         
         capturar_screenshot("04_campo_senha_apareceu")
         
-        print("=== ETAPA 5: Preenchendo o campo de senha ===")
+        logger.info("=== ETAPA 5: Preenchendo o campo de senha ===")
         # Preencher o campo com a senha
-        print("Preenchendo o campo de senha...")
+        logger.info("Preenchendo o campo de senha...")
         etapa_atual = iniciar_captura_rede("Preenchimento do campo de senha")
         password_input.clear()
         password_input.send_keys(senha)
-        print("Senha preenchida com sucesso!")
+        logger.info("Senha preenchida com sucesso!")
         capturar_screenshot("05_senha_preenchida")
         capturar_requisicoes(etapa_atual)
         
         # Pequena pausa para garantir que o botão Entrar esteja ativo
         time.sleep(1)
         
-        print("=== ETAPA 6: Clicando no botão Entrar ===")
+        logger.info("=== ETAPA 6: Clicando no botão Entrar ===")
         # Localizar e clicar no botão "Entrar"
-        print("Procurando o botão Entrar...")
+        logger.info("Procurando o botão Entrar...")
         
         # Tentativas diferentes para localizar o botão Entrar
         try:
@@ -550,40 +546,40 @@ def main(nome_filtro=None, id_prospecto=None):
             entrar_button = wait.until(
                 EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Entrar')]"))
             )
-            print("Botão Entrar localizado pelo texto")
+            logger.info("Botão Entrar localizado pelo texto")
         except:
             try:
                 # Tentativa 2: Pelo aria-label
                 entrar_button = wait.until(
                     EC.element_to_be_clickable((By.XPATH, "//button[@aria-label='Entrar']"))
                 )
-                print("Botão Entrar localizado pelo aria-label")
+                logger.info("Botão Entrar localizado pelo aria-label")
             except:
                 try:
                     # Tentativa 3: Pela classe CSS
                     entrar_button = wait.until(
                         EC.element_to_be_clickable((By.CSS_SELECTOR, "button.submit-button"))
                     )
-                    print("Botão Entrar localizado pela classe CSS")
+                    logger.info("Botão Entrar localizado pela classe CSS")
                 except:
                     # Tentativa 4: Qualquer botão tipo submit
                     entrar_button = wait.until(
                         EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit']"))
                     )
-                    print("Botão Entrar localizado pelo tipo 'submit'")
+                    logger.info("Botão Entrar localizado pelo tipo 'submit'")
         
         # Clicar no botão Entrar
-        print("Clicando no botão Entrar...")
+        logger.info("Clicando no botão Entrar...")
         etapa_atual = iniciar_captura_rede("Clique no botão Entrar")
         entrar_button.click()
         capturar_screenshot("06_botao_entrar_clicado")
         capturar_requisicoes(etapa_atual)
         
-        print("Botão Entrar clicado com sucesso!")
+        logger.info("Botão Entrar clicado com sucesso!")
         
-        print("=== ETAPA 7: Aguardando conclusão do login ===")
+        logger.info("=== ETAPA 7: Aguardando conclusão do login ===")
         # Aguardar que o login seja concluído e a página dashboard seja exibida
-        print("Aguardando conclusão do login...")
+        logger.info("Aguardando conclusão do login...")
         
         # Aguardar alguns segundos para o carregamento da página
         time.sleep(5)
@@ -595,11 +591,11 @@ def main(nome_filtro=None, id_prospecto=None):
         
         # Verificar se o login foi bem-sucedido
         if "dashboard" in driver.current_url or "painel" in driver.current_url:
-            print("Login realizado com sucesso!")
+            logger.info("Login realizado com sucesso!")
             
-            print("=== ETAPA 8: Clicando na seta de expansão ao lado de 'Cliente' ===")
+            logger.info("=== ETAPA 8: Clicando na seta de expansão ao lado de 'Cliente' ===")
             # Agora vamos localizar e clicar na seta para expandir o menu Cliente
-            print("Procurando a seta de expansão de 'Cliente'...")
+            logger.info("Procurando a seta de expansão de 'Cliente'...")
             
             # Primeiro, precisamos localizar o elemento Cliente para depois acessar a seta
             try:
@@ -607,29 +603,29 @@ def main(nome_filtro=None, id_prospecto=None):
                 cliente_element = wait.until(
                     EC.element_to_be_clickable((By.XPATH, "//div[contains(@class, 'ms-navigation-button') and .//span[contains(text(), 'Cliente')]]"))
                 )
-                print("Elemento 'Cliente' localizado com sucesso!")
+                logger.info("Elemento 'Cliente' localizado com sucesso!")
                 
                 # Agora vamos localizar a seta dentro deste elemento
                 cliente_arrow = wait.until(
                     EC.element_to_be_clickable((By.XPATH, "//i[contains(@class, 'icon-chevron-right') and contains(@class, 'arrow')]"))
                 )
-                print("Seta de expansão localizada com sucesso!")
+                logger.info("Seta de expansão localizada com sucesso!")
             except:
                 try:
                     # Tentativa 2: Localizar diretamente a seta usando o seletor fornecido
                     cliente_arrow = wait.until(
                         EC.element_to_be_clickable((By.XPATH, "//i[contains(@class, 'icon-chevron-right') and contains(@class, 'arrow') and contains(@class, 'ng-scope')]"))
                     )
-                    print("Seta de expansão localizada pelo seletor específico")
+                    logger.info("Seta de expansão localizada pelo seletor específico")
                 except:
                     try:
                         # Tentativa 3: Localizar qualquer seta de expansão no menu
                         cliente_arrow = wait.until(
                             EC.element_to_be_clickable((By.CSS_SELECTOR, ".ms-navigation-button .icon-chevron-right.arrow"))
                         )
-                        print("Seta de expansão localizada pela classe CSS")
+                        logger.info("Seta de expansão localizada pela classe CSS")
                     except Exception as e:
-                        print(f"Não foi possível localizar a seta de expansão: {e}")
+                        logger.warning(f"Não foi possível localizar a seta de expansão: {e}")
                         # Capturar screenshot para análise
                         capturar_screenshot("erro_seta_cliente")
                         raise e
@@ -638,11 +634,11 @@ def main(nome_filtro=None, id_prospecto=None):
             capturar_screenshot("08_antes_clicar_seta")
             
             # Clicar na seta para expandir o submenu
-            print("Clicando na seta para expandir o submenu de Cliente...")
+            logger.info("Clicando na seta para expandir o submenu de Cliente...")
             etapa_atual = iniciar_captura_rede("Expansão do submenu Cliente")
             cliente_arrow.click()
             
-            print("Seta de expansão clicada com sucesso!")
+            logger.info("Seta de expansão clicada com sucesso!")
             capturar_requisicoes(etapa_atual)
             
             # Aguardar um momento para que o submenu se expanda
@@ -651,9 +647,9 @@ def main(nome_filtro=None, id_prospecto=None):
             # Capturar screenshot do submenu expandido
             capturar_screenshot("09_submenu_expandido")
             
-            print("=== ETAPA 9: Clicando na opção 'Prospectos' ===")
+            logger.info("=== ETAPA 9: Clicando na opção 'Prospectos' ===")
             # Agora vamos localizar e clicar no link "Prospectos"
-            print("Procurando a opção 'Prospectos'...")
+            logger.info("Procurando a opção 'Prospectos'...")
             
             # Tentar localizar a opção "Prospectos" de várias formas
             try:
@@ -661,23 +657,23 @@ def main(nome_filtro=None, id_prospecto=None):
                 prospectos_link = wait.until(
                     EC.element_to_be_clickable((By.XPATH, "//span[@class='title ng-scope ng-binding flex' and contains(text(), 'Prospectos')]//parent::a"))
                 )
-                print("Link 'Prospectos' localizado pelo texto do span")
+                logger.info("Link 'Prospectos' localizado pelo texto do span")
             except Exception:
                 try:
                     # Tentativa 2: Pelo href
                     prospectos_link = wait.until(
                         EC.element_to_be_clickable((By.XPATH, "//a[contains(@href, '/cliente/prospectos') or contains(@ui-sref, 'prospectos')]"))
                     )
-                    print("Link 'Prospectos' localizado pelo href ou ui-sref")
+                    logger.info("Link 'Prospectos' localizado pelo href ou ui-sref")
                 except Exception:
                     try:
                         # Tentativa 3: Qualquer link com texto contendo "Prospectos"
                         prospectos_link = wait.until(
                             EC.element_to_be_clickable((By.XPATH, "//a[contains(., 'Prospectos')]"))
                         )
-                        print("Link 'Prospectos' localizado pelo texto")
+                        logger.info("Link 'Prospectos' localizado pelo texto")
                     except Exception as e:
-                        print(f"Não foi possível localizar o link 'Prospectos': {e}")
+                        logger.warning(f"Não foi possível localizar o link 'Prospectos': {e}")
                         # Capturar screenshot para análise
                         capturar_screenshot("erro_link_prospectos")
                         raise e
@@ -686,11 +682,11 @@ def main(nome_filtro=None, id_prospecto=None):
             capturar_screenshot("10_antes_clicar_prospectos")
             
             # Clicar no link "Prospectos"
-            print("Clicando no link 'Prospectos'...")
+            logger.info("Clicando no link 'Prospectos'...")
             etapa_atual = iniciar_captura_rede("Navegação para página de Prospectos")
             prospectos_link.click()
             
-            print("Link 'Prospectos' clicado com sucesso!")
+            logger.info("Link 'Prospectos' clicado com sucesso!")
             capturar_requisicoes(etapa_atual)
             
             # Aguardar o carregamento da página de prospectos
@@ -698,22 +694,22 @@ def main(nome_filtro=None, id_prospecto=None):
             
             # Capturar screenshot da página de prospectos
             capturar_screenshot("11_pagina_prospectos")
-            print("=== ETAPA 10: Extraindo dados da tabela para CSV ===")
+            logger.info("=== ETAPA 10: Extraindo dados da tabela para CSV ===")
             # Aguardar a tabela de prospectos carregar
-            print("Aguardando carregamento da tabela...")
+            logger.info("Aguardando carregamento da tabela...")
 
             try:
                 # Localizar a tabela na página
                 tabela = wait.until(
                     EC.presence_of_element_located((By.CSS_SELECTOR, "table.dataTable.row-border.hover"))
                 )
-                print("Tabela localizada com sucesso!")
+                logger.info("Tabela localizada com sucesso!")
                 
                 # Capturar screenshot da tabela
                 capturar_screenshot("13_tabela_localizada")
                 
                 # Extrair os dados da tabela
-                print("Extraindo os dados da tabela...")
+                logger.info("Extraindo os dados da tabela...")
                 
                 # Obter os cabeçalhos da tabela
                 headers = []
@@ -721,7 +717,7 @@ def main(nome_filtro=None, id_prospecto=None):
                 for cell in header_cells:
                     headers.append(cell.text.strip())
                 
-                print(f"Cabeçalhos encontrados: {headers}")
+                logger.info(f"Cabeçalhos encontrados: {headers}")
                 
                 # Obter as linhas da tabela
                 rows = []
@@ -734,11 +730,11 @@ def main(nome_filtro=None, id_prospecto=None):
                         row_data.append(cell.text.strip())
                     rows.append(row_data)
                 
-                print(f"Total de linhas encontradas: {len(rows)}")
+                logger.info(f"Total de linhas encontradas: {len(rows)}")
                 
                 # Criar o arquivo CSV
                 csv_filename = f"prospectos_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-                print(f"Salvando dados no arquivo CSV: {csv_filename}")
+                logger.info(f"Salvando dados no arquivo CSV: {csv_filename}")
                 
                 with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
                     csv_writer = csv.writer(csvfile)
@@ -747,20 +743,20 @@ def main(nome_filtro=None, id_prospecto=None):
                     # Escrever as linhas de dados
                     csv_writer.writerows(rows)
                 
-                print(f"Arquivo CSV '{csv_filename}' criado com sucesso!")
+                logger.info(f"Arquivo CSV '{csv_filename}' criado com sucesso!")
                 capturar_screenshot("14_dados_salvos_csv")
                 etapa_atual = iniciar_captura_rede("Extração de dados da tabela")
                 capturar_requisicoes(etapa_atual)
                 
-                print("=== ETAPA 10.5: Filtrando tabela pelo nome especificado ===")
-                print("Localizando campo de busca para filtrar...")
+                logger.info("=== ETAPA 10.5: Filtrando tabela pelo nome especificado ===")
+                logger.info("Localizando campo de busca para filtrar...")
                 
                 try:
                     # Localizar o campo de input de busca
                     campo_busca = wait.until(
                         EC.presence_of_element_located((By.CSS_SELECTOR, "input[ng-model='vm.filtros.busca']"))
                     )
-                    print("Campo de busca localizado com sucesso!")
+                    logger.info("Campo de busca localizado com sucesso!")
                     
                     # Limpar o campo antes de preencher
                     campo_busca.clear()
@@ -768,11 +764,11 @@ def main(nome_filtro=None, id_prospecto=None):
                     
                     # Preencher o campo com "Darlan"
                     campo_busca.send_keys(nome_filtro)
-                    print(f"Campo preenchido com: {nome_filtro}")
+                    logger.info(f"Campo preenchido com: {nome_filtro}")
                     
                     # Pressionar Enter para aplicar o filtro
                     campo_busca.send_keys(Keys.ENTER)
-                    print("Filtro aplicado com Enter")
+                    logger.info("Filtro aplicado com Enter")
                     
                     # Aguardar um momento para o filtro ser processado
                     time.sleep(2)
@@ -780,67 +776,67 @@ def main(nome_filtro=None, id_prospecto=None):
                     # Capturar screenshot após aplicar o filtro
                     capturar_screenshot("14.5_filtro_aplicado")
                     
-                    print("Filtro aplicado com sucesso!")
+                    logger.info("Filtro aplicado com sucesso!")
                     
                 except Exception as e:
-                    print(f"Erro ao aplicar filtro: {str(e)}")
+                    logger.error(f"Erro ao aplicar filtro: {str(e)}")
                     capturar_screenshot("14.5_erro_filtro")
                 
-                print("=== ETAPA 11: Localizando e clicando no botão de Ações para o ID especificado ===")
+                logger.info("=== ETAPA 11: Localizando e clicando no botão de Ações para o ID especificado ===")
                 
                 # CRÍTICO: Maximizar janela ANTES de procurar o botão de Ações
-                print("🔧 MAXIMIZANDO JANELA DO NAVEGADOR (essencial para visualizar botões na tabela)...")
+                logger.info("🔧 MAXIMIZANDO JANELA DO NAVEGADOR (essencial para visualizar botões na tabela)...")
                 
                 # Primeiro, definir um tamanho grande para garantir
                 try:
                     # Para headless, é importante definir um tamanho específico primeiro
                     driver.set_window_size(1920, 1080)
-                    print("✅ Tamanho inicial definido: 1920x1080")
+                    logger.info("✅ Tamanho inicial definido: 1920x1080")
                     time.sleep(1)
                     
                     # Tentar maximizar (funciona melhor após definir um tamanho)
                     driver.maximize_window()
-                    print("✅ Janela maximizada com sucesso!")
+                    logger.info("✅ Janela maximizada com sucesso!")
                     
                     # Em modo headless, forçar tamanho máximo de tela
                     if headless:
                         # Para headless, usar tamanho de tela full HD ou maior
                         driver.set_window_size(1920, 1080)
-                        print("✅ Modo headless: viewport definido para 1920x1080")
+                        logger.info("✅ Modo headless: viewport definido para 1920x1080")
                         
                         # Opção adicional: tentar definir um tamanho ainda maior para headless
                         try:
                             driver.execute_script("window.moveTo(0, 0);")
                             driver.execute_script("window.resizeTo(screen.width, screen.height);")
-                            print("✅ JavaScript: janela redimensionada para tamanho máximo da tela")
+                            logger.info("✅ JavaScript: janela redimensionada para tamanho máximo da tela")
                         except:
                             pass
                     
                     # Aguardar a janela se ajustar e a tabela re-renderizar
                     time.sleep(3)
-                    print("✅ Aguardando re-renderização da tabela com janela maximizada...")
+                    logger.info("✅ Aguardando re-renderização da tabela com janela maximizada...")
                     
                     # Capturar screenshot após maximização
                     capturar_screenshot("11.5_janela_maximizada")
                     
                 except Exception as e:
-                    print(f"⚠️ Erro ao maximizar: {e}")
+                    logger.warning(f"⚠️ Erro ao maximizar: {e}")
                     # Fallback final: garantir pelo menos um tamanho grande
                     try:
                         driver.set_window_size(1920, 1080)
-                        print("✅ Fallback: tamanho 1920x1080 aplicado")
+                        logger.info("✅ Fallback: tamanho 1920x1080 aplicado")
                         time.sleep(2)
                     except:
-                        print("❌ Não foi possível ajustar o tamanho da janela")
+                        logger.error("❌ Não foi possível ajustar o tamanho da janela")
                 
                 # Forçar um refresh da página para garantir que a tabela seja re-renderizada
                 try:
                     driver.execute_script("window.dispatchEvent(new Event('resize'));")
-                    print("✅ Evento de redimensionamento disparado para atualizar layout")
+                    logger.info("✅ Evento de redimensionamento disparado para atualizar layout")
                 except:
                     pass
                 
-                print(f"Procurando o botão de Ações para o ID: {id_prospecto}")
+                logger.info(f"Procurando o botão de Ações para o ID: {id_prospecto}")
 
                 # Primeira abordagem: Tenta encontrar o ID na tabela e então o botão relacionado
                 try:
@@ -852,12 +848,12 @@ def main(nome_filtro=None, id_prospecto=None):
                     for i, header in enumerate(headers):
                         if header.lower() in ['id', '#', 'código', 'codigo']:
                             id_column_index = i
-                            print(f"Coluna de ID encontrada no índice {id_column_index}")
+                            logger.info(f"Coluna de ID encontrada no índice {id_column_index}")
                             break
                     
                     if id_column_index == -1:
-                        print("Aviso: Não foi possível identificar a coluna de ID pelos cabeçalhos")
-                        print("Assumindo que a coluna de ID é a primeira (índice 0)")
+                        logger.warning("Aviso: Não foi possível identificar a coluna de ID pelos cabeçalhos")
+                        logger.info("Assumindo que a coluna de ID é a primeira (índice 0)")
                         id_column_index = 0
                     
                     # Ensure the table is interactable, especially after a filter.
@@ -865,9 +861,9 @@ def main(nome_filtro=None, id_prospecto=None):
                         tabela = wait.until(
                             EC.presence_of_element_located((By.CSS_SELECTOR, "table.dataTable.row-border.hover"))
                         )
-                        print("Tabela de prospectos confirmada/re-localizada.")
+                        logger.info("Tabela de prospectos confirmada/re-localizada.")
                     except TimeoutException:
-                        print("Erro: Tabela de prospectos não encontrada após o filtro. Não é possível prosseguir com a busca do ID.")
+                        logger.error("Erro: Tabela de prospectos não encontrada após o filtro. Não é possível prosseguir com a busca do ID.")
                         capturar_screenshot("erro_tabela_nao_encontrada_etapa12")
                         raise Exception("Tabela de prospectos não encontrada em ETAPA 12.")
 
@@ -880,46 +876,46 @@ def main(nome_filtro=None, id_prospecto=None):
                         xpath_acoes_button_s1 = (
                             f"//tr[.//td[normalize-space(.)='{id_prospecto}']]/descendant::button[@aria-label='Open menu with custom trigger' and .//span[normalize-space(.)='Ações']]"
                         )
-                        print(f"Tentando localizar botão Ações (S1) com XPath: {xpath_acoes_button_s1}")
+                        logger.warning(f"Tentando localizar botão Ações (S1) com XPath: {xpath_acoes_button_s1}")
                         acoes_button = wait.until(
                             EC.element_to_be_clickable((By.XPATH, xpath_acoes_button_s1))
                         )
-                        print("Botão de Ações (S1) localizado pela ID do prospecto, aria-label e texto no span.")
+                        logger.info("Botão de Ações (S1) localizado pela ID do prospecto, aria-label e texto no span.")
 
                     except TimeoutException:
-                        print(f"Tentativa S1 falhou. Tentando XPath alternativo (S2) para o botão Ações para o ID {id_prospecto}.")
+                        logger.warning(f"Tentativa S1 falhou. Tentando XPath alternativo (S2) para o botão Ações para o ID {id_prospecto}.")
                         # Strategy 2: Find row by ID text, then button by class and containing 'Ações'
                         xpath_acoes_button_s2 = (
                             f"//tr[.//td[normalize-space(.)='{id_prospecto}']]/descendant::button[contains(@class, 'reference-button') and contains(., 'Ações')]"
                         )
                         try:
-                            print(f"Tentando localizar botão Ações (S2) com XPath: {xpath_acoes_button_s2}")
+                            logger.warning(f"Tentando localizar botão Ações (S2) com XPath: {xpath_acoes_button_s2}")
                             acoes_button = wait.until(
                                 EC.element_to_be_clickable((By.XPATH, xpath_acoes_button_s2))
                             )
-                            print("Botão de Ações (S2) localizado pela ID do prospecto, classe e texto 'Ações'.")
+                            logger.info("Botão de Ações (S2) localizado pela ID do prospecto, classe e texto 'Ações'.")
                         except TimeoutException:
-                            print(f"Tentativa S2 falhou. Tentando XPath alternativo (S3) mais genérico.")
+                            logger.warning(f"Tentativa S2 falhou. Tentando XPath alternativo (S3) mais genérico.")
                             # Strategy 3: Find row by ID text, then any button in that row that seems like an actions menu
                             xpath_acoes_button_s3 = (
                                 f"//tr[.//td[normalize-space(.)='{id_prospecto}']]/descendant::button[contains(@ng-click, '$mdMenu.open') or .//span[contains(text(), 'Ações')]]"
                             )
                             try:
-                                print(f"Tentando localizar botão Ações (S3) com XPath: {xpath_acoes_button_s3}")
+                                logger.warning(f"Tentando localizar botão Ações (S3) com XPath: {xpath_acoes_button_s3}")
                                 acoes_button = wait.until(
                                     EC.element_to_be_clickable((By.XPATH, xpath_acoes_button_s3))
                                 )
-                                print("Botão de Ações (S3) localizado (genérico) pela ID do prospecto.")
+                                logger.info("Botão de Ações (S3) localizado (genérico) pela ID do prospecto.")
                             except TimeoutException:
-                                print(f"Não foi possível localizar o botão de Ações para o ID {id_prospecto} após múltiplas tentativas.")
+                                logger.warning(f"Não foi possível localizar o botão de Ações para o ID {id_prospecto} após múltiplas tentativas.")
                                 capturar_screenshot(f"erro_localizar_acoes_id_{id_prospecto}")
                                 raise Exception(f"Falha crítica: Botão Ações para ID {id_prospecto} não encontrado.")
                     
                     if acoes_button: # If any strategy above succeeded
-                        print(f"Botão de Ações para o ID {id_prospecto} localizado e pronto para clique.")
+                        logger.info(f"Botão de Ações para o ID {id_prospecto} localizado e pronto para clique.")
                         capturar_screenshot(f"15_antes_clicar_acoes_id_{id_prospecto}")
                         
-                        print("Clicando no botão de Ações...")
+                        logger.info("Clicando no botão de Ações...")
                         clicked_successfully_in_etapa12 = False
                         try:
                             driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center', inline: 'center'});", acoes_button)
@@ -932,89 +928,89 @@ def main(nome_filtro=None, id_prospecto=None):
                             
                             # Method 1: Standard click
                             acoes_button.click()
-                            print("Clique normal no botão Ações executado com sucesso.")
+                            logger.info("Clique normal no botão Ações executado com sucesso.")
                             clicked_successfully_in_etapa12 = True
                         except Exception as e_click_normal:
-                            print(f"Clique normal falhou: {e_click_normal}. Tentando clique com JavaScript.")
+                            logger.warning(f"Clique normal falhou: {e_click_normal}. Tentando clique com JavaScript.")
                             current_exception = e_click_normal
                             try:
                                 if "stale element reference" in str(current_exception).lower():
-                                    print("Elemento Ações tornou-se stale antes do clique JS. Re-localizando...")
+                                    logger.warning("Elemento Ações tornou-se stale antes do clique JS. Re-localizando...")
                                     # Re-fetch using the most reliable XPath (S1)
                                     xpath_refetch = f"//tr[.//td[normalize-space(.)='{id_prospecto}']]/descendant::button[@aria-label='Open menu with custom trigger' and .//span[normalize-space(.)='Ações']]"
                                     acoes_button = wait.until(EC.element_to_be_clickable((By.XPATH, xpath_refetch)))
-                                    print("Elemento Ações re-localizado para clique JS.")
+                                    logger.info("Elemento Ações re-localizado para clique JS.")
                                 
                                 driver.execute_script("arguments[0].click();", acoes_button)
-                                print("Clique com JavaScript no botão Ações executado com sucesso.")
+                                logger.info("Clique com JavaScript no botão Ações executado com sucesso.")
                                 clicked_successfully_in_etapa12 = True
                             except Exception as e_click_js:
-                                print(f"Clique com JavaScript falhou: {e_click_js}. Tentando ActionChains.")
+                                logger.warning(f"Clique com JavaScript falhou: {e_click_js}. Tentando ActionChains.")
                                 current_exception = e_click_js
                                 try:
                                     if "stale element reference" in str(current_exception).lower():
-                                        print("Elemento Ações tornou-se stale antes do ActionChains. Re-localizando...")
+                                        logger.warning("Elemento Ações tornou-se stale antes do ActionChains. Re-localizando...")
                                         xpath_refetch = f"//tr[.//td[normalize-space(.)='{id_prospecto}']]/descendant::button[@aria-label='Open menu with custom trigger' and .//span[normalize-space(.)='Ações']]"
                                         acoes_button = wait.until(EC.element_to_be_clickable((By.XPATH, xpath_refetch)))
-                                        print("Elemento Ações re-localizado para ActionChains.")
+                                        logger.info("Elemento Ações re-localizado para ActionChains.")
 
                                     actions = ActionChains(driver)
                                     actions.move_to_element(acoes_button).click().perform()
-                                    print("Clique com ActionChains no botão Ações executado com sucesso.")
+                                    logger.info("Clique com ActionChains no botão Ações executado com sucesso.")
                                     clicked_successfully_in_etapa12 = True
                                 except Exception as e_click_action:
-                                    print(f"Todas as tentativas de clique no botão Ações falharam: {e_click_action}")
+                                    logger.info(f"Todas as tentativas de clique no botão Ações falharam: {e_click_action}")
                                     capturar_screenshot(f"erro_clique_acoes_id_{id_prospecto}")
                                     raise # Re-raise the last exception
 
                         if clicked_successfully_in_etapa12:
-                            print("Botão de Ações clicado com sucesso!")
+                            logger.info("Botão de Ações clicado com sucesso!")
                             capturar_screenshot(f"16_menu_acoes_aberto_id_{id_prospecto}")
                             capturar_requisicoes(etapa_atual)
                             time.sleep(2) # Aguardar menu abrir completamente
                             etapa12_sucesso_e_botao_clicado = True # Set flag for ETAPA 13
                         # else: # Failure to click already raised an exception
-                            # print(f"Falha crítica ao clicar no botão de Ações para o ID {id_prospecto}.")
+                            # logger.error(f"Falha crítica ao clicar no botão de Ações para o ID {id_prospecto}.")
                     # else: # acoes_button was not found, exception already raised
-                        # print(f"AVISO: Botão de Ações para ID {id_prospecto} não foi encontrado. ETAPA 13 será pulada.")
+                        # logger.warning(f"AVISO: Botão de Ações para ID {id_prospecto} não foi encontrado. ETAPA 13 será pulada.")
 
                     # ETAPA 13 will only run if etapa12_sucesso_e_botao_clicado is True
                     if etapa12_sucesso_e_botao_clicado:
                                 
                                 # Nova etapa para clicar no botão "Converter em Cliente"
-                                print("=== ETAPA 12: Localizando e clicando no botão 'Converter em Cliente' ===")
-                                print("Procurando o elemento com texto 'Converter em Cliente' de cor verde...")
+                                logger.info("=== ETAPA 12: Localizando e clicando no botão 'Converter em Cliente' ===")
+                                logger.info("Procurando o elemento com texto 'Converter em Cliente' de cor verde...")
                                 
                                 try:
                                     # Tentativa 1: Pelo span com estilo de cor verde e texto específico
                                     converter_button = wait.until(
                                         EC.element_to_be_clickable((By.XPATH, "//span[@style='color:green' and contains(text(), 'Converter em Cliente')]"))
                                     )
-                                    print("Botão 'Converter em Cliente' localizado pelo span verde")
+                                    logger.info("Botão 'Converter em Cliente' localizado pelo span verde")
                                 except Exception as e1:
-                                    print(f"Erro na tentativa 1: {e1}")
+                                    logger.error(f"Erro na tentativa 1: {e1}")
                                     try:
                                         # Tentativa 2: Qualquer span com cor verde
                                         converter_button = wait.until(
                                             EC.element_to_be_clickable((By.CSS_SELECTOR, "span[style='color:green']"))
                                         )
-                                        print("Botão 'Converter em Cliente' localizado por span com cor verde")
+                                        logger.info("Botão 'Converter em Cliente' localizado por span com cor verde")
                                     except Exception as e2:
-                                        print(f"Erro na tentativa 2: {e2}")
+                                        logger.error(f"Erro na tentativa 2: {e2}")
                                         try:
                                             # Tentativa 3: Pelo texto em qualquer elemento
                                             converter_button = wait.until(
                                                 EC.element_to_be_clickable((By.XPATH, "//*[contains(text(), 'Converter em Cliente')]"))
                                             )
-                                            print("Botão 'Converter em Cliente' localizado pelo texto")
+                                            logger.info("Botão 'Converter em Cliente' localizado pelo texto")
                                         except Exception as e3:
-                                            print(f"Erro na tentativa 3: {e3}")
+                                            logger.error(f"Erro na tentativa 3: {e3}")
                                             
                                             # Tentativa 4: Encontrar pelo pai do span (botão)
                                             try:
                                                 # Primeiro, tentar encontrar o span (mesmo que não seja clicável)
                                                 span = driver.find_element(By.XPATH, "//span[@style='color:green']")
-                                                print("Span verde encontrado, tentando encontrar o botão pai...")
+                                                logger.info("Span verde encontrado, tentando encontrar o botão pai...")
                                                 
                                                 # Subir para o pai até encontrar um botão
                                                 converter_button = span
@@ -1023,23 +1019,23 @@ def main(nome_filtro=None, id_prospecto=None):
                                                     try:
                                                         # Verificar se é um botão
                                                         if converter_button.tag_name == 'button':
-                                                            print(f"Botão pai encontrado após {i_loop_var+1} iterações")
+                                                            logger.info(f"Botão pai encontrado após {i_loop_var+1} iterações")
                                                             break
                                                         
                                                         # Subir para o pai
                                                         converter_button = converter_button.find_element(By.XPATH, "..")
                                                     except Exception:
-                                                        print("Falha ao navegar para o elemento pai")
+                                                        logger.error("Falha ao navegar para o elemento pai")
                                                         break
                                                 
                                                 if converter_button.tag_name != 'button':
                                                     raise Exception("Não foi possível encontrar o botão pai do span verde")
                                                     
                                             except Exception as e4:
-                                                print(f"Erro na tentativa 4: {e4}")
+                                                logger.error(f"Erro na tentativa 4: {e4}")
                                                 
                                                 # Tentativa 5: Localizar todos os botões e verificar
-                                                print("Tentando localizar qualquer botão relacionado...")
+                                                logger.warning("Tentando localizar qualquer botão relacionado...")
                                                 buttons = driver.find_elements(By.TAG_NAME, "button")
                                                 converter_button = None
                                                 
@@ -1047,25 +1043,25 @@ def main(nome_filtro=None, id_prospecto=None):
                                                     try:
                                                         if "converter" in btn.text.lower() or "cliente" in btn.text.lower():
                                                             converter_button = btn
-                                                            print(f"Botão encontrado com texto: '{btn.text}'")
+                                                            logger.info(f"Botão encontrado com texto: '{btn.text}'")
                                                             break
                                                     except:
                                                         pass
                                                 
                                                 if not converter_button:
-                                                    print("Nenhum botão relacionado encontrado, tentando botões dentro do menu...")
+                                                    logger.warning("Nenhum botão relacionado encontrado, tentando botões dentro do menu...")
                                                     try:
                                                         # Tentar encontrar o menu aberto
                                                         menu = driver.find_element(By.CSS_SELECTOR, "md-menu-content")
                                                         menu_buttons = menu.find_elements(By.TAG_NAME, "button")
                                                         
                                                         if len(menu_buttons) > 0:
-                                                            print(f"Encontrados {len(menu_buttons)} botões no menu. Usando o primeiro.")
+                                                            logger.info(f"Encontrados {len(menu_buttons)} botões no menu. Usando o primeiro.")
                                                             converter_button = menu_buttons[0]
                                                         else:
                                                             raise Exception("Nenhum botão encontrado no menu")
                                                     except Exception as e5:
-                                                        print(f"Erro final: {e5}")
+                                                        logger.error(f"Erro final: {e5}")
                                                         capturar_screenshot("erro_localizar_converter")
                                                         raise Exception("Não foi possível localizar o botão 'Converter em Cliente'")
                                 
@@ -1073,7 +1069,7 @@ def main(nome_filtro=None, id_prospecto=None):
                                 capturar_screenshot("18_antes_clicar_converter")
                                 
                                 # Rolar até o botão e clicar
-                                print("Clicando no botão 'Converter em Cliente'...")
+                                logger.info("Clicando no botão 'Converter em Cliente'...")
                                 driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", converter_button)
                                 time.sleep(1)
                                 
@@ -1081,28 +1077,28 @@ def main(nome_filtro=None, id_prospecto=None):
                                 etapa_atual = iniciar_captura_rede("Clique no botão 'Converter em Cliente'")
                                 try:
                                     driver.execute_script("arguments[0].click();", converter_button)
-                                    print("Clique executado via JavaScript")
+                                    logger.info("Clique executado via JavaScript")
                                 except Exception as e:
-                                    print(f"Falha no clique via JavaScript: {e}")
-                                    print("Tentando clique normal...")
+                                    logger.error(f"Falha no clique via JavaScript: {e}")
+                                    logger.warning("Tentando clique normal...")
                                     converter_button.click()
                                 
-                                print("Botão 'Converter em Cliente' clicado com sucesso!")
+                                logger.info("Botão 'Converter em Cliente' clicado com sucesso!")
                                 capturar_requisicoes(etapa_atual)
                                 
                                 # Aguardar carregamento da próxima página
                                 time.sleep(3)
                                 capturar_screenshot("19_apos_clicar_converter")
                                 
-                                print("=== ETAPA 13: Clicando no primeiro botão do wizard ===")
-                                print("Procurando o primeiro botão do wizard...")
+                                logger.info("=== ETAPA 13: Clicando no primeiro botão do wizard ===")
+                                logger.info("Procurando o primeiro botão do wizard...")
                                 
                                 try:
                                     # Aguardar o botão aparecer e tornar-se clicável
                                     primeiro_botao = wait.until(
                                         EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[2]/md-dialog-actions/div[2]/button"))
                                     )
-                                    print("Primeiro botão do wizard localizado com sucesso!")
+                                    logger.info("Primeiro botão do wizard localizado com sucesso!")
                                     
                                     # Capturar screenshot antes de clicar
                                     capturar_screenshot("20_antes_primeiro_botao_wizard")
@@ -1117,11 +1113,11 @@ def main(nome_filtro=None, id_prospecto=None):
                                     # Tentar diferentes métodos de clique
                                     try:
                                         primeiro_botao.click()
-                                        print("Primeiro botão clicado com sucesso (clique normal)")
+                                        logger.info("Primeiro botão clicado com sucesso (clique normal)")
                                     except Exception as e_click:
-                                        print(f"Clique normal falhou: {e_click}. Tentando JavaScript...")
+                                        logger.warning(f"Clique normal falhou: {e_click}. Tentando JavaScript...")
                                         driver.execute_script("arguments[0].click();", primeiro_botao)
-                                        print("Primeiro botão clicado com sucesso (JavaScript)")
+                                        logger.info("Primeiro botão clicado com sucesso (JavaScript)")
                                     
                                     capturar_requisicoes(etapa_atual)
                                     
@@ -1129,14 +1125,14 @@ def main(nome_filtro=None, id_prospecto=None):
                                     time.sleep(2)
                                     capturar_screenshot("21_apos_primeiro_botao_wizard")
                                     
-                                    print("=== ETAPA 14: Clicando no segundo botão do wizard ===")
-                                    print("Procurando o segundo botão do wizard...")
+                                    logger.info("=== ETAPA 14: Clicando no segundo botão do wizard ===")
+                                    logger.info("Procurando o segundo botão do wizard...")
                                     
                                     # Aguardar o segundo botão (que pode ser o mesmo XPath se a tela mudou)
                                     segundo_botao = wait.until(
                                         EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[2]/md-dialog-actions/div[2]/button"))
                                     )
-                                    print("Segundo botão do wizard localizado com sucesso!")
+                                    logger.info("Segundo botão do wizard localizado com sucesso!")
                                     
                                     # Capturar screenshot antes do segundo clique
                                     capturar_screenshot("22_antes_segundo_botao_wizard")
@@ -1151,11 +1147,11 @@ def main(nome_filtro=None, id_prospecto=None):
                                     # Tentar diferentes métodos de clique
                                     try:
                                         segundo_botao.click()
-                                        print("Segundo botão clicado com sucesso (clique normal)")
+                                        logger.info("Segundo botão clicado com sucesso (clique normal)")
                                     except Exception as e_click:
-                                        print(f"Clique normal falhou: {e_click}. Tentando JavaScript...")
+                                        logger.warning(f"Clique normal falhou: {e_click}. Tentando JavaScript...")
                                         driver.execute_script("arguments[0].click();", segundo_botao)
-                                        print("Segundo botão clicado com sucesso (JavaScript)")
+                                        logger.info("Segundo botão clicado com sucesso (JavaScript)")
                                     
                                     capturar_requisicoes(etapa_atual)
                                     
@@ -1163,16 +1159,16 @@ def main(nome_filtro=None, id_prospecto=None):
                                     time.sleep(3)
                                     capturar_screenshot("23_apos_segundo_botao_wizard")
                                     
-                                    print("Ambos os botões do wizard foram clicados com sucesso!")
+                                    logger.info("Ambos os botões do wizard foram clicados com sucesso!")
                                     
-                                    print("=== ETAPA 15: Clicando no elemento md-select ===")
-                                    print("Procurando o elemento md-select do wizard...")
+                                    logger.info("=== ETAPA 15: Clicando no elemento md-select ===")
+                                    logger.info("Procurando o elemento md-select do wizard...")
                                     
                                     # Aguardar o elemento md-select aparecer e tornar-se clicável
                                     md_select_element = wait.until(
                                         EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[1]/div/div/form/div/md-input-container/md-select"))
                                     )
-                                    print("Elemento md-select localizado com sucesso!")
+                                    logger.info("Elemento md-select localizado com sucesso!")
                                     
                                     # Capturar screenshot antes de clicar
                                     capturar_screenshot("24_antes_clicar_md_select")
@@ -1187,21 +1183,21 @@ def main(nome_filtro=None, id_prospecto=None):
                                     # Tentar diferentes métodos de clique
                                     try:
                                         md_select_element.click()
-                                        print("Primeiro clique no md-select executado com sucesso (clique normal)")
+                                        logger.info("Primeiro clique no md-select executado com sucesso (clique normal)")
                                     except Exception as e_click:
-                                        print(f"Clique normal falhou: {e_click}. Tentando JavaScript...")
+                                        logger.warning(f"Clique normal falhou: {e_click}. Tentando JavaScript...")
                                         driver.execute_script("arguments[0].click();", md_select_element)
-                                        print("Primeiro clique no md-select executado com sucesso (JavaScript)")
+                                        logger.info("Primeiro clique no md-select executado com sucesso (JavaScript)")
                                     
                                     capturar_requisicoes(etapa_atual)
                                     capturar_screenshot("25_apos_primeiro_clique_md_select")
                                     
                                     # Aguardar 1 segundo conforme solicitado
-                                    print("Aguardando 1 segundo antes de clicar no md-option...")
+                                    logger.info("Aguardando 1 segundo antes de clicar no md-option...")
                                     time.sleep(1)
                                     
                                     # Clicar no elemento md-option
-                                    print("Procurando e clicando no elemento md-option...")
+                                    logger.info("Procurando e clicando no elemento md-option...")
                                     etapa_atual = iniciar_captura_rede("Clique no md-option")
                                     
                                     # Localizar o elemento md-option
@@ -1209,22 +1205,22 @@ def main(nome_filtro=None, id_prospecto=None):
                                         md_option_element = wait.until(
                                             EC.element_to_be_clickable((By.XPATH, "/html/body/div[7]/md-select-menu/md-content/md-option"))
                                         )
-                                        print("Elemento md-option localizado com sucesso!")
+                                        logger.info("Elemento md-option localizado com sucesso!")
                                     except Exception as e:
-                                        print(f"Erro ao localizar md-option: {e}")
+                                        logger.error(f"Erro ao localizar md-option: {e}")
                                         # Tentar localizar de forma mais genérica
                                         try:
                                             md_option_element = wait.until(
                                                 EC.element_to_be_clickable((By.CSS_SELECTOR, "md-select-menu md-content md-option"))
                                             )
-                                            print("Elemento md-option localizado com seletor CSS genérico!")
+                                            logger.info("Elemento md-option localizado com seletor CSS genérico!")
                                         except Exception as e2:
-                                            print(f"Erro também com seletor genérico: {e2}")
+                                            logger.error(f"Erro também com seletor genérico: {e2}")
                                             # Última tentativa - qualquer md-option visível
                                             md_option_element = wait.until(
                                                 EC.element_to_be_clickable((By.TAG_NAME, "md-option"))
                                             )
-                                            print("Elemento md-option localizado por tag name!")
+                                            logger.info("Elemento md-option localizado por tag name!")
                                     
                                     # Capturar screenshot antes de clicar no md-option
                                     capturar_screenshot("26_antes_clicar_md_option")
@@ -1236,19 +1232,19 @@ def main(nome_filtro=None, id_prospecto=None):
                                     # Tentar diferentes métodos de clique no md-option
                                     try:
                                         md_option_element.click()
-                                        print("Clique no md-option executado com sucesso (clique normal)")
+                                        logger.info("Clique no md-option executado com sucesso (clique normal)")
                                     except Exception as e_click:
-                                        print(f"Clique normal no md-option falhou: {e_click}. Tentando JavaScript...")
+                                        logger.warning(f"Clique normal no md-option falhou: {e_click}. Tentando JavaScript...")
                                         driver.execute_script("arguments[0].click();", md_option_element)
-                                        print("Clique no md-option executado com sucesso (JavaScript)")
+                                        logger.info("Clique no md-option executado com sucesso (JavaScript)")
                                     
                                     capturar_requisicoes(etapa_atual)
                                     capturar_screenshot("27_apos_clicar_md_option")
                                     
-                                    print("Sequência md-select -> md-option executada com sucesso!")
+                                    logger.info("Sequência md-select -> md-option executada com sucesso!")
                                     
-                                    print("=== ETAPA 16: Segundo md-select, opção específica e botão avançar ===")
-                                    print("Procurando o segundo elemento md-select...")
+                                    logger.info("=== ETAPA 16: Segundo md-select, opção específica e botão avançar ===")
+                                    logger.info("Procurando o segundo elemento md-select...")
                                     
                                     # Aguardar um momento para que a interface se estabilize
                                     time.sleep(1)
@@ -1258,7 +1254,7 @@ def main(nome_filtro=None, id_prospecto=None):
                                         segundo_md_select = wait.until(
                                             EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[1]/div/div/form/div/div[2]/md-input-container[2]/md-select"))
                                         )
-                                        print("Segundo md-select localizado com sucesso!")
+                                        logger.info("Segundo md-select localizado com sucesso!")
                                         
                                         # Capturar screenshot antes de clicar
                                         capturar_screenshot("28_antes_segundo_md_select")
@@ -1273,11 +1269,11 @@ def main(nome_filtro=None, id_prospecto=None):
                                         # Tentar diferentes métodos de clique
                                         try:
                                             segundo_md_select.click()
-                                            print("Segundo md-select clicado com sucesso (clique normal)")
+                                            logger.info("Segundo md-select clicado com sucesso (clique normal)")
                                         except Exception as e_click:
-                                            print(f"Clique normal falhou: {e_click}. Tentando JavaScript...")
+                                            logger.warning(f"Clique normal falhou: {e_click}. Tentando JavaScript...")
                                             driver.execute_script("arguments[0].click();", segundo_md_select)
-                                            print("Segundo md-select clicado com sucesso (JavaScript)")
+                                            logger.info("Segundo md-select clicado com sucesso (JavaScript)")
                                         
                                         capturar_requisicoes(etapa_atual)
                                         capturar_screenshot("29_apos_segundo_md_select")
@@ -1286,30 +1282,30 @@ def main(nome_filtro=None, id_prospecto=None):
                                         time.sleep(1)
                                         
                                         # Localizar e clicar na opção específica (md-option[25])
-                                        print("Procurando a opção md-option[25]...")
+                                        logger.info("Procurando a opção md-option[25]...")
                                         etapa_atual = iniciar_captura_rede("Clique na opção md-option[25]")
                                         
                                         try:
                                             opcao_25 = wait.until(
                                                 EC.element_to_be_clickable((By.XPATH, "/html/body/div[8]/md-select-menu/md-content/md-option[25]"))
                                             )
-                                            print("Opção md-option[25] localizada com sucesso!")
+                                            logger.info("Opção md-option[25] localizada com sucesso!")
                                         except Exception as e:
-                                            print(f"Erro ao localizar md-option[25]: {e}")
+                                            logger.error(f"Erro ao localizar md-option[25]: {e}")
                                             # Tentar localizar de forma mais genérica
                                             try:
                                                 # Tentar localizar na div[7] caso a numeração tenha mudado
                                                 opcao_25 = wait.until(
                                                     EC.element_to_be_clickable((By.XPATH, "/html/body/div[7]/md-select-menu/md-content/md-option[25]"))
                                                 )
-                                                print("Opção md-option[25] localizada na div[7]!")
+                                                logger.info("Opção md-option[25] localizada na div[7]!")
                                             except Exception as e2:
-                                                print(f"Erro também na div[7]: {e2}")
+                                                logger.error(f"Erro também na div[7]: {e2}")
                                                 # Última tentativa - tentar encontrar qualquer md-option[25]
                                                 opcao_25 = wait.until(
                                                     EC.element_to_be_clickable((By.CSS_SELECTOR, "md-option:nth-child(25)"))
                                                 )
-                                                print("Opção md-option[25] localizada por CSS selector!")
+                                                logger.info("Opção md-option[25] localizada por CSS selector!")
                                         
                                         # Capturar screenshot antes de clicar na opção
                                         capturar_screenshot("30_antes_opcao_25")
@@ -1321,11 +1317,11 @@ def main(nome_filtro=None, id_prospecto=None):
                                         # Clicar na opção 25
                                         try:
                                             opcao_25.click()
-                                            print("Opção md-option[25] clicada com sucesso (clique normal)")
+                                            logger.info("Opção md-option[25] clicada com sucesso (clique normal)")
                                         except Exception as e_click:
-                                            print(f"Clique normal na opção falhou: {e_click}. Tentando JavaScript...")
+                                            logger.warning(f"Clique normal na opção falhou: {e_click}. Tentando JavaScript...")
                                             driver.execute_script("arguments[0].click();", opcao_25)
-                                            print("Opção md-option[25] clicada com sucesso (JavaScript)")
+                                            logger.info("Opção md-option[25] clicada com sucesso (JavaScript)")
                                         
                                         capturar_requisicoes(etapa_atual)
                                         capturar_screenshot("31_apos_opcao_25")
@@ -1334,13 +1330,13 @@ def main(nome_filtro=None, id_prospecto=None):
                                         time.sleep(1)
                                         
                                         # Clicar no botão para avançar
-                                        print("Procurando o botão para avançar...")
+                                        logger.info("Procurando o botão para avançar...")
                                         etapa_atual = iniciar_captura_rede("Clique no botão avançar")
                                         
                                         botao_avancar = wait.until(
                                             EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[2]/md-dialog-actions/div[2]/button"))
                                         )
-                                        print("Botão avançar localizado com sucesso!")
+                                        logger.info("Botão avançar localizado com sucesso!")
                                         
                                         # Capturar screenshot antes de clicar no botão
                                         capturar_screenshot("32_antes_botao_avancar")
@@ -1352,31 +1348,31 @@ def main(nome_filtro=None, id_prospecto=None):
                                         # Clicar no botão avançar
                                         try:
                                             botao_avancar.click()
-                                            print("Botão avançar clicado com sucesso (clique normal)")
+                                            logger.info("Botão avançar clicado com sucesso (clique normal)")
                                         except Exception as e_click:
-                                            print(f"Clique normal no botão falhou: {e_click}. Tentando JavaScript...")
+                                            logger.warning(f"Clique normal no botão falhou: {e_click}. Tentando JavaScript...")
                                             driver.execute_script("arguments[0].click();", botao_avancar)
-                                            print("Botão avançar clicado com sucesso (JavaScript)")
+                                            logger.info("Botão avançar clicado com sucesso (JavaScript)")
                                         
                                         capturar_requisicoes(etapa_atual)
                                         capturar_screenshot("33_apos_botao_avancar")
                                         
-                                        print("ETAPA 16 concluída: segundo md-select → opção 25 → botão avançar!")
+                                        logger.info("ETAPA 16 concluída: segundo md-select → opção 25 → botão avançar!")
                                         
-                                        print("=== ETAPA 17: Próximo botão, novo md-select e primeira opção ===")
+                                        logger.info("=== ETAPA 17: Próximo botão, novo md-select e primeira opção ===")
                                         
                                         # Aguardar um momento para que a interface se estabilize
                                         time.sleep(2)
                                         
                                         # Clicar no próximo botão (mesmo XPath do anterior)
-                                        print("Clicando no próximo botão do wizard...")
+                                        logger.info("Clicando no próximo botão do wizard...")
                                         etapa_atual = iniciar_captura_rede("Clique no próximo botão do wizard")
                                         
                                         try:
                                             proximo_botao = wait.until(
                                                 EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[2]/md-dialog-actions/div[2]/button"))
                                             )
-                                            print("Próximo botão localizado com sucesso!")
+                                            logger.info("Próximo botão localizado com sucesso!")
                                             
                                             # Capturar screenshot antes de clicar
                                             capturar_screenshot("34_antes_proximo_botao")
@@ -1388,27 +1384,27 @@ def main(nome_filtro=None, id_prospecto=None):
                                             # Clicar no próximo botão
                                             try:
                                                 proximo_botao.click()
-                                                print("Próximo botão clicado com sucesso (clique normal)")
+                                                logger.info("Próximo botão clicado com sucesso (clique normal)")
                                             except Exception as e_click:
-                                                print(f"Clique normal falhou: {e_click}. Tentando JavaScript...")
+                                                logger.warning(f"Clique normal falhou: {e_click}. Tentando JavaScript...")
                                                 driver.execute_script("arguments[0].click();", proximo_botao)
-                                                print("Próximo botão clicado com sucesso (JavaScript)")
+                                                logger.info("Próximo botão clicado com sucesso (JavaScript)")
                                             
                                             capturar_requisicoes(etapa_atual)
                                             capturar_screenshot("35_apos_proximo_botao")
                                             
                                             # Aguardar o novo elemento aparecer na próxima tela
-                                            print("Aguardando o novo md-select aparecer...")
+                                            logger.info("Aguardando o novo md-select aparecer...")
                                             time.sleep(3)
                                             
                                             # Localizar e clicar no novo md-select
-                                            print("Procurando o novo elemento md-select...")
+                                            logger.info("Procurando o novo elemento md-select...")
                                             etapa_atual = iniciar_captura_rede("Clique no novo md-select")
                                             
                                             novo_md_select = wait.until(
                                                 EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[1]/div/form/div[1]/div/md-input-container[1]/md-select"))
                                             )
-                                            print("Novo md-select localizado com sucesso!")
+                                            logger.info("Novo md-select localizado com sucesso!")
                                             
                                             # Capturar screenshot antes de clicar no novo md-select
                                             capturar_screenshot("36_antes_novo_md_select")
@@ -1420,11 +1416,11 @@ def main(nome_filtro=None, id_prospecto=None):
                                             # Clicar no novo md-select
                                             try:
                                                 novo_md_select.click()
-                                                print("Novo md-select clicado com sucesso (clique normal)")
+                                                logger.info("Novo md-select clicado com sucesso (clique normal)")
                                             except Exception as e_click:
-                                                print(f"Clique normal falhou: {e_click}. Tentando JavaScript...")
+                                                logger.warning(f"Clique normal falhou: {e_click}. Tentando JavaScript...")
                                                 driver.execute_script("arguments[0].click();", novo_md_select)
-                                                print("Novo md-select clicado com sucesso (JavaScript)")
+                                                logger.info("Novo md-select clicado com sucesso (JavaScript)")
                                             
                                             capturar_requisicoes(etapa_atual)
                                             capturar_screenshot("37_apos_novo_md_select")
@@ -1433,30 +1429,30 @@ def main(nome_filtro=None, id_prospecto=None):
                                             time.sleep(1)
                                             
                                             # Localizar e clicar na primeira opção (md-option[1])
-                                            print("Procurando a primeira opção md-option[1]...")
+                                            logger.info("Procurando a primeira opção md-option[1]...")
                                             etapa_atual = iniciar_captura_rede("Clique na primeira opção")
                                             
                                             try:
                                                 primeira_opcao = wait.until(
                                                     EC.element_to_be_clickable((By.XPATH, "/html/body/div[7]/md-select-menu/md-content/md-option[1]"))
                                                 )
-                                                print("Primeira opção md-option[1] localizada com sucesso!")
+                                                logger.info("Primeira opção md-option[1] localizada com sucesso!")
                                             except Exception as e:
-                                                print(f"Erro ao localizar md-option[1]: {e}")
+                                                logger.error(f"Erro ao localizar md-option[1]: {e}")
                                                 # Tentar localizar de forma mais genérica
                                                 try:
                                                     # Tentar localizar em outra div caso a numeração tenha mudado
                                                     primeira_opcao = wait.until(
                                                         EC.element_to_be_clickable((By.XPATH, "/html/body/div[8]/md-select-menu/md-content/md-option[1]"))
                                                     )
-                                                    print("Primeira opção md-option[1] localizada na div[8]!")
+                                                    logger.info("Primeira opção md-option[1] localizada na div[8]!")
                                                 except Exception as e2:
-                                                    print(f"Erro também na div[8]: {e2}")
+                                                    logger.error(f"Erro também na div[8]: {e2}")
                                                     # Última tentativa - primeira opção por CSS
                                                     primeira_opcao = wait.until(
                                                         EC.element_to_be_clickable((By.CSS_SELECTOR, "md-option:first-child"))
                                                     )
-                                                    print("Primeira opção localizada por CSS selector!")
+                                                    logger.info("Primeira opção localizada por CSS selector!")
                                             
                                             # Capturar screenshot antes de clicar na primeira opção
                                             capturar_screenshot("38_antes_primeira_opcao")
@@ -1468,31 +1464,31 @@ def main(nome_filtro=None, id_prospecto=None):
                                             # Clicar na primeira opção
                                             try:
                                                 primeira_opcao.click()
-                                                print("Primeira opção md-option[1] clicada com sucesso (clique normal)")
+                                                logger.info("Primeira opção md-option[1] clicada com sucesso (clique normal)")
                                             except Exception as e_click:
-                                                print(f"Clique normal na primeira opção falhou: {e_click}. Tentando JavaScript...")
+                                                logger.warning(f"Clique normal na primeira opção falhou: {e_click}. Tentando JavaScript...")
                                                 driver.execute_script("arguments[0].click();", primeira_opcao)
-                                                print("Primeira opção md-option[1] clicada com sucesso (JavaScript)")
+                                                logger.info("Primeira opção md-option[1] clicada com sucesso (JavaScript)")
                                             
                                             capturar_requisicoes(etapa_atual)
                                             capturar_screenshot("39_apos_primeira_opcao")
                                             
-                                            print("ETAPA 17 concluída: próximo botão → novo md-select → primeira opção!")
+                                            logger.info("ETAPA 17 concluída: próximo botão → novo md-select → primeira opção!")
                                             
-                                            print("=== ETAPA 18: Finalização - Três cliques finais ===")
+                                            logger.info("=== ETAPA 18: Finalização - Três cliques finais ===")
                                             
                                             # Aguardar um momento para que a interface se estabilize
                                             time.sleep(2)
                                             
                                             # PRIMEIRO CLIQUE - Botão padrão
-                                            print("1/3 - Clicando no primeiro botão final...")
+                                            logger.info("1/3 - Clicando no primeiro botão final...")
                                             etapa_atual = iniciar_captura_rede("Primeiro clique final")
                                             
                                             try:
                                                 primeiro_botao_final = wait.until(
                                                     EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[2]/md-dialog-actions/div[2]/button"))
                                                 )
-                                                print("Primeiro botão final localizado com sucesso!")
+                                                logger.info("Primeiro botão final localizado com sucesso!")
                                                 
                                                 # Capturar screenshot antes do primeiro clique
                                                 capturar_screenshot("40_antes_primeiro_botao_final")
@@ -1504,11 +1500,11 @@ def main(nome_filtro=None, id_prospecto=None):
                                                 # Clicar no primeiro botão final
                                                 try:
                                                     primeiro_botao_final.click()
-                                                    print("Primeiro botão final clicado com sucesso (clique normal)")
+                                                    logger.info("Primeiro botão final clicado com sucesso (clique normal)")
                                                 except Exception as e_click:
-                                                    print(f"Clique normal falhou: {e_click}. Tentando JavaScript...")
+                                                    logger.warning(f"Clique normal falhou: {e_click}. Tentando JavaScript...")
                                                     driver.execute_script("arguments[0].click();", primeiro_botao_final)
-                                                    print("Primeiro botão final clicado com sucesso (JavaScript)")
+                                                    logger.info("Primeiro botão final clicado com sucesso (JavaScript)")
                                                 
                                                 capturar_requisicoes(etapa_atual)
                                                 capturar_screenshot("41_apos_primeiro_botao_final")
@@ -1517,13 +1513,13 @@ def main(nome_filtro=None, id_prospecto=None):
                                                 time.sleep(2)
                                                 
                                                 # SEGUNDO CLIQUE - Mesmo botão padrão
-                                                print("2/3 - Clicando no segundo botão final...")
+                                                logger.info("2/3 - Clicando no segundo botão final...")
                                                 etapa_atual = iniciar_captura_rede("Segundo clique final")
                                                 
                                                 segundo_botao_final = wait.until(
                                                     EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[2]/md-dialog-actions/div[2]/button"))
                                                 )
-                                                print("Segundo botão final localizado com sucesso!")
+                                                logger.info("Segundo botão final localizado com sucesso!")
                                                 
                                                 # Capturar screenshot antes do segundo clique
                                                 capturar_screenshot("42_antes_segundo_botao_final")
@@ -1535,11 +1531,11 @@ def main(nome_filtro=None, id_prospecto=None):
                                                 # Clicar no segundo botão final
                                                 try:
                                                     segundo_botao_final.click()
-                                                    print("Segundo botão final clicado com sucesso (clique normal)")
+                                                    logger.info("Segundo botão final clicado com sucesso (clique normal)")
                                                 except Exception as e_click:
-                                                    print(f"Clique normal falhou: {e_click}. Tentando JavaScript...")
+                                                    logger.warning(f"Clique normal falhou: {e_click}. Tentando JavaScript...")
                                                     driver.execute_script("arguments[0].click();", segundo_botao_final)
-                                                    print("Segundo botão final clicado com sucesso (JavaScript)")
+                                                    logger.info("Segundo botão final clicado com sucesso (JavaScript)")
                                                 
                                                 capturar_requisicoes(etapa_atual)
                                                 capturar_screenshot("43_apos_segundo_botao_final")
@@ -1548,13 +1544,13 @@ def main(nome_filtro=None, id_prospecto=None):
                                                 time.sleep(2)
                                                 
                                                 # TERCEIRO CLIQUE - Botão de SALVAR
-                                                print("3/3 - Clicando no botão de SALVAR...")
+                                                logger.info("3/3 - Clicando no botão de SALVAR...")
                                                 etapa_atual = iniciar_captura_rede("Clique no botão Salvar")
                                                 
                                                 botao_salvar = wait.until(
                                                     EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[2]/md-dialog-actions/div[2]/div/button"))
                                                 )
-                                                print("Botão SALVAR localizado com sucesso!")
+                                                logger.info("Botão SALVAR localizado com sucesso!")
                                                 
                                                 # Capturar screenshot antes do clique de salvar
                                                 capturar_screenshot("44_antes_botao_salvar")
@@ -1566,11 +1562,11 @@ def main(nome_filtro=None, id_prospecto=None):
                                                 # Clicar no botão SALVAR
                                                 try:
                                                     botao_salvar.click()
-                                                    print("Botão SALVAR clicado com sucesso (clique normal)")
+                                                    logger.info("Botão SALVAR clicado com sucesso (clique normal)")
                                                 except Exception as e_click:
-                                                    print(f"Clique normal falhou: {e_click}. Tentando JavaScript...")
+                                                    logger.warning(f"Clique normal falhou: {e_click}. Tentando JavaScript...")
                                                     driver.execute_script("arguments[0].click();", botao_salvar)
-                                                    print("Botão SALVAR clicado com sucesso (JavaScript)")
+                                                    logger.info("Botão SALVAR clicado com sucesso (JavaScript)")
                                                 
                                                 capturar_requisicoes(etapa_atual)
                                                 capturar_screenshot("45_apos_botao_salvar")
@@ -1579,30 +1575,30 @@ def main(nome_filtro=None, id_prospecto=None):
                                                 time.sleep(3)
                                                 capturar_screenshot("46_processo_finalizado")
                                                 
-                                                print("🎉 ETAPA 18 CONCLUÍDA - PROCESSO TOTALMENTE FINALIZADO! 🎉")
-                                                print("✅ Sequência completa executada:")
-                                                print("   1️⃣ Primeiro botão final")
-                                                print("   2️⃣ Segundo botão final") 
-                                                print("   3️⃣ Botão SALVAR")
-                                                print("🏁 Cliente convertido e salvo com sucesso!")
+                                                logger.info("🎉 ETAPA 18 CONCLUÍDA - PROCESSO TOTALMENTE FINALIZADO! 🎉")
+                                                logger.info("✅ Sequência completa executada:")
+                                                logger.info("   1️⃣ Primeiro botão final")
+                                                logger.info("   2️⃣ Segundo botão final")
+                                                logger.info("   3️⃣ Botão SALVAR")
+                                                logger.info("🏁 Cliente convertido e salvo com sucesso!")
                                                 
                                             except Exception as e:
-                                                print(f"❌ Erro na ETAPA 18 (Finalização): {e}")
+                                                logger.error(f"❌ Erro na ETAPA 18 (Finalização): {e}")
                                                 capturar_screenshot("erro_etapa_18_finalizacao")
-                                                print("⚠️  Processo pode não ter sido finalizado completamente")
+                                                logger.warning("⚠️  Processo pode não ter sido finalizado completamente")
                                             
                                         except Exception as e:
-                                            print(f"Erro na ETAPA 17: {e}")
+                                            logger.error(f"Erro na ETAPA 17: {e}")
                                             capturar_screenshot("erro_etapa_17")
                                             # Não interromper o script, apenas registrar o erro
                                         
                                     except Exception as e:
-                                        print(f"Erro na ETAPA 16: {e}")
+                                        logger.error(f"Erro na ETAPA 16: {e}")
                                         capturar_screenshot("erro_etapa_16")
                                         # Não interromper o script, apenas registrar o erro
                                     
                                 except Exception as e:
-                                    print(f"Erro ao clicar nos botões do wizard: {e}")
+                                    logger.error(f"Erro ao clicar nos botões do wizard: {e}")
                                     capturar_screenshot("erro_botoes_wizard")
                                     # Não interromper o script, apenas registrar o erro
                                 
@@ -1613,61 +1609,61 @@ def main(nome_filtro=None, id_prospecto=None):
                                 time.sleep(5)
                     
                     if not id_encontrado:
-                        print(f"ERRO: ID {id_prospecto} não foi encontrado na tabela após o filtro (se aplicado).")
+                        logger.error(f"ERRO: ID {id_prospecto} não foi encontrado na tabela após o filtro (se aplicado).")
                         capturar_screenshot("15_id_nao_encontrado")
                     
                     if not id_encontrado:
-                        print(f"ERRO: ID {id_prospecto} não foi encontrado na tabela após o filtro (se aplicado).")
+                        logger.error(f"ERRO: ID {id_prospecto} não foi encontrado na tabela após o filtro (se aplicado).")
                         capturar_screenshot("15_id_nao_encontrado")
                         
                 except Exception as e:
-                    print(f"Erro na etapa 11: {str(e)}")
+                    logger.error(f"Erro na etapa 11: {str(e)}")
                     capturar_screenshot("15_erro_etapa11")
                     # raise e # Considerar se deve parar o script ou tentar continuar
 
                     if not id_encontrado:
-                        print(f"Aviso: ID {id_prospecto} não encontrado na tabela")
+                        logger.warning(f"Aviso: ID {id_prospecto} não encontrado na tabela")
                         raise Exception(f"ID {id_prospecto} não encontrado na tabela de prospectos")
                 
                 except Exception as e:
-                    print(f"Erro ao localizar ou clicar no botão de Ações: {e}")
+                    logger.error(f"Erro ao localizar ou clicar no botão de Ações: {e}")
                     capturar_screenshot("erro_botao_acoes")
             
             except Exception as e:
-                print(f"Erro ao extrair dados da tabela: {e}")
+                logger.error(f"Erro ao extrair dados da tabela: {e}")
                 capturar_screenshot("erro_extracao_tabela")
             
-            print("=== PROCESSO CONCLUÍDO COM SUCESSO! ===")
-            print("Todas as screenshots foram salvas na pasta 'screenshots'")
+            logger.info("=== PROCESSO CONCLUÍDO COM SUCESSO! ===")
+            logger.info("Todas as screenshots foram salvas na pasta 'screenshots'")
             
             # No final, antes de fechar o navegador
-            print("Salvando logs de requisições...")
+            logger.info("Salvando logs de requisições...")
             salvar_requisicoes_csv()
             
-            print("Análise de requisições concluída com sucesso!")
+            logger.info("Análise de requisições concluída com sucesso!")
             
         else:
-            print("Possível falha no login. Verifique as screenshots.")
+            logger.info("Possível falha no login. Verifique as screenshots.")
         
         # Aguardar alguns segundos antes de fechar
-        print("Aguardando 5 segundos...")
+        logger.info("Aguardando 5 segundos...")
         time.sleep(5)
         
     except Exception as e:
-        print(f"Erro ao interagir com a página: {e}")
+        logger.error(f"Erro ao interagir com a página: {e}")
         # Tentar capturar screenshot em caso de erro
         try:
             capturar_screenshot("erro_geral")
-            print("Screenshot do erro salvo")
+            logger.info("Screenshot do erro salvo")
             # Tentar salvar os logs já capturados
             salvar_requisicoes_csv()
         except:
             pass
     finally:
         # Fechar o navegador
-        print("Fechando o navegador...")
+        logger.info("Fechando o navegador...")
         driver.quit()
-        print("Navegador fechado com sucesso!")
+        logger.info("Navegador fechado com sucesso!")
 
 #if __name__ == "__main__":
 #    main("JOÃO SILVA SANTOS", "1518")
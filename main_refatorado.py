@@ -3,23 +3,39 @@ import os
 import argparse
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from dotenv import load_dotenv
 import datetime
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.common.action_chains import ActionChains
 import logging
 import psycopg2
 from psycopg2.extras import Json
-import tempfile
 import shutil
-import json
+import queue
+import urllib.request
+import urllib.error
+from monitor_hubsoft import MonitorHubsoft, ErroHubsoft, toast_de_sucesso
+from tempos_etapas import HistoricoTempos, PoliticaTimeout, percentil
+from limitador_taxa import LimitadorTaxa
+from eventos_prospecto import RegistroEventos
+from elegibilidade import ServicoElegibilidade
+from backend_cdp import DriverCDP
+from recursos import VigiaRecursos
+from gravador_voo import GravadorVoo
+import classificador_falhas
+import politica_retentativa
+import migracoes
+from disjuntor import Disjuntor
+import coletor_orfaos
+import servidor_saude
+import drenagem
+import animacoes
+from roteiro_wizard import executar_roteiro, clicar, escolher, CatalogoOpcoes
+import log_estruturado
 
-# Configurar logging apenas para erros
-logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
+# Logs em JSON por uma fila (ver log_estruturado.py): nível em NIVEL_LOG/NIVEIS_LOG
+log_estruturado.configurar()
 logger = logging.getLogger(__name__)
 
 # Carregar variáveis do arquivo .env
@@ -43,6 +59,7 @@ DB_CONFIG_DJANGO = {
     'port': 5432
 }
 
+
 class ProspectoProcessor:
     def __init__(self):
         # Conexões separadas para permitir replicação sem quebrar o fluxo atual
@@ -53,17 +70,31 @@ class ProspectoProcessor:
         self.screenshots_dir = "screenshots"
         self.start_time = None
         self.current_prospecto_id = None
+        self.current_secundario_id = None  # ID da linha no banco Django, evita re-consultar a cada status
         self.tentativa_atual = None  # Controla a tentativa atual da execução
         self.primeira_chamada = True  # Flag para identificar primeira chamada da execução
-        
+        # (id, tentativas) já lidos pelo pré-filtro de elegibilidade, por id_prospecto_hubsoft
+        self.registros_conhecidos = {}
+        # Histórico append-only das ETAPAS (prospecto_eventos), gravado em lote fora do caminho do lead
+        self.eventos = RegistroEventos.compartilhado(DB_CONFIG)
+
         # Criar pasta para screenshots apenas para erros
         if not os.path.exists(self.screenshots_dir):
             os.makedirs(self.screenshots_dir)
-    
+
+    def iniciar_prospecto(self):
+        """Zera o estado por prospecto (modo lote reaproveita o mesmo processor)."""
+        self.start_time = time.time()
+        self.current_prospecto_id = None
+        self.current_secundario_id = None
+        self.tentativa_atual = None
+        self.primeira_chamada = True
+
     def conectar_banco(self):
-        """Conecta aos bancos de dados (primário e secundário)."""
+        """Conecta aos bancos de dados (primário e secundário). O esquema vem de migrar_esquema(), na inicialização."""
         try:
             self.conn_primary = psycopg2.connect(**DB_CONFIG)
+            DISJUNTORES['banco'].registrar_sucesso()
             # Secundário não deve interromper a produção caso falhe; logar e seguir
             try:
                 self.conn_secondary = psycopg2.connect(**DB_CONFIG_DJANGO)
@@ -76,8 +107,9 @@ class ProspectoProcessor:
             return True
         except Exception as e:
             logger.error(f"Erro ao conectar ao banco primário: {e}")
+            DISJUNTORES['banco'].registrar_falha(e)
             return False
-    
+
     def desconectar_banco(self):
         """Desconecta dos bancos de dados."""
         try:
@@ -91,26 +123,30 @@ class ProspectoProcessor:
                 self.conn_secondary.close()
             finally:
                 self.conn_secondary = None
-    
-    def salvar_prospecto(self, nome_prospecto, id_prospecto_hubsoft, status_atual, erro=None, resultado=None):
-        """Salva ou atualiza dados do prospecto no banco primário e replica para o secundário."""
+
+    def salvar_prospecto(self, nome_prospecto, id_prospecto_hubsoft, status_atual, erro=None, resultado=None, classe_erro=None):
+        """
+        Salva ou atualiza dados do prospecto no banco primário e replica para o secundário.
+        classe_erro (ver classificador_falhas.py) acompanha o erro; status sem erro a limpam.
+        Em erro, grava também proxima_tentativa_em conforme a politica_retentativa.
+        """
         if not self.conn:
             return False
-        
+
         try:
             cursor = self.conn.cursor()
             tempo_processamento = int(time.time() - self.start_time) if self.start_time else 0
-            
+
             # Mapear status interno para os valores permitidos pela tabela
             status_mapping = {
                 "INICIANDO": "processando",
-                "LOGIN_REALIZADO": "processando", 
+                "LOGIN_REALIZADO": "processando",
                 "NAVEGACAO_PROSPECTOS": "processando",
                 "PROSPECTO_LOCALIZADO": "processando",
                 "MENU_ACOES_ABERTO": "processando",
                 "WIZARD_INICIADO": "processando",
                 "WIZARD_TELA1": "processando",
-                "WIZARD_SELECOES": "processando", 
+                "WIZARD_SELECOES": "processando",
                 "WIZARD_TELA2": "processando",
                 "CONCLUIDO": "finalizado",
                 "ERRO_LOGIN": "erro",
@@ -124,46 +160,52 @@ class ProspectoProcessor:
                 "ERRO_FINALIZACAO": "erro",
                 "ERRO_GERAL": "erro"
             }
-            
+
             status_db = status_mapping.get(status_atual, "erro")
             # Para o banco Django, 'finalizado' deve virar 'aguardando_validacao'
             status_django = "aguardando_validacao" if status_db == "finalizado" else status_db
-            
+
             # VERIFICAÇÃO CRÍTICA: Só permite "finalizado" se for realmente CONCLUIDO com sucesso
             if status_db == "finalizado" and resultado != "sucesso":
-                print(f"⚠️ ATENÇÃO: Status '{status_atual}' mapeado para 'finalizado' mas resultado não é 'sucesso'")
+                logger.warning(f"⚠️ ATENÇÃO: Status '{status_atual}' mapeado para 'finalizado' mas resultado não é 'sucesso'")
                 status_db = "erro"
                 erro = f"Processo não finalizado corretamente. Status original: {status_atual}"
                 resultado = "falha"
-            
-            # Verificar se já existe
-            cursor.execute(
-                "SELECT id, tentativas_processamento FROM prospectos WHERE id_prospecto_hubsoft = %s",
-                (id_prospecto_hubsoft,)
-            )
-            resultado_busca = cursor.fetchone()
-            
+
+            # Verificar se já existe (sem consultar quando o registro já é conhecido)
+            if self.current_prospecto_id and not self.primeira_chamada:
+                resultado_busca = (self.current_prospecto_id, self.tentativa_atual)
+            elif str(id_prospecto_hubsoft) in self.registros_conhecidos:
+                resultado_busca = self.registros_conhecidos.pop(str(id_prospecto_hubsoft))
+            else:
+                cursor.execute(
+                    "SELECT id, tentativas_processamento FROM prospectos WHERE id_prospecto_hubsoft = %s",
+                    (id_prospecto_hubsoft,)
+                )
+                resultado_busca = cursor.fetchone()
+
             if resultado_busca:
                 # Atualizar registro existente
                 id_existente, tentativas_atuais = resultado_busca
                 self.current_prospecto_id = id_existente
-                
+
                 # CORREÇÃO: Incrementar tentativas apenas na primeira chamada da execução
                 if self.primeira_chamada:
                     self.tentativa_atual = tentativas_atuais + 1
                     self.primeira_chamada = False
-                    print(f"🔄 Nova execução iniciada - Tentativa {self.tentativa_atual}")
+                    logger.info(f"🔄 Nova execução iniciada - Tentativa {self.tentativa_atual}")
                 else:
                     # Manter a mesma tentativa para atualizações de status da mesma execução
                     self.tentativa_atual = tentativas_atuais if self.tentativa_atual is None else self.tentativa_atual
-                
+
                 # VERIFICAÇÃO: Se atingiu 3 tentativas e está com erro, marcar como erro final
                 if self.tentativa_atual >= 3 and status_db == "erro":
-                    print(f"❌ Prospecto {nome_prospecto} atingiu o máximo de 3 tentativas - marcando como erro final")
+                    logger.error(f"❌ Prospecto {nome_prospecto} atingiu o máximo de 3 tentativas - marcando como erro final")
                     erro = f"Máximo de 3 tentativas atingido. Última falha: {erro}" if erro else "Máximo de 3 tentativas atingido"
                     status_db = "erro"  # Força status como erro
                     resultado = "falha"  # Força resultado como falha
-                
+                proxima = politica_retentativa.proxima_tentativa(classe_erro, self.tentativa_atual) if status_db == "erro" else None
+
                 cursor.execute("""
                     UPDATE prospectos SET
                         nome_prospecto = %s,
@@ -172,37 +214,40 @@ class ProspectoProcessor:
                         data_processamento = %s,
                         tentativas_processamento = %s,
                         erro_processamento = %s,
+                        classe_erro = %s,
+                        proxima_tentativa_em = %s,
                         tempo_processamento = %s,
                         resultado_processamento = %s
                     WHERE id = %s
                 """, (
                     nome_prospecto, status_db, datetime.datetime.now(), datetime.datetime.now(),
-                    self.tentativa_atual, erro, tempo_processamento, resultado, id_existente
+                    self.tentativa_atual, erro, classe_erro, proxima, tempo_processamento, resultado, id_existente
                 ))
-                
-                print(f"🔄 Atualizando prospecto ID {id_existente}: {status_atual} -> {status_db} (Tentativa {self.tentativa_atual})")
+
+                logger.info(f"🔄 Atualizando prospecto ID {id_existente}: {status_atual} -> {status_db} (Tentativa {self.tentativa_atual})")
             else:
                 # Criar novo registro
                 self.tentativa_atual = 1
                 self.primeira_chamada = False
-                
+                proxima = politica_retentativa.proxima_tentativa(classe_erro, self.tentativa_atual) if status_db == "erro" else None
+
                 cursor.execute("""
                     INSERT INTO prospectos (
-                        nome_prospecto, id_prospecto_hubsoft, status, 
+                        nome_prospecto, id_prospecto_hubsoft, status,
                         data_criacao, data_atualizacao, data_processamento,
-                        tentativas_processamento, erro_processamento,
-                        tempo_processamento, resultado_processamento
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        tentativas_processamento, erro_processamento, classe_erro,
+                        proxima_tentativa_em, tempo_processamento, resultado_processamento
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                     RETURNING id
                 """, (
                     nome_prospecto, id_prospecto_hubsoft, status_db,
                     datetime.datetime.now(), datetime.datetime.now(), datetime.datetime.now(),
-                    self.tentativa_atual, erro, tempo_processamento, resultado
+                    self.tentativa_atual, erro, classe_erro, proxima, tempo_processamento, resultado
                 ))
                 self.current_prospecto_id = cursor.fetchone()[0]
-                
-                print(f"✨ Criando novo prospecto ID {self.current_prospecto_id}: {status_atual} -> {status_db} (Tentativa {self.tentativa_atual})")
-            
+
+                logger.info(f"✨ Criando novo prospecto ID {self.current_prospecto_id}: {status_atual} -> {status_db} (Tentativa {self.tentativa_atual})")
+
             self.conn.commit()
             cursor.close()
 
@@ -214,11 +259,14 @@ class ProspectoProcessor:
                     resultado_jsonb = Json(resultado) if resultado is not None else None
 
                     # Verificar existência no secundário
-                    sec_cursor.execute(
-                        "SELECT id FROM prospectos WHERE id_prospecto_hubsoft = %s",
-                        (id_prospecto_hubsoft,)
-                    )
-                    sec_row = sec_cursor.fetchone()
+                    if self.current_secundario_id:
+                        sec_row = (self.current_secundario_id,)
+                    else:
+                        sec_cursor.execute(
+                            "SELECT id FROM prospectos WHERE id_prospecto_hubsoft = %s",
+                            (id_prospecto_hubsoft,)
+                        )
+                        sec_row = sec_cursor.fetchone()
 
                     if sec_row:
                         sec_id = sec_row[0]
@@ -230,6 +278,8 @@ class ProspectoProcessor:
                                 data_processamento = %s,
                                 tentativas_processamento = %s,
                                 erro_processamento = %s,
+                                classe_erro = %s,
+                                proxima_tentativa_em = %s,
                                 tempo_processamento = %s,
                                 resultado_processamento = %s
                             WHERE id = %s
@@ -240,6 +290,8 @@ class ProspectoProcessor:
                                 datetime.datetime.now(),
                                 self.tentativa_atual,
                                 erro,
+                                classe_erro,
+                                proxima,
                                 tempo_processamento,
                                 resultado_jsonb,
                                 sec_id,
@@ -258,6 +310,8 @@ class ProspectoProcessor:
                                 tentativas_processamento,
                                 tempo_processamento,
                                 erro_processamento,
+                                classe_erro,
+                                proxima_tentativa_em,
                                 prioridade,
                                 dados_processamento,
                                 resultado_processamento,
@@ -267,8 +321,9 @@ class ProspectoProcessor:
                                 score_conversao,
                                 usuario_processamento
                             ) VALUES (
-                                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+                                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
                             )
+                            RETURNING id
                             """,
                             (
                                 nome_prospecto,
@@ -279,6 +334,8 @@ class ProspectoProcessor:
                                 self.tentativa_atual,
                                 tempo_processamento,
                                 erro,
+                                classe_erro,
+                                proxima,
                                 1,  # prioridade default
                                 None,  # dados_processamento
                                 resultado_jsonb,
@@ -289,6 +346,9 @@ class ProspectoProcessor:
                                 None,  # usuario_processamento
                             ),
                         )
+                        sec_row = sec_cursor.fetchone()
+
+                    self.current_secundario_id = sec_row[0]
 
                     self.conn_secondary.commit()
                     sec_cursor.close()
@@ -302,13 +362,66 @@ class ProspectoProcessor:
                     pass
 
             return True
-            
+
         except Exception as e:
             logger.error(f"Erro ao salvar prospecto: {e}")
             if self.conn:
                 self.conn.rollback()
             return False
-    
+
+    def devolver_prospecto(self, id_prospecto_hubsoft):
+        """
+        Devolve à fila, sem gastar a tentativa, um prospecto interrompido pela
+        drenagem antes de qualquer efeito no Hubsoft (ver drenagem.py).
+        """
+        if not self.conn or not self.current_prospecto_id:
+            return
+        tentativas = max(0, (self.tentativa_atual or 1) - 1)
+        # O banco primário só aceita processando/finalizado/erro (ver status_mapping): lá o prospecto
+        # fica 'processando', que a elegibilidade trata como executável. A fila é o 'aguardando' do Django
+        for conn, id_registro, status in ((self.conn, self.current_prospecto_id, 'processando'),
+                                          (self.conn_secondary, self.current_secundario_id, 'aguardando')):
+            if not conn or not id_registro:
+                continue
+            try:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    UPDATE prospectos SET status = %s, tentativas_processamento = %s,
+                        erro_processamento = NULL, classe_erro = NULL, proxima_tentativa_em = NULL
+                    WHERE id = %s
+                """, (status, tentativas, id_registro))
+                conn.commit()
+                cursor.close()
+            except Exception as e:
+                logger.error(f"Erro ao devolver prospecto {id_prospecto_hubsoft} à fila: {e}")
+                conn.rollback()
+        logger.info(f"↩️ Prospecto {id_prospecto_hubsoft} devolvido à fila (tentativa {tentativas} mantida)")
+        self.registrar_evento(id_prospecto_hubsoft, "DEVOLVIDO")
+
+    def registrar_evento(self, id_prospecto_hubsoft, status, etapa=None, **campos):
+        """Acrescenta um evento ao histórico do prospecto (ver eventos_prospecto.py); não toca o banco."""
+        self.eventos.registrar(status, id_prospecto_hubsoft, run_id=log_estruturado.run_id_atual(),
+                               tentativa=self.tentativa_atual, etapa=etapa, **campos)
+
+    def registrar_recursos(self, uso):
+        """Grava memória/CPU gastas no prospecto em dados_processamento (Django), ao lado do tempo_processamento."""
+        if not uso or not self.conn_secondary or not self.current_secundario_id:
+            return
+        try:
+            cursor = self.conn_secondary.cursor()
+            cursor.execute(
+                "UPDATE prospectos SET dados_processamento = COALESCE(dados_processamento, '{}'::jsonb) || %s WHERE id = %s",
+                (Json({'recursos': uso}), self.current_secundario_id)
+            )
+            self.conn_secondary.commit()
+            cursor.close()
+        except Exception as e:
+            logger.error(f"Falha ao registrar uso de recursos: {e}")
+            try:
+                self.conn_secondary.rollback()
+            except Exception:
+                pass
+
     def capturar_screenshot_erro(self, driver, nome, etapa):
         """Captura screenshot apenas em caso de erro"""
         try:
@@ -316,427 +429,927 @@ class ProspectoProcessor:
             filename = f"{self.screenshots_dir}/ERRO_{timestamp}_{etapa}_{nome}.png"
             driver.save_screenshot(filename)
             logger.error(f"Screenshot de erro salvo: {filename}")
-            print(f"📸 Screenshot de erro salvo: {filename}")
             return filename
         except Exception as e:
             logger.error(f"Erro ao capturar screenshot: {e}")
             return None
 
-def main(nome_filtro=None, id_prospecto=None):
-    """
-    Função principal que automatiza a conversão de prospectos em clientes
-    """
-    processor = ProspectoProcessor()
-    processor.start_time = time.time()
-    
-    # Conectar ao banco
-    if not processor.conectar_banco():
-        print("❌ Falha ao conectar ao banco de dados")
-        return
-    
-    print("✅ Conectado ao banco de dados PostgreSQL")
-    
-    
-    # VERIFICAÇÃO: Não processar se já tem 3 ou mais tentativas
+
+URL_LOGIN = "https://megalinktelecom.hubsoft.com.br/login"
+
+
+def sondar_banco():
+    """Sonda do disjuntor: o banco primário aceita conexão?"""
+    conn = psycopg2.connect(**DB_CONFIG, connect_timeout=5)
+    conn.close()
+
+
+def sondar_hubsoft():
+    """Sonda do disjuntor: a tela de login responde (sem abrir o Chrome)?"""
     try:
-        cursor = processor.conn.cursor()
-        cursor.execute(
-            "SELECT tentativas_processamento, status FROM prospectos WHERE id_prospecto_hubsoft = %s",
-            (str(id_prospecto),)
-        )
-        resultado = cursor.fetchone()
-        cursor.close()
-        
-        if resultado:
-            tentativas, status = resultado
-            if tentativas >= 3:
-                print(f"❌ Prospecto {nome_filtro} (ID: {id_prospecto}) já atingiu o máximo de 3 tentativas")
-                processor.desconectar_banco()
-                return
-            if status == 'erro' and tentativas >= 3:
-                print(f"❌ Prospecto {nome_filtro} (ID: {id_prospecto}) já marcado como erro final")
-                processor.desconectar_banco()
-                return
-    except Exception as e:
-        print(f"⚠️ Erro ao verificar tentativas: {e}")
-    
-    print(f"🤖 Iniciando processamento: {nome_filtro} (ID: {id_prospecto})")
-    
-    # Configurar argumentos de linha de comando
+        urllib.request.urlopen(URL_LOGIN, timeout=10).close()
+    except urllib.error.HTTPError as e:
+        if e.code >= 500:
+            raise
+
+
+# Falhas de infraestrutura somadas entre os workers (ver disjuntor.py)
+DISJUNTORES = {
+    'banco': Disjuntor('banco', sondar_banco),
+    'hubsoft': Disjuntor('hubsoft', sondar_hubsoft),
+}
+
+
+def infraestrutura_liberada():
+    """Se o Hubsoft e o banco estão disponíveis para despachar prospectos (sonda se preciso)."""
+    bloqueados = [nome for nome, disjuntor in DISJUNTORES.items() if not disjuntor.liberado()]
+    if bloqueados:
+        logger.warning(f"⛔ Disjuntor aberto ({', '.join(bloqueados)}): despacho pausado")
+    return not bloqueados
+
+
+def infraestrutura_bloqueada():
+    """Se outro worker abriu um disjuntor (sem sondar; usado entre prospectos)."""
+    return any(disjuntor.bloqueado() for disjuntor in DISJUNTORES.values())
+
+
+# "selenium" (chromedriver) ou "cdp" (DevTools direto, esperas por evento - ver backend_cdp.py)
+BACKEND_NAVEGADOR = os.environ.get('BACKEND_NAVEGADOR', 'selenium').lower()
+XPATH_LINK_PROSPECTOS = "//span[@class='title ng-scope ng-binding flex' and contains(text(), 'Prospectos')]//parent::a"
+CSS_TABELA_PROSPECTOS = "table.dataTable.row-border.hover"
+
+# Fecha diálogos/menus abertos do Angular Material (wizard, md-menu, md-select)
+SCRIPT_FECHAR_OVERLAYS = """
+try {
+    var injector = angular.element(document.body).injector();
+    injector.get('$mdDialog').cancel();
+    injector.get('$mdMenu').hide();
+    injector.get('$mdSelect') && injector.get('$mdSelect').hide && injector.get('$mdSelect').hide();
+} catch (e) {}
+document.querySelectorAll('.md-scroll-mask, md-backdrop').forEach(function (el) { el.remove(); });
+"""
+
+# Linha do prospecto na tabela filtrada e itens do menu de Ações aberto (se houver)
+SCRIPT_SITUACAO_PROSPECTO = """
+var id = arguments[0];
+var linha = Array.prototype.find.call(document.querySelectorAll('table.dataTable tbody tr'), function (tr) {
+    return Array.prototype.some.call(tr.cells, function (td) { return td.textContent.trim() === id; });
+});
+var menu = document.querySelector('.md-open-menu-container.md-active md-menu-content');
+var cliente = linha ? linha.querySelector(arguments[1]) : null;
+return {
+    celulas: linha ? Array.prototype.map.call(linha.cells, function (td) { return td.textContent.trim(); }) : null,
+    cliente: cliente ? (cliente.getAttribute('href') || cliente.textContent.trim()) : null,
+    itens_menu: menu ? Array.prototype.map.call(menu.querySelectorAll('md-menu-item'), function (item) {
+        return item.textContent.trim();
+    }) : null
+};
+"""
+# Valor exato de uma célula da linha que indica prospecto já convertido ("Não convertido" não casa)
+SITUACOES_CONVERTIDO = {s.strip().casefold() for s in os.environ.get('SITUACOES_CONVERTIDO', 'Convertido').split(',') if s.strip()}
+# Link para o cliente vinculado dentro da linha do prospecto
+SELETOR_CLIENTE_VINCULADO = os.environ.get('SELETOR_CLIENTE_VINCULADO', 'a[href*="/cliente/"]')
+# Resposta ao SALVAR do wizard: prazo para o toast do Hubsoft (nunca encolhe com as animações
+# desligadas). Um toast de sucesso (PADRAO_SALVO, em monitor_hubsoft.py) encerra antes do prazo
+ESPERA_POS_SALVAR_S = float(os.environ.get('ESPERA_POS_SALVAR_S', '3'))
+
+
+def migrar_esquema():
+    """Migrações dos dois bancos (migracoes.py), uma vez por processo: main() e agendador, não a cada conexão."""
+    return migracoes.migrar_bancos(((migracoes.PRIMARIO, DB_CONFIG), (migracoes.DJANGO, DB_CONFIG_DJANGO)))
+
+
+def obter_headless():
+    """Headless é padrão; --no-headless ou HEADLESS=false desabilitam."""
     parser = argparse.ArgumentParser(description='Automatização de conversão de prospectos')
-    parser.add_argument('--no-headless', action='store_true', 
+    parser.add_argument('--no-headless', action='store_true',
                         help='Executar o navegador em modo visível (desabilita headless)')
-    args = parser.parse_args()
-    
+    # parse_known_args: o fluxo também é chamado por scripts com argumentos próprios (ex.: agendador.py)
+    args, _ = parser.parse_known_args()
+
     # MUDANÇA: Agora headless é padrão, use --no-headless para desabilitar
-    headless = not args.no_headless and os.environ.get('HEADLESS', 'true').lower() != 'false'
-    
-    # Obter credenciais do .env
-    usuario = os.environ.get('USUARIO', '')
-    senha = os.environ.get('SENHA', '')
-    
-    if not usuario or not senha:
-        print("❌ Credenciais não encontradas no arquivo .env")
-        processor.desconectar_banco()
-        return
-    
-    # Configurações do Chrome (mesmas do arquivo original)
+    return not args.no_headless and os.environ.get('HEADLESS', 'true').lower() != 'false'
+
+
+def criar_opcoes_chrome(headless, temp_dir):
+    """Monta as opções do Chrome (mesmas do arquivo original)."""
     chrome_options = Options()
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument('--enable-logging')
     chrome_options.add_argument('--v=1')
-    
+
     # Configurações especiais para garantir janela grande
     chrome_options.add_argument('--start-maximized')  # Inicia maximizado
     chrome_options.add_argument('--window-size=1920,1080')  # Tamanho inicial grande
-    
+
     # Habilitar logs de performance e DevTools Protocol
     chrome_options.set_capability("goog:loggingPrefs", {
         "browser": "ALL",
         "performance": "ALL",
         "network": "ALL"
     })
-    
+
     if headless:
         chrome_options.add_argument("--headless=new")
         # Configurações adicionais para headless
         chrome_options.add_argument('--disable-gpu')  # Necessário para alguns sistemas
         chrome_options.add_argument('--window-size=1920,1080')  # Força tamanho em headless
         chrome_options.add_argument('--force-device-scale-factor=1')  # Escala normal
-        print("🕶️ Executando em modo headless")
-    
-    print(f"⚙️ Configurando o Chrome... (Modo headless: {'Sim' if headless else 'Não'})")
-    
-    driver = None
-    temp_dir = None
-    try:
-        # Inicializar status
-        processor.salvar_prospecto(nome_filtro, id_prospecto, "INICIANDO")
-        
-        # Adicionar diretório único para evitar conflitos
-        temp_dir = tempfile.mkdtemp()
-        chrome_options.add_argument(f"--user-data-dir={temp_dir}")
-        chrome_options.add_argument("--no-first-run")
-        chrome_options.add_argument("--disable-default-apps")
-        
-        driver = webdriver.Chrome(options=chrome_options)
-        wait = WebDriverWait(driver, 15)
-        
-        # ETAPA 1: Login
-        try:
-            print("🔐 ETAPA 1: Realizando login...")
-            driver.get("https://megalinktelecom.hubsoft.com.br/login")
-            
-            # Campo de email
-            email_input = wait.until(EC.presence_of_element_located((By.NAME, "email")))
-            email_input.clear()
-            email_input.send_keys(usuario)
-            time.sleep(1)
-            
-            # Botão Validar
-            validar_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Validar')]")))
-            validar_button.click()
-            
-            # Campo de senha
-            password_input = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='password']")))
-            password_input.clear()
-            password_input.send_keys(senha)
-            time.sleep(1)
-            
-            # Botão Entrar
-            entrar_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Entrar')]")))
-            entrar_button.click()
-            
-            time.sleep(5)
-            
-            processor.salvar_prospecto(nome_filtro, id_prospecto, "LOGIN_REALIZADO")
-            print("✅ ETAPA 1: Login realizado com sucesso")
-            
-        except Exception as e:
-            erro_detalhado = f"ETAPA 1 - ERRO LOGIN: {str(e)}"
-            print(f"❌ {erro_detalhado}")
-            processor.capturar_screenshot_erro(driver, "login", "ETAPA1")
-            processor.salvar_prospecto(nome_filtro, id_prospecto, "ERRO_LOGIN", erro_detalhado)
-            raise
-        
-        # ETAPA 2: Navegação para Prospectos
+        logger.debug("🕶️ Executando em modo headless")
+
+    # Adicionar diretório único para evitar conflitos
+    chrome_options.add_argument(f"--user-data-dir={temp_dir}")
+    chrome_options.add_argument("--no-first-run")
+    chrome_options.add_argument("--disable-default-apps")
+    return chrome_options
+
+
+class SessaoHubsoft:
+    """Navegador aberto no Hubsoft, reaproveitado entre prospectos no modo lote."""
+
+    def __init__(self, headless, backend=None, driver=None):
+        backend = backend or BACKEND_NAVEGADOR
+        self.headless = headless
+        self.temp_dir = None
+        if driver is not None:
+            # Aba de um navegador compartilhado (ver lote_abas.py): o navegador não é desta sessão
+            self.driver = driver
+        else:
+            logger.info(f"⚙️ Configurando o Chrome... (Modo headless: {'Sim' if headless else 'Não'}, backend: {backend})")
+            # Perfil registrado em nome deste worker: se ele morrer, o coletor de órfãos limpa
+            self.temp_dir = coletor_orfaos.criar_perfil()
+            try:
+                if backend == 'cdp':
+                    self.driver = DriverCDP.iniciar(headless, self.temp_dir)
+                else:
+                    # chromedriver (e o Chrome filho dele) num grupo de processos próprio
+                    self.driver = webdriver.Chrome(options=criar_opcoes_chrome(headless, self.temp_dir),
+                                                   service=Service(popen_kw={'start_new_session': True}))
+            except Exception:
+                shutil.rmtree(self.temp_dir, ignore_errors=True)
+                raise
+            coletor_orfaos.registrar_grupo(self.temp_dir, self.pid_navegador())
+
+        # Trilha de etapas, comandos e rede de cada execução (ver gravador_voo.py)
+        self.gravador = GravadorVoo()
+        self.gravador.instrumentar(self.driver)
+
+        # Monitor de toasts/diálogos de erro: aborta a etapa sem esperar o timeout
+        self.monitor = MonitorHubsoft(self.driver)
+        self.monitor.instalar()
+
+        # Sem animações do Angular Material as pausas fixas podem encolher
+        self.fator_pausas = animacoes.desativar(self.driver)
+
+        # Timeouts por etapa aprendidos das execuções anteriores
+        self.historico_tempos = HistoricoTempos()
+        self.politica = PoliticaTimeout(self.historico_tempos)
+        self.wait = None
+        self.janela_ajustada = False  # Ajuste de janela só precisa ser feito uma vez
+        self.catalogo_opcoes = CatalogoOpcoes()  # Rótulos dos md-select do wizard, persistidos entre sessões
+
+        # Orçamento global de logins/buscas/salvamentos, compartilhado entre workers
+        self.limitador = LimitadorTaxa.compartilhado(DB_CONFIG)
+
+        # Memória/CPU do Chrome desta sessão, para reciclar navegadores inchados entre prospectos
+        self.vigia = VigiaRecursos(self.pid_navegador())
+        servidor_saude.navegador_aberto(self.pid_navegador())
+
+    def pid_navegador(self):
+        """Raiz da árvore de processos do Chrome (o chromedriver, no backend Selenium)."""
+        if isinstance(self.driver, DriverCDP):
+            return self.driver.navegador.processo.pid
+        servico = getattr(self.driver, 'service', None)
+        processo = getattr(servico, 'process', None)
+        pid = getattr(processo, 'pid', None)
+        return pid if isinstance(pid, int) else None
+
+    def espera(self, etapa):
+        return self.politica.espera(self.driver, self.monitor, etapa)
+
+    def pausa(self, segundos, animacao=True):
+        """
+        Pausa fixa. Só a de animação encolhe com o fator (animações desativadas);
+        a que cobre resposta do Hubsoft (animacao=False) vale inteira.
+        """
+        time.sleep(segundos * self.fator_pausas if animacao else segundos)
+
+    def encerrar(self):
+        servidor_saude.navegador_fechado(self.pid_navegador())
+        self.vigia.encerrar()
+        self.gravador.desinstrumentar()
         try:
-            print("🧭 ETAPA 2: Navegando para prospectos...")
-            # Expandir menu Cliente
-            cliente_arrow = wait.until(EC.element_to_be_clickable((By.XPATH, "//i[contains(@class, 'icon-chevron-right') and contains(@class, 'arrow')]")))
-            cliente_arrow.click()
-            time.sleep(1)
-            
-            # Clicar em Prospectos
-            prospectos_link = wait.until(EC.element_to_be_clickable((By.XPATH, "//span[@class='title ng-scope ng-binding flex' and contains(text(), 'Prospectos')]//parent::a")))
-            prospectos_link.click()
-            time.sleep(3)
-            
-            processor.salvar_prospecto(nome_filtro, id_prospecto, "NAVEGACAO_PROSPECTOS")
-            print("✅ ETAPA 2: Navegação concluída com sucesso")
-            
-        except Exception as e:
-            erro_detalhado = f"ETAPA 2 - ERRO NAVEGAÇÃO: {str(e)}"
-            print(f"❌ {erro_detalhado}")
-            processor.capturar_screenshot_erro(driver, "navegacao", "ETAPA2")
-            processor.salvar_prospecto(nome_filtro, id_prospecto, "ERRO_NAVEGACAO", erro_detalhado)
-            raise
-        
-        # ETAPA 3: Filtrar e localizar prospecto
+            self.driver.quit()
+        finally:
+            if self.temp_dir:
+                # Navegador próprio: nada do grupo dele pode sobreviver à sessão
+                coletor_orfaos.encerrar_grupo(self.pid_navegador())
+                shutil.rmtree(self.temp_dir, ignore_errors=True)
+            self.historico_tempos.salvar()
+            self.catalogo_opcoes.salvar()
+            esperas = {acao: round(m['segundos'], 1) for acao, m in self.limitador.resumo().items() if m['esperas']}
+            if esperas:
+                logger.info(f"⏳ Tempo aguardando limite de taxa (s): {esperas}")
+
+
+def etapa_login(sessao, usuario, senha):
+    driver, wait = sessao.driver, sessao.wait
+    sessao.limitador.aguardar('login')
+    driver.get(URL_LOGIN)
+
+    # Campo de email
+    email_input = wait.presente((By.NAME, "email"))
+    email_input.clear()
+    email_input.send_keys(usuario)
+    time.sleep(1)
+
+    # Botão Validar
+    validar_button = wait.clicavel((By.XPATH, "//button[contains(., 'Validar')]"))
+    validar_button.click()
+
+    # Campo de senha
+    password_input = wait.presente((By.CSS_SELECTOR, "input[type='password']"))
+    password_input.clear()
+    password_input.send_keys(senha)
+    time.sleep(1)
+
+    # Botão Entrar
+    entrar_button = wait.clicavel((By.XPATH, "//button[contains(., 'Entrar')]"))
+    entrar_button.click()
+
+    time.sleep(5)
+
+    # Erro de credenciais aparece como toast; a partir daqui, voltar ao login = sessão perdida
+    sessao.monitor.verificar()
+    sessao.monitor.sessao_ativa = True
+
+
+def etapa_navegacao(sessao):
+    wait = sessao.wait
+    # Expandir menu Cliente
+    cliente_arrow = wait.clicavel((By.XPATH, "//i[contains(@class, 'icon-chevron-right') and contains(@class, 'arrow')]"))
+    cliente_arrow.click()
+    time.sleep(1)
+
+    # Clicar em Prospectos
+    prospectos_link = wait.clicavel((By.XPATH, XPATH_LINK_PROSPECTOS))
+    prospectos_link.click()
+    time.sleep(3)
+
+
+def ajustar_janela(sessao):
+    """Maximiza a janela (essencial para visualizar os botões de Ações na tabela)."""
+    driver, headless = sessao.driver, sessao.headless
+    logger.debug("🔧 MAXIMIZANDO JANELA DO NAVEGADOR (essencial para visualizar botões na tabela)...")
+
+    # Primeiro, definir um tamanho grande para garantir
+    try:
+        # Para headless, é importante definir um tamanho específico primeiro
+        driver.set_window_size(1920, 1080)
+        logger.debug("✅ Tamanho inicial definido: 1920x1080")
+        time.sleep(1)
+
+        # Tentar maximizar (funciona melhor após definir um tamanho)
+        driver.maximize_window()
+        logger.debug("✅ Janela maximizada com sucesso!")
+
+        # Em modo headless, forçar tamanho máximo de tela
+        if headless:
+            # Para headless, usar tamanho de tela full HD ou maior
+            driver.set_window_size(1920, 1080)
+            logger.debug("✅ Modo headless: viewport definido para 1920x1080")
+
+            # Opção adicional: tentar definir um tamanho ainda maior para headless
+            try:
+                driver.execute_script("window.moveTo(0, 0);")
+                driver.execute_script("window.resizeTo(screen.width, screen.height);")
+                logger.debug("✅ JavaScript: janela redimensionada para tamanho máximo da tela")
+            except Exception:
+                pass
+
+        # Aguardar a janela se ajustar e a tabela re-renderizar
+        time.sleep(3)
+        logger.debug("✅ Aguardando re-renderização da tabela com janela maximizada...")
+
+    except Exception as e:
+        logger.warning(f"⚠️ Erro ao maximizar: {e}")
+        # Fallback final: garantir pelo menos um tamanho grande
         try:
-            print("🔍 ETAPA 3: Localizando prospecto...")
-            # Localizar tabela
-            tabela = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "table.dataTable.row-border.hover")))
-            
-            # Filtrar por nome
-            campo_busca = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "input[ng-model='vm.filtros.busca']")))
-            campo_busca.clear()
-            campo_busca.send_keys(nome_filtro)
-            campo_busca.send_keys(Keys.ENTER)
+            driver.set_window_size(1920, 1080)
+            logger.debug("✅ Fallback: tamanho 1920x1080 aplicado")
             time.sleep(2)
-            
-            # CRÍTICO: Maximizar janela ANTES de procurar o botão de Ações
-            print("🔧 MAXIMIZANDO JANELA DO NAVEGADOR (essencial para visualizar botões na tabela)...")
-            
-            # Primeiro, definir um tamanho grande para garantir
+        except Exception:
+            logger.error("❌ Não foi possível ajustar o tamanho da janela")
+
+    sessao.janela_ajustada = True
+
+
+def etapa_localizar(sessao, nome_filtro):
+    driver, wait = sessao.driver, sessao.wait
+    # Localizar tabela
+    wait.presente((By.CSS_SELECTOR, CSS_TABELA_PROSPECTOS))
+
+    # Filtrar por nome
+    campo_busca = wait.presente((By.CSS_SELECTOR, "input[ng-model='vm.filtros.busca']"))
+    campo_busca.clear()
+    campo_busca.send_keys(nome_filtro)
+    sessao.limitador.aguardar('busca')
+    campo_busca.send_keys(Keys.ENTER)
+    time.sleep(2)
+
+    # CRÍTICO: Maximizar janela ANTES de procurar o botão de Ações
+    # (no modo lote a janela já foi ajustada no primeiro prospecto)
+    if not sessao.janela_ajustada:
+        ajustar_janela(sessao)
+
+    # Forçar um refresh da página para garantir que a tabela seja re-renderizada
+    try:
+        driver.execute_script("window.dispatchEvent(new Event('resize'));")
+        logger.debug("✅ Evento de redimensionamento disparado para atualizar layout")
+    except Exception:
+        pass
+
+
+def etapa_acoes(sessao, id_prospecto):
+    driver, wait = sessao.driver, sessao.wait
+    xpath_acoes = f"//tr[.//td[normalize-space(.)='{id_prospecto}']]/descendant::button[@aria-label='Open menu with custom trigger' and .//span[normalize-space(.)='Ações']]"
+    acoes_button = wait.clicavel((By.XPATH, xpath_acoes))
+
+    comportamento = 'smooth' if sessao.fator_pausas == 1.0 else 'auto'
+    driver.execute_script(f"arguments[0].scrollIntoView({{behavior: '{comportamento}', block: 'center'}});", acoes_button)
+    sessao.pausa(1)
+
+    acoes_button.click()
+    sessao.pausa(2)
+
+
+def etapa_converter(sessao):
+    driver, wait = sessao.driver, sessao.wait
+    converter_button = wait.clicavel((By.XPATH, "//span[@style='color:green' and contains(text(), 'Converter em Cliente')]"))
+    driver.execute_script("arguments[0].click();", converter_button)
+    # O wizard é carregado do Hubsoft ao abrir o diálogo
+    sessao.pausa(3, animacao=False)
+
+
+XPATH_WIZARD = "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard"
+XPATH_BOTAO_WIZARD = XPATH_WIZARD + "/div[2]/md-dialog-actions/div[2]/button"
+# Conteúdo da tela atual do wizard: cada tela renderiza um nó novo aqui
+XPATH_TELA_WIZARD = XPATH_WIZARD + "/div[1]/div"
+
+# Cada tela do wizard roda como um único roteiro na página (ver roteiro_wizard.py)
+ROTEIRO_TELA1 = [
+    escolher("campo_tela1",
+             XPATH_WIZARD + "/div[1]/div/hubsoft-accordion/div[2]/hubsoft-accordion-content/div/form/div/div[6]/md-input-container[1]/md-select",
+             posicao=1, pausa=1, pausa_menu=1),
+    clicar("primeiro_botao", XPATH_BOTAO_WIZARD, pausa=2, tela=XPATH_TELA_WIZARD),
+    clicar("segundo_botao", XPATH_BOTAO_WIZARD, pausa=3, tela=XPATH_TELA_WIZARD),
+]
+
+ROTEIRO_SELECOES = [
+    escolher("primeiro_select", XPATH_WIZARD + "/div[1]/div/div/form/div/md-input-container/md-select",
+             posicao=1, pausa=1, pausa_menu=1),
+    escolher("segundo_select", XPATH_WIZARD + "/div[1]/div/div/form/div/div[2]/md-input-container[2]/md-select",
+             posicao=25, pausa=1, pausa_menu=1),
+    clicar("botao_avancar", XPATH_BOTAO_WIZARD, pausa=2, tela=XPATH_TELA_WIZARD),
+]
+
+ROTEIRO_TELA2 = [
+    clicar("proximo_botao", XPATH_BOTAO_WIZARD, pausa=3, tela=XPATH_TELA_WIZARD),
+    escolher("novo_select", XPATH_WIZARD + "/div[1]/div/form/div[1]/div/md-input-container[1]/md-select",
+             posicao=1, pausa=2, pausa_menu=1),
+]
+
+ROTEIRO_FINALIZACAO = [
+    clicar("primeiro_final", XPATH_BOTAO_WIZARD, pausa=2, tela=XPATH_TELA_WIZARD),
+    clicar("segundo_final", XPATH_BOTAO_WIZARD, pausa=2, tela=XPATH_TELA_WIZARD),
+]
+XPATH_BOTAO_SALVAR = XPATH_WIZARD + "/div[2]/md-dialog-actions/div[2]/div/button"
+
+
+def etapa_wizard_tela1(sessao):
+    logger.debug("🔽 Selecionando opção no campo...")
+    executar_roteiro(sessao, ROTEIRO_TELA1, sessao.wait.timeout)
+
+
+def etapa_wizard_selecoes(sessao):
+    executar_roteiro(sessao, ROTEIRO_SELECOES, sessao.wait.timeout)
+
+
+def etapa_wizard_tela2(sessao):
+    executar_roteiro(sessao, ROTEIRO_TELA2, sessao.wait.timeout)
+
+
+def etapa_finalizacao(sessao):
+    executar_roteiro(sessao, ROTEIRO_FINALIZACAO, sessao.wait.timeout)
+
+    # O SALVAR fica fora do roteiro: passa antes pelo limite de taxa global
+    sessao.limitador.aguardar('wizard')
+    executar_roteiro(sessao, [clicar("botao_salvar", XPATH_BOTAO_SALVAR)], sessao.wait.timeout)
+    aguardar_resposta_salvar(sessao)
+
+    # Nenhuma tela do wizard pode ter ficado esperando callback de animação
+    if not animacoes.verificar(sessao.driver):
+        logger.warning("⚠️ Elementos presos em animação: pausas inteiras no resto da sessão")
+        sessao.fator_pausas = 1.0
+
+
+def aguardar_resposta_salvar(sessao):
+    """
+    Rejeições no SALVAR (ex.: CPF duplicado) chegam como toast, às vezes segundos
+    depois do clique: o monitor lança ErroHubsoft e o prospecto não é marcado como
+    concluído. Um toast de sucesso encerra a espera antes de ESPERA_POS_SALVAR_S.
+    """
+    limite = time.monotonic() + ESPERA_POS_SALVAR_S
+    while True:
+        eventos = sessao.monitor.verificar()
+        if any(toast_de_sucesso(e) for e in eventos):
+            return True
+        restante = limite - time.monotonic()
+        if restante <= 0:
+            return False
+        time.sleep(min(0.25, restante))
+
+
+# Etapas do fluxo: função, mensagem de início, status de sucesso, mensagem de sucesso,
+# status de erro, descrição do erro e nome do screenshot
+ETAPAS = {
+    1: (etapa_login, "🔐 ETAPA 1: Realizando login...", "LOGIN_REALIZADO",
+        "✅ ETAPA 1: Login realizado com sucesso", "ERRO_LOGIN", "ERRO LOGIN", "login"),
+    2: (etapa_navegacao, "🧭 ETAPA 2: Navegando para prospectos...", "NAVEGACAO_PROSPECTOS",
+        "✅ ETAPA 2: Navegação concluída com sucesso", "ERRO_NAVEGACAO", "ERRO NAVEGAÇÃO", "navegacao"),
+    3: (etapa_localizar, "🔍 ETAPA 3: Localizando prospecto...", "PROSPECTO_LOCALIZADO",
+        "✅ ETAPA 3: Prospecto localizado com sucesso", "ERRO_LOCALIZACAO", "ERRO LOCALIZAÇÃO PROSPECTO", "localizacao"),
+    4: (etapa_acoes, "⚙️ ETAPA 4: Abrindo menu de ações...", "MENU_ACOES_ABERTO",
+        "✅ ETAPA 4: Menu de ações aberto com sucesso", "ERRO_ACOES", "ERRO MENU AÇÕES", "acoes"),
+    5: (etapa_converter, "🔄 ETAPA 5: Convertendo para cliente...", "WIZARD_INICIADO",
+        "✅ ETAPA 5: Wizard de conversão iniciado com sucesso", "ERRO_CONVERTER", "ERRO CONVERSÃO", "converter"),
+    6: (etapa_wizard_tela1, "📋 ETAPA 6: Preenchendo wizard (1/4)...", "WIZARD_TELA1",
+        "✅ ETAPA 6: Primeira tela do wizard concluída com sucesso", "ERRO_WIZARD1", "ERRO WIZARD TELA 1", "wizard1"),
+    7: (etapa_wizard_selecoes, "📝 ETAPA 7: Preenchendo wizard (2/4)...", "WIZARD_SELECOES",
+        "✅ ETAPA 7: Seleções do wizard concluídas com sucesso", "ERRO_WIZARD_SELECOES", "ERRO WIZARD SELEÇÕES", "wizard_selecoes"),
+    8: (etapa_wizard_tela2, "📋 ETAPA 8: Preenchendo wizard (3/4)...", "WIZARD_TELA2",
+        "✅ ETAPA 8: Terceira tela do wizard concluída com sucesso", "ERRO_WIZARD2", "ERRO WIZARD TELA 2", "wizard2"),
+    9: (etapa_finalizacao, "💾 ETAPA 9: Finalizando (4/4)...", "CONCLUIDO",
+        None, "ERRO_FINALIZACAO", "ERRO FINALIZAÇÃO", "finalizacao"),
+}
+
+
+def preparar_repeticao(sessao, numero):
+    """Deixa a tela pronta para repetir uma ETAPA idempotente (ver politica_retentativa.py)."""
+    if numero == 2:
+        # O menu Cliente pode ter ficado expandido: recarrega para clicar do zero
+        sessao.driver.get(sessao.driver.current_url)
+        time.sleep(2)
+
+
+DURACAO_ETAPA_PADRAO_S = 10  # Estimativa de uma ETAPA sem histórico, para a drenagem
+
+
+def duracao_restante_estimada(sessao, a_partir_de):
+    """p90 da duração das ETAPAS `a_partir_de`..9 (tempos_etapas), para decidir se o prospecto termina na drenagem."""
+    sufixo = "" if sessao.fator_pausas == 1.0 else "_SEM_ANIMACAO"
+    total = 0.0
+    for numero in range(a_partir_de, 10):
+        p90 = percentil(sessao.historico_tempos.amostras.get(f"DURACAO_ETAPA{numero}{sufixo}", []), 90)
+        total += p90 if p90 is not None else DURACAO_ETAPA_PADRAO_S
+    return total
+
+
+def executar_etapa(sessao, processor, nome_filtro, id_prospecto, numero, *args):
+    """
+    Executa uma ETAPA registrando status, screenshot e erro detalhado.
+    Sem id_prospecto (login/navegação do modo lote) o status não é gravado no banco.
+    Login, navegação e filtro são repetidos na hora em falhas transitórias
+    (RETENTATIVAS_ETAPA) antes de o erro ser gravado. Durante a drenagem, só
+    começa se o resto do prospecto couber no prazo.
+    """
+    if id_prospecto is not None and drenagem.drenando():
+        estimativa = duracao_restante_estimada(sessao, numero)
+        if estimativa > drenagem.restante():
+            raise drenagem.InterrompidoPorDrenagem(
+                f"ETAPA {numero}: faltam ~{estimativa:.0f}s, restam {drenagem.restante():.0f}s de prazo")
+    funcao, msg_inicio, status_ok, msg_ok, status_erro, descricao_erro, screenshot = ETAPAS[numero]
+    sessao.wait = sessao.espera(f"ETAPA{numero}")
+    repeticoes = 0
+    servidor_saude.marcar(etapa=numero)
+    with log_estruturado.na_etapa(numero):
+        while True:
+            inicio = time.monotonic()
+            sessao.gravador.registrar('etapa_inicio', etapa=numero)
             try:
-                # Para headless, é importante definir um tamanho específico primeiro
-                driver.set_window_size(1920, 1080)
-                print("✅ Tamanho inicial definido: 1920x1080")
-                time.sleep(1)
-                
-                # Tentar maximizar (funciona melhor após definir um tamanho)
-                driver.maximize_window()
-                print("✅ Janela maximizada com sucesso!")
-                
-                # Em modo headless, forçar tamanho máximo de tela
-                if headless:
-                    # Para headless, usar tamanho de tela full HD ou maior
-                    driver.set_window_size(1920, 1080)
-                    print("✅ Modo headless: viewport definido para 1920x1080")
-                    
-                    # Opção adicional: tentar definir um tamanho ainda maior para headless
-                    try:
-                        driver.execute_script("window.moveTo(0, 0);")
-                        driver.execute_script("window.resizeTo(screen.width, screen.height);")
-                        print("✅ JavaScript: janela redimensionada para tamanho máximo da tela")
-                    except:
-                        pass
-                
-                # Aguardar a janela se ajustar e a tabela re-renderizar
-                time.sleep(3)
-                print("✅ Aguardando re-renderização da tabela com janela maximizada...")
-                
+                logger.info(msg_inicio)
+                funcao(sessao, *args)
+                # Duração total da etapa, separada por animações ligadas/desligadas (ver tempos_etapas.py)
+                duracao = time.monotonic() - inicio
+                sessao.gravador.registrar('etapa_fim', etapa=numero, ms=round(duracao * 1000, 1))
+                sufixo = "" if sessao.fator_pausas == 1.0 else "_SEM_ANIMACAO"
+                sessao.historico_tempos.registrar(f"DURACAO_ETAPA{numero}{sufixo}", duracao)
+                campos = {'duracao_ms': int(duracao * 1000)}
+
+                if id_prospecto is None:
+                    logger.info(msg_ok, extra=campos)
+                elif status_ok == "CONCLUIDO":
+                    processor.salvar_prospecto(nome_filtro, id_prospecto, "CONCLUIDO", None, "sucesso")
+                    tempo_total = int(time.time() - processor.start_time)
+                    logger.info(f"🎉 ETAPA 9: SUCESSO! Prospecto convertido em {tempo_total}s", extra=campos)
+                else:
+                    processor.salvar_prospecto(nome_filtro, id_prospecto, status_ok)
+                    logger.info(msg_ok, extra=campos)
+                processor.registrar_evento(id_prospecto, status_ok, numero, repeticao=repeticoes, **campos)
+                if numero == 1:
+                    DISJUNTORES['hubsoft'].registrar_sucesso()
+                return
+
+            except drenagem.InterrompidoPorDrenagem:
+                # Espera do limitador de taxa cortada pela drenagem: não é falha da etapa
+                raise
             except Exception as e:
-                print(f"⚠️ Erro ao maximizar: {e}")
-                # Fallback final: garantir pelo menos um tamanho grande
+                erro_detalhado = f"ETAPA {numero} - {descricao_erro}: {str(e)}"
+                classe = classificador_falhas.classificar(e)
+                duracao_ms = int((time.monotonic() - inicio) * 1000)
+                sessao.gravador.registrar('etapa_fim', etapa=numero, ms=duracao_ms, codigo_erro=status_erro,
+                                          classe_erro=classe, erro=str(e)[:500])
+                if politica_retentativa.repetir_etapa(numero, classe, repeticoes):
+                    processor.registrar_evento(id_prospecto, status_erro, numero, repeticao=repeticoes, duracao_ms=duracao_ms,
+                                               classe_erro=classe, erro=erro_detalhado)
+                    repeticoes += 1
+                    espera = politica_retentativa.espera_etapa(repeticoes)
+                    logger.warning(f"🔁 {erro_detalhado} - repetindo ({repeticoes}/{politica_retentativa.RETENTATIVAS_ETAPA}) em {espera:.1f}s",
+                                   extra={'duracao_ms': duracao_ms, 'codigo_erro': status_erro, 'classe_erro': classe})
+                    time.sleep(espera)
+                    try:
+                        preparar_repeticao(sessao, numero)
+                    except Exception as erro_preparo:
+                        logger.warning(f"⚠️ Erro ao preparar nova tentativa da ETAPA {numero}: {erro_preparo}")
+                    continue
+
+                logger.error(f"❌ {erro_detalhado}", extra={'duracao_ms': duracao_ms, 'codigo_erro': status_erro, 'classe_erro': classe})
+                if numero == 1 and classe in classificador_falhas.RETENTAVEIS:
+                    DISJUNTORES['hubsoft'].registrar_falha(erro_detalhado)
+                sessao.gravador.instantaneo(sessao.driver, status_erro)
+                arquivo = processor.capturar_screenshot_erro(sessao.driver, screenshot, f"ETAPA{numero}")
+                sessao.gravador.registrar('screenshot', arquivo=arquivo)
+                if id_prospecto is not None:
+                    processor.salvar_prospecto(nome_filtro, id_prospecto, status_erro, erro_detalhado, classe_erro=classe)
+                processor.registrar_evento(id_prospecto, status_erro, numero, repeticao=repeticoes, duracao_ms=duracao_ms,
+                                           classe_erro=classe, erro=erro_detalhado)
+                raise
+
+
+def situacao_prospecto(sessao, id_prospecto):
+    """Linha filtrada e menu de Ações num único execute_script, sem esperas ({} se indisponível)."""
+    try:
+        return sessao.driver.execute_script(SCRIPT_SITUACAO_PROSPECTO, str(id_prospecto), SELETOR_CLIENTE_VINCULADO) or {}
+    except Exception as e:
+        logger.debug(f"Verificação de prospecto já convertido indisponível: {e}")
+        return {}
+
+
+def ja_convertido(situacao):
+    """
+    Sinal positivo de que o prospecto já virou cliente: uma célula da linha com
+    valor exato em SITUACOES_CONVERTIDO ou um cliente vinculado na linha.
+    Retorna o motivo, ou None. O menu sem "Converter em Cliente" não basta.
+    """
+    celulas = situacao.get('celulas') or []
+    convertida = next((c for c in celulas if ' '.join(c.split()).casefold() in SITUACOES_CONVERTIDO), None)
+    if convertida:
+        return f"situação na linha da tabela: {convertida}"
+    if situacao.get('cliente'):
+        return f"cliente vinculado: {situacao['cliente'][:120]}"
+    return None
+
+
+def itens_sem_converter(situacao):
+    """Itens do menu de Ações aberto quando falta o "Converter em Cliente"; None se o menu está fechado ou tem a opção."""
+    itens = situacao.get('itens_menu')
+    if itens and not any('Converter em Cliente' in item for item in itens):
+        return itens
+    return None
+
+
+def concluir_ja_convertido(sessao, processor, nome_filtro, id_prospecto, motivo):
+    """Registra como sucesso, sem abrir o wizard, um prospecto que já tinha sido convertido."""
+    logger.info(f"✅ Prospecto {nome_filtro} (ID: {id_prospecto}) já convertido ({motivo}); registrando sucesso sem abrir o wizard")
+    sessao.gravador.registrar('ja_convertido', motivo=motivo)
+    processor.salvar_prospecto(nome_filtro, id_prospecto, "CONCLUIDO", None, "sucesso")
+    processor.registrar_evento(id_prospecto, "JA_CONVERTIDO", erro=motivo)
+
+
+def processar_prospecto(sessao, processor, nome_filtro, id_prospecto):
+    """
+    ETAPAS 3 a 9: localiza o prospecto na lista já aberta e o converte em cliente.
+    Antes do wizard confere se ele já foi convertido (ex.: numa execução que
+    salvou no Hubsoft mas não chegou a gravar CONCLUIDO) para não duplicar o cliente.
+    """
+    executar_etapa(sessao, processor, nome_filtro, id_prospecto, 3, nome_filtro)
+    motivo = ja_convertido(situacao_prospecto(sessao, id_prospecto))
+    if motivo:
+        concluir_ja_convertido(sessao, processor, nome_filtro, id_prospecto, motivo)
+        return
+    executar_etapa(sessao, processor, nome_filtro, id_prospecto, 4, id_prospecto)
+    # Menu recém-aberto pode ainda estar montando os itens: só vale a segunda leitura
+    if itens_sem_converter(situacao_prospecto(sessao, id_prospecto)):
+        sessao.pausa(1, animacao=False)
+        situacao = situacao_prospecto(sessao, id_prospecto)
+        motivo = ja_convertido(situacao)
+        if motivo:
+            concluir_ja_convertido(sessao, processor, nome_filtro, id_prospecto, motivo)
+            return
+        itens = itens_sem_converter(situacao)
+        if itens:
+            # Sem sinal positivo de conversão não é sucesso: vai para revisão (erro de dados, sem nova tentativa)
+            raise ErroHubsoft("SEM_OPCAO_CONVERTER",
+                              f"menu de ações sem 'Converter em Cliente' e sem sinal de conversão: {', '.join(itens)[:120]}",
+                              "menu")
+    for numero in range(5, 10):
+        executar_etapa(sessao, processor, nome_filtro, id_prospecto, numero)
+
+
+def registrar_erro_geral(sessao, processor, nome_filtro, id_prospecto, e):
+    erro_detalhado = f"ERRO GERAL DO PROCESSO: {str(e)}"
+    classe = classificador_falhas.classificar(e)
+    logger.error(f"❌ {erro_detalhado}", extra={'codigo_erro': 'ERRO_GERAL', 'classe_erro': classe})
+    if processor.current_prospecto_id:
+        processor.salvar_prospecto(nome_filtro, id_prospecto, "ERRO_GERAL", erro_detalhado, "falha", classe_erro=classe)
+    processor.registrar_evento(id_prospecto, "ERRO_GERAL", classe_erro=classe, erro=erro_detalhado)
+    if sessao:
+        processor.capturar_screenshot_erro(sessao.driver, "erro_geral", "GERAL")
+
+
+# Resultado no lote de quem o prospecto_elegivel recusou (demais situações: "ignorado")
+RESULTADO_RECUSA = {"finalizado": "finalizado", "adiado": "adiado"}
+
+
+def prospecto_elegivel(nome_filtro, id_prospecto, elegibilidade):
+    """VERIFICAÇÃO: Não processar se esgotou as tentativas, se falhou sem chance de nova tentativa, se ainda está no backoff ou se já foi finalizado"""
+    situacao = elegibilidade.situacao(id_prospecto)
+    if situacao == "esgotado":
+        logger.error(f"❌ Prospecto {nome_filtro} (ID: {id_prospecto}) já esgotou as tentativas")
+        return False
+    if situacao == "nao_retentavel":
+        # Chaves do ResultadoElegibilidade são str; main() recebe o ID como veio da linha de comando
+        classe = elegibilidade.nao_retentaveis[str(id_prospecto)]
+        logger.error(f"❌ Prospecto {nome_filtro} (ID: {id_prospecto}) falhou por erro de {classe}: outra tentativa não resolve")
+        return False
+    if situacao == "adiado":
+        proxima = elegibilidade.adiados[str(id_prospecto)]
+        logger.info(f"⏳ Prospecto {nome_filtro} (ID: {id_prospecto}) aguardando nova tentativa às {proxima:%H:%M:%S}")
+        return False
+    if situacao == "finalizado":
+        logger.info(f"✅ Prospecto {nome_filtro} (ID: {id_prospecto}) já finalizado anteriormente")
+        return False
+    return True
+
+
+def voltar_para_lista(sessao):
+    """
+    Fecha o wizard/menus que tenham ficado abertos e volta à lista de Prospectos
+    pela própria navegação da SPA (sem recarregar a página).
+    """
+    driver = sessao.driver
+    driver.execute_script(SCRIPT_FECHAR_OVERLAYS)
+    time.sleep(1)
+    wait = sessao.espera("ETAPA2")
+    link = driver.find_elements(By.XPATH, XPATH_LINK_PROSPECTOS)
+    if link and link[0].is_displayed():
+        driver.execute_script("arguments[0].click();", link[0])
+        time.sleep(2)
+    else:
+        sessao.wait = wait
+        etapa_navegacao(sessao)
+    wait.presente((By.CSS_SELECTOR, CSS_TABELA_PROSPECTOS))
+
+
+def abrir_sessao(processor, headless, usuario, senha):
+    """Abre o navegador, faz login e deixa a lista de Prospectos aberta."""
+    sessao = SessaoHubsoft(headless)
+    try:
+        executar_etapa(sessao, processor, None, None, 1, usuario, senha)
+        executar_etapa(sessao, processor, None, None, 2)
+    except Exception:
+        sessao.encerrar()
+        raise
+    return sessao
+
+
+def main(nome_filtro=None, id_prospecto=None):
+    """
+    Função principal que automatiza a conversão de prospectos em clientes
+    """
+    processor = ProspectoProcessor()
+    processor.start_time = time.time()
+
+    # Restos de execuções anteriores que morreram sem fechar o Chrome
+    coletor_orfaos.coletar()
+
+    # Hubsoft ou banco fora do ar: nem abre o Chrome nem gasta tentativa
+    if not infraestrutura_liberada():
+        return
+
+    migrar_esquema()
+
+    # Conectar ao banco
+    if not processor.conectar_banco():
+        logger.error("❌ Falha ao conectar ao banco de dados")
+        return
+
+    logger.info("✅ Conectado ao banco de dados PostgreSQL")
+
+    elegibilidade = ServicoElegibilidade(processor.conn).classificar([id_prospecto])
+    if not prospecto_elegivel(nome_filtro, id_prospecto, elegibilidade):
+        processor.desconectar_banco()
+        return
+    processor.registros_conhecidos = elegibilidade.registros
+
+    log_estruturado.iniciar_execucao(id_prospecto)
+    logger.info(f"🤖 Iniciando processamento: {nome_filtro} (ID: {id_prospecto})")
+
+    headless = obter_headless()
+
+    # Obter credenciais do .env
+    usuario = os.environ.get('USUARIO', '')
+    senha = os.environ.get('SENHA', '')
+
+    if not usuario or not senha:
+        logger.error("❌ Credenciais não encontradas no arquivo .env")
+        processor.desconectar_banco()
+        return
+
+    sessao = None
+    sucesso = False
+    try:
+        # Inicializar status
+        processor.salvar_prospecto(nome_filtro, id_prospecto, "INICIANDO")
+
+        sessao = SessaoHubsoft(headless)
+        sessao.gravador.iniciar(log_estruturado.run_id_atual(), id_prospecto)
+        sessao.vigia.iniciar_prospecto()
+        executar_etapa(sessao, processor, nome_filtro, id_prospecto, 1, usuario, senha)
+        executar_etapa(sessao, processor, nome_filtro, id_prospecto, 2)
+        processar_prospecto(sessao, processor, nome_filtro, id_prospecto)
+        sucesso = True
+
+    except drenagem.InterrompidoPorDrenagem as e:
+        logger.warning(f"🛑 Prospecto {id_prospecto} interrompido pela drenagem ({e})")
+        processor.devolver_prospecto(id_prospecto)
+        sucesso = True  # Nada falhou: a gravação de voo não é guardada
+    except Exception as e:
+        registrar_erro_geral(sessao, processor, nome_filtro, id_prospecto, e)
+    finally:
+        if sessao:
+            sessao.gravador.finalizar(not sucesso)
+            processor.registrar_recursos(sessao.vigia.fim_prospecto())
+            sessao.encerrar()
+        processor.desconectar_banco()
+        logger.info("🔌 Desconectado do banco")
+
+
+def consumir_fila(fila, abrir, processor, elegibilidade, resultados, parar=None):
+    """
+    Processa os (nome_filtro, id_prospecto) de uma queue.Queue numa sessão criada por abrir().
+
+    Entre prospectos volta à lista limpa; se nem isso funcionar, a sessão é
+    reaberta. Várias chamadas podem consumir a mesma fila em paralelo (uma
+    por aba, ver lote_abas.py), cada uma com seu próprio processor. parar()
+    verdadeiro encerra a chamada antes do próximo prospecto (ex.: o Chrome
+    compartilhado precisa ser reciclado).
+    """
+    sessao = None
+    try:
+        while True:
+            if drenagem.drenando():
+                logger.info("🛑 Drenagem: o resto da fila fica para o próximo processo")
+                break
+            # Outro worker abriu o disjuntor: o resto da fila fica para depois
+            if infraestrutura_bloqueada():
+                logger.warning("⛔ Disjuntor aberto: parando o lote")
+                break
+            if parar and parar():
+                break
+            try:
+                nome_filtro, id_prospecto = fila.get_nowait()
+            except queue.Empty:
+                break
+            # A volta para a lista (ou a reabertura do navegador) já conta para a execução deste prospecto
+            log_estruturado.iniciar_execucao(id_prospecto)
+            servidor_saude.marcar('processando', prospecto=id_prospecto, run_id=log_estruturado.run_id_atual(), etapa=None)
+
+            # Isolamento entre prospectos: voltar à lista limpa ou reabrir o navegador
+            if sessao:
                 try:
-                    driver.set_window_size(1920, 1080)
-                    print("✅ Fallback: tamanho 1920x1080 aplicado")
-                    time.sleep(2)
-                except:
-                    print("❌ Não foi possível ajustar o tamanho da janela")
-            
-            # Forçar um refresh da página para garantir que a tabela seja re-renderizada
+                    voltar_para_lista(sessao)
+                except Exception as e:
+                    logger.warning(f"⚠️ Não foi possível voltar à lista ({e}); reabrindo o navegador")
+                    try:
+                        sessao.encerrar()
+                    except Exception:
+                        pass
+                    sessao = None
+
+            if sessao is None:
+                servidor_saude.marcar('abrindo_navegador')
+                sessao = abrir()
+                servidor_saude.marcar('processando')
+
+            logger.info(f"🤖 Iniciando processamento: {nome_filtro} (ID: {id_prospecto})")
+            processor.iniciar_prospecto()
+            if id_prospecto in elegibilidade.registros:
+                processor.registros_conhecidos[id_prospecto] = elegibilidade.registros[id_prospecto]
+            sessao.gravador.iniciar(log_estruturado.run_id_atual(), id_prospecto)
+            sessao.vigia.iniciar_prospecto()
             try:
-                driver.execute_script("window.dispatchEvent(new Event('resize'));")
-                print("✅ Evento de redimensionamento disparado para atualizar layout")
-            except:
-                pass
-            
-            processor.salvar_prospecto(nome_filtro, id_prospecto, "PROSPECTO_LOCALIZADO")
-            print("✅ ETAPA 3: Prospecto localizado com sucesso")
-            
-        except Exception as e:
-            erro_detalhado = f"ETAPA 3 - ERRO LOCALIZAÇÃO PROSPECTO: {str(e)}"
-            print(f"❌ {erro_detalhado}")
-            processor.capturar_screenshot_erro(driver, "localizacao", "ETAPA3")
-            processor.salvar_prospecto(nome_filtro, id_prospecto, "ERRO_LOCALIZACAO", erro_detalhado)
-            raise
-        
-        # ETAPA 4: Clicar no botão de Ações
-        try:
-            print("⚙️ ETAPA 4: Abrindo menu de ações...")
-            xpath_acoes = f"//tr[.//td[normalize-space(.)='{id_prospecto}']]/descendant::button[@aria-label='Open menu with custom trigger' and .//span[normalize-space(.)='Ações']]"
-            acoes_button = wait.until(EC.element_to_be_clickable((By.XPATH, xpath_acoes)))
-            
-            driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", acoes_button)
-            time.sleep(1)
-            
-            acoes_button.click()
-            time.sleep(2)
-            
-            processor.salvar_prospecto(nome_filtro, id_prospecto, "MENU_ACOES_ABERTO")
-            print("✅ ETAPA 4: Menu de ações aberto com sucesso")
-            
-        except Exception as e:
-            erro_detalhado = f"ETAPA 4 - ERRO MENU AÇÕES: {str(e)}"
-            print(f"❌ {erro_detalhado}")
-            processor.capturar_screenshot_erro(driver, "acoes", "ETAPA4")
-            processor.salvar_prospecto(nome_filtro, id_prospecto, "ERRO_ACOES", erro_detalhado)
-            raise
-        
-        # ETAPA 5: Converter em Cliente
-        try:
-            print("🔄 ETAPA 5: Convertendo para cliente...")
-            converter_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//span[@style='color:green' and contains(text(), 'Converter em Cliente')]")))
-            driver.execute_script("arguments[0].click();", converter_button)
-            time.sleep(3)
-            
-            processor.salvar_prospecto(nome_filtro, id_prospecto, "WIZARD_INICIADO")
-            print("✅ ETAPA 5: Wizard de conversão iniciado com sucesso")
-            
-        except Exception as e:
-            erro_detalhado = f"ETAPA 5 - ERRO CONVERSÃO: {str(e)}"
-            print(f"❌ {erro_detalhado}")
-            processor.capturar_screenshot_erro(driver, "converter", "ETAPA5")
-            processor.salvar_prospecto(nome_filtro, id_prospecto, "ERRO_CONVERTER", erro_detalhado)
-            raise
-        
-        # ETAPA 6: Wizard - Primeira tela
-        try:
-            print("📋 ETAPA 6: Preenchendo wizard (1/4)...")
-            
-            # Selecionar opção no campo md-select
-            print("🔽 Selecionando opção no campo...")
-            md_select_campo = wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[1]/div/hubsoft-accordion/div[2]/hubsoft-accordion-content/div/form/div/div[6]/md-input-container[1]/md-select")))
-            driver.execute_script("arguments[0].click();", md_select_campo)
-            time.sleep(1)
-            
-            # Selecionar primeira opção
-            opcao_campo = wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[7]/md-select-menu/md-content/md-option[1]")))
-            driver.execute_script("arguments[0].click();", opcao_campo)
-            time.sleep(1)
-            
-            # Primeiro botão
-            primeiro_botao = wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[2]/md-dialog-actions/div[2]/button")))
-            driver.execute_script("arguments[0].click();", primeiro_botao)
-            time.sleep(2)
-            
-            # Segundo botão
-            segundo_botao = wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[2]/md-dialog-actions/div[2]/button")))
-            driver.execute_script("arguments[0].click();", segundo_botao)
-            time.sleep(3)
-            
-            processor.salvar_prospecto(nome_filtro, id_prospecto, "WIZARD_TELA1")
-            print("✅ ETAPA 6: Primeira tela do wizard concluída com sucesso")
-            
-        except Exception as e:
-            erro_detalhado = f"ETAPA 6 - ERRO WIZARD TELA 1: {str(e)}"
-            print(f"❌ {erro_detalhado}")
-            processor.capturar_screenshot_erro(driver, "wizard1", "ETAPA6")
-            processor.salvar_prospecto(nome_filtro, id_prospecto, "ERRO_WIZARD1", erro_detalhado)
-            raise
-        
-        # ETAPA 7: Wizard - Seleções
-        try:
-            print("📝 ETAPA 7: Preenchendo wizard (2/4)...")
-            # Primeiro md-select
-            md_select1 = wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[1]/div/div/form/div/md-input-container/md-select")))
-            driver.execute_script("arguments[0].click();", md_select1)
-            time.sleep(1)
-            
-            md_option1 = wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[7]/md-select-menu/md-content/md-option")))
-            driver.execute_script("arguments[0].click();", md_option1)
-            time.sleep(1)
-            
-            # Segundo md-select
-            md_select2 = wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[1]/div/div/form/div/div[2]/md-input-container[2]/md-select")))
-            driver.execute_script("arguments[0].click();", md_select2)
-            time.sleep(1)
-            
-            opcao_25 = wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[8]/md-select-menu/md-content/md-option[25]")))
-            driver.execute_script("arguments[0].click();", opcao_25)
-            time.sleep(1)
-            
-            # Avançar
-            botao_avancar = wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[2]/md-dialog-actions/div[2]/button")))
-            driver.execute_script("arguments[0].click();", botao_avancar)
-            time.sleep(2)
-            
-            processor.salvar_prospecto(nome_filtro, id_prospecto, "WIZARD_SELECOES")
-            print("✅ ETAPA 7: Seleções do wizard concluídas com sucesso")
-            
-        except Exception as e:
-            erro_detalhado = f"ETAPA 7 - ERRO WIZARD SELEÇÕES: {str(e)}"
-            print(f"❌ {erro_detalhado}")
-            processor.capturar_screenshot_erro(driver, "wizard_selecoes", "ETAPA7")
-            processor.salvar_prospecto(nome_filtro, id_prospecto, "ERRO_WIZARD_SELECOES", erro_detalhado)
-            raise
-        
-        # ETAPA 8: Wizard - Próxima tela
-        try:
-            print("📋 ETAPA 8: Preenchendo wizard (3/4)...")
-            # Próximo botão
-            proximo_botao = wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[2]/md-dialog-actions/div[2]/button")))
-            driver.execute_script("arguments[0].click();", proximo_botao)
-            time.sleep(3)
-            
-            # Novo md-select
-            novo_md_select = wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[1]/div/form/div[1]/div/md-input-container[1]/md-select")))
-            driver.execute_script("arguments[0].click();", novo_md_select)
-            time.sleep(1)
-            
-            primeira_opcao = wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[7]/md-select-menu/md-content/md-option[1]")))
-            driver.execute_script("arguments[0].click();", primeira_opcao)
-            time.sleep(2)
-            
-            processor.salvar_prospecto(nome_filtro, id_prospecto, "WIZARD_TELA2")
-            print("✅ ETAPA 8: Terceira tela do wizard concluída com sucesso")
-            
-        except Exception as e:
-            erro_detalhado = f"ETAPA 8 - ERRO WIZARD TELA 2: {str(e)}"
-            print(f"❌ {erro_detalhado}")
-            processor.capturar_screenshot_erro(driver, "wizard2", "ETAPA8")
-            processor.salvar_prospecto(nome_filtro, id_prospecto, "ERRO_WIZARD2", erro_detalhado)
-            raise
-        
-        # ETAPA 9: Finalização
-        try:
-            print("💾 ETAPA 9: Finalizando (4/4)...")
-            # Primeiro botão final
-            primeiro_final = wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[2]/md-dialog-actions/div[2]/button")))
-            driver.execute_script("arguments[0].click();", primeiro_final)
-            time.sleep(2)
-            
-            # Segundo botão final
-            segundo_final = wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[2]/md-dialog-actions/div[2]/button")))
-            driver.execute_script("arguments[0].click();", segundo_final)
-            time.sleep(2)
-            
-            # Botão SALVAR
-            botao_salvar = wait.until(EC.element_to_be_clickable((By.XPATH, "/html/body/div[5]/md-dialog/md-dialog-content/div/hubsoft-cliente-wizard/div[2]/md-dialog-actions/div[2]/div/button")))
-            driver.execute_script("arguments[0].click();", botao_salvar)
-            time.sleep(3)
-            
-            processor.salvar_prospecto(nome_filtro, id_prospecto, "CONCLUIDO", None, "sucesso")
-            
-            tempo_total = int(time.time() - processor.start_time)
-            print(f"🎉 ETAPA 9: SUCESSO! Prospecto convertido em {tempo_total}s")
-            
-        except Exception as e:
-            erro_detalhado = f"ETAPA 9 - ERRO FINALIZAÇÃO: {str(e)}"
-            print(f"❌ {erro_detalhado}")
-            processor.capturar_screenshot_erro(driver, "finalizacao", "ETAPA9")
-            processor.salvar_prospecto(nome_filtro, id_prospecto, "ERRO_FINALIZACAO", erro_detalhado)
-            raise
-        
+                processor.salvar_prospecto(nome_filtro, id_prospecto, "INICIANDO")
+                processar_prospecto(sessao, processor, nome_filtro, id_prospecto)
+                resultados[id_prospecto] = "sucesso"
+            except drenagem.InterrompidoPorDrenagem as e:
+                # Fora dos resultados: o agendador devolve à fila como não alcançado
+                logger.warning(f"🛑 Prospecto {id_prospecto} interrompido pela drenagem ({e})")
+                processor.devolver_prospecto(id_prospecto)
+                sessao.gravador.finalizar(False)
+                break
+            except Exception as e:
+                registrar_erro_geral(sessao, processor, nome_filtro, id_prospecto, e)
+                resultados[id_prospecto] = "falha"
+            sessao.gravador.finalizar(resultados[id_prospecto] != "sucesso")
+            servidor_saude.registrar_resultado(resultados[id_prospecto])
+
+            # Entre prospectos (nunca no meio do wizard): recicla o navegador se inchou
+            uso = sessao.vigia.fim_prospecto()
+            processor.registrar_recursos(uso)
+            if sessao.vigia.precisa_reciclar(uso):
+                logger.info(f"♻️ Chrome com {uso['memoria_mb']:.0f} MB (limite {sessao.vigia.limite_mb:.0f} MB); reciclando o navegador")
+                sessao.encerrar()
+                sessao = None
+    finally:
+        servidor_saude.remover()
+        if sessao:
+            sessao.encerrar()
+
+
+def processar_lote(prospectos):
+    """
+    Processa vários prospectos numa única sessão logada do Hubsoft.
+
+    Faz login uma vez e, após cada wizard, volta à lista de Prospectos e filtra
+    o próximo sem recarregar a SPA. Uma falha num prospecto fecha overlays e
+    volta à lista; se nem isso funcionar, o navegador é reaberto e o lote segue.
+
+    Args:
+        prospectos (list): Lista de tuplas (nome_filtro, id_prospecto)
+
+    Returns:
+        dict: id_prospecto -> "sucesso", "falha", "ignorado" (tentativas esgotadas),
+              "adiado" (backoff da última falha ainda não venceu) ou "finalizado" (já convertido antes)
+    """
+    resultados = {}
+    if not infraestrutura_liberada():
+        return resultados
+    processor = ProspectoProcessor()
+
+    if not processor.conectar_banco():
+        logger.error("❌ Falha ao conectar ao banco de dados")
+        return resultados
+
+    logger.info("✅ Conectado ao banco de dados PostgreSQL")
+
+    headless = obter_headless()
+    usuario = os.environ.get('USUARIO', '')
+    senha = os.environ.get('SENHA', '')
+
+    if not usuario or not senha:
+        logger.error("❌ Credenciais não encontradas no arquivo .env")
+        processor.desconectar_banco()
+        return resultados
+
+    # Uma consulta para o lote inteiro: nenhum navegador é aberto para quem vai ser recusado
+    elegibilidade = ServicoElegibilidade(processor.conn).classificar([p[1] for p in prospectos])
+    logger.info(f"📦 Iniciando lote com {len(prospectos)} prospectos "
+                f"({len(elegibilidade.executaveis)} executáveis, {len(elegibilidade.esgotados)} esgotados, "
+                f"{len(elegibilidade.nao_retentaveis)} não retentáveis, {len(elegibilidade.adiados)} em espera, "
+                f"{len(elegibilidade.finalizados)} já finalizados)")
+    fila = queue.Queue()
+    for nome_filtro, id_prospecto in prospectos:
+        id_prospecto = str(id_prospecto)
+        if prospecto_elegivel(nome_filtro, id_prospecto, elegibilidade):
+            fila.put((nome_filtro, id_prospecto))
+        else:
+            resultados[id_prospecto] = RESULTADO_RECUSA.get(elegibilidade.situacao(id_prospecto), "ignorado")
+
+    try:
+        consumir_fila(fila, lambda: abrir_sessao(processor, headless, usuario, senha),
+                      processor, elegibilidade, resultados)
     except Exception as e:
-        erro_detalhado = f"ERRO GERAL DO PROCESSO: {str(e)}"
-        logger.error(erro_detalhado)
-        print(f"❌ {erro_detalhado}")
-        if processor.current_prospecto_id:
-            processor.salvar_prospecto(nome_filtro, id_prospecto, "ERRO_GERAL", erro_detalhado, "falha")
-        if driver:
-            processor.capturar_screenshot_erro(driver, "erro_geral", "GERAL")
+        # Falha de login/navegação do lote: prospectos restantes não são tocados
+        logger.error(f"ERRO NO LOTE: {e}")
     finally:
-        if driver:
-            driver.quit()
-        if temp_dir:
-            shutil.rmtree(temp_dir)
         processor.desconectar_banco()
-        print("🔌 Desconectado do banco")
+        logger.info("🔌 Desconectado do banco")
+
+    sucessos = sum(1 for r in resultados.values() if r == "sucesso")
+    logger.info(f"📦 Lote finalizado: {sucessos}/{len(prospectos)} convertidos")
+    return resultados
 
-#if __name__ == "__main__":
-#    main("JOÃO SILVA SANTOS", "1518")
\ No newline at end of file
+# if __name__ == "__main__":
+#     main("JOÃO SILVA SANTOS", "1518")
@@ -0,0 +1,300 @@
+"""
+Migrações versionadas do esquema que o robô usa nos dois bancos.
+
+Antes, cada módulo criava o que precisava por conta própria:
+- garantir_colunas (main_refatorado) criava classe_erro e proxima_tentativa_em;
+- o agendador criava os índices parciais da fila;
+- o limitador de taxa criava a limites_taxa;
+- o aviso_fila criava o trigger.
+Nada criava índice para id_prospecto_hubsoft, que é o filtro de toda consulta
+quente (salvar_prospecto, elegibilidade, réplica no Django).
+
+Agora tudo é uma lista de migrações numeradas. Cada banco registra as que já
+aplicou na tabela migracoes_robo. migrar_bancos() roda as que faltam na
+inicialização do processo (agendador ou main), não a cada conexão:
+- uma vez por processo e banco;
+- sob pg_try_advisory_lock: quem não pega a trava segue com o esquema atual
+  em vez de esperar. Um processo parado no pg_advisory_lock seguraria um
+  snapshot, o CREATE INDEX CONCURRENTLY do outro esperaria por ele, e o
+  deadlock deixaria o índice INVALID;
+- em autocommit, porque CREATE INDEX CONCURRENTLY não roda em transação e
+  não trava as escritas.
+
+Regras para migrações novas:
+- Nunca edite uma migração já aplicada. Acrescente outra.
+- Cada comando precisa ser idempotente (IF [NOT] EXISTS): uma migração que
+  falhou no meio é repetida inteira na próxima execução, e as seguintes
+  rodam mesmo assim.
+- Migração não lê configuração nem constantes de outros módulos: DDL,
+  nomes de canal e valores como MAX_TENTATIVAS entram como literais, senão
+  editar o módulo mudaria em silêncio uma migração já aplicada e bancos
+  novos e antigos terminariam com esquemas diferentes.
+- Mudou FILTRO_PENDENTES? Crie os índices da fila com nome novo numa nova
+  migração e copie o predicado dela para PREDICADO_INDICES_FILA. O
+  predicado da consulta precisa bater com o do índice parcial (migrar()
+  avisa quando não bate).
+
+Uso:
+    python3 migracoes.py            # aplica o que falta nos dois bancos
+    python3 migracoes.py --status   # só mostra a versão de cada banco
+"""
+import argparse
+import logging
+import psycopg2
+import psycopg2.errors
+from collections import namedtuple
+from classificador_falhas import RETENTAVEIS
+from politica_retentativa import MAX_TENTATIVAS
+
+logger = logging.getLogger(__name__)
+
+PRIMARIO = 'primario'
+DJANGO = 'django'
+AMBOS = (PRIMARIO, DJANGO)
+CHAVE_TRAVA = 7_310_522  # pg_try_advisory_lock das migrações do robô
+
+STATUS_PENDENTES = ('aguardando', 'erro')
+# Filtro das consultas da fila no agendador (segue MAX_TENTATIVAS e RETENTAVEIS)
+FILTRO_PENDENTES = (
+    f"status IN ({', '.join(repr(s) for s in STATUS_PENDENTES)}) "
+    f"AND tentativas_processamento < {MAX_TENTATIVAS} "
+    f"AND (classe_erro IS NULL OR classe_erro IN ({', '.join(repr(c) for c in RETENTAVEIS)}))"
+)
+
+# Cópia do predicado dos índices parciais da fila (migração 3), só para a conferência do
+# migrar(): se FILTRO_PENDENTES deixar de bater com ele, as consultas param de usar os índices
+PREDICADO_INDICES_FILA = (
+    "status IN ('aguardando', 'erro') "
+    "AND tentativas_processamento < 3 "
+    "AND (classe_erro IS NULL OR classe_erro IN ('transitorio', 'sessao'))"
+)
+
+Migracao = namedtuple('Migracao', 'versao descricao bancos comandos')
+
+MIGRACOES = [
+    Migracao(1, 'colunas do robô em prospectos', AMBOS, [
+        "ALTER TABLE prospectos ADD COLUMN IF NOT EXISTS classe_erro VARCHAR(20)",  # classificador_falhas.py
+        "ALTER TABLE prospectos ADD COLUMN IF NOT EXISTS proxima_tentativa_em TIMESTAMP",  # politica_retentativa.py
+    ]),
+    # limitador_taxa.py
+    Migracao(2, 'tabela do limitador de taxa', (PRIMARIO,), [
+        """CREATE TABLE IF NOT EXISTS limites_taxa (
+            acao VARCHAR(50) PRIMARY KEY,
+            fichas DOUBLE PRECISION NOT NULL,
+            atualizado_em TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp(),
+            consumos BIGINT NOT NULL DEFAULT 0,
+            esperas BIGINT NOT NULL DEFAULT 0,
+            espera_total_segundos DOUBLE PRECISION NOT NULL DEFAULT 0
+        )""",
+    ]),
+    Migracao(3, 'índices parciais da fila do agendador', (DJANGO,), [
+        """CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_prospectos_fila_prioridade
+            ON prospectos (prioridade DESC, score_conversao DESC NULLS LAST, tentativas_processamento, data_criacao)
+            WHERE status IN ('aguardando', 'erro') AND tentativas_processamento < 3
+              AND (classe_erro IS NULL OR classe_erro IN ('transitorio', 'sessao'))""",
+        """CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_prospectos_fila_idade
+            ON prospectos (data_criacao)
+            WHERE status IN ('aguardando', 'erro') AND tentativas_processamento < 3
+              AND (classe_erro IS NULL OR classe_erro IN ('transitorio', 'sessao'))""",
+        """CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_prospectos_processando
+            ON prospectos (data_inicio_processamento)
+            WHERE status = 'processando'""",
+    ]),
+    # Canal escutado pelo aviso_fila.py (AvisoFila.CANAL)
+    Migracao(4, 'trigger de aviso de prospecto pendente', (DJANGO,), [
+        """CREATE OR REPLACE FUNCTION notificar_prospecto_pendente() RETURNS trigger AS $$
+            BEGIN
+                IF NEW.status = 'aguardando' AND (TG_OP = 'INSERT' OR OLD.status IS DISTINCT FROM NEW.status) THEN
+                    PERFORM pg_notify('prospectos_pendentes', NEW.id::text);
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql""",
+        "DROP TRIGGER IF EXISTS trg_prospectos_pendentes ON prospectos",
+        """CREATE TRIGGER trg_prospectos_pendentes
+            AFTER INSERT OR UPDATE OF status ON prospectos
+            FOR EACH ROW EXECUTE FUNCTION notificar_prospecto_pendente()""",
+    ]),
+    # Com duplicatas no banco ela falha (e é repetida na próxima execução) sem segurar as outras
+    Migracao(5, 'id_prospecto_hubsoft único', AMBOS, [
+        """CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_prospectos_id_hubsoft_unico
+            ON prospectos (id_prospecto_hubsoft)""",
+    ]),
+    # Partições mensais criadas sob demanda pelo gravador (eventos_prospecto.py)
+    Migracao(6, 'histórico de eventos por prospecto', (PRIMARIO,), [
+        """CREATE TABLE IF NOT EXISTS prospecto_eventos (
+            ts TIMESTAMPTZ NOT NULL,
+            run_id VARCHAR(32),
+            id_prospecto_hubsoft VARCHAR(100),
+            tentativa INTEGER,
+            etapa SMALLINT,
+            repeticao SMALLINT,
+            status VARCHAR(30) NOT NULL,
+            duracao_ms INTEGER,
+            classe_erro VARCHAR(20),
+            erro TEXT
+        ) PARTITION BY RANGE (ts)""",
+        """CREATE OR REPLACE FUNCTION garantir_particao_eventos(momento TIMESTAMPTZ) RETURNS void AS $$
+            DECLARE
+                inicio DATE := date_trunc('month', momento)::date;
+                nome TEXT := 'prospecto_eventos_' || to_char(inicio, 'YYYY_MM');
+            BEGIN
+                IF to_regclass(nome) IS NULL THEN
+                    EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF prospecto_eventos FOR VALUES FROM (%L) TO (%L)',
+                                   nome, inicio, (inicio + interval '1 month')::date);
+                END IF;
+            END
+            $$ LANGUAGE plpgsql""",
+        """CREATE INDEX IF NOT EXISTS idx_prospecto_eventos_prospecto
+            ON prospecto_eventos (id_prospecto_hubsoft, ts)""",
+    ]),
+]
+
+SQL_TABELA_MIGRACOES = """
+    CREATE TABLE IF NOT EXISTS migracoes_robo (
+        versao INTEGER PRIMARY KEY,
+        descricao TEXT NOT NULL,
+        aplicada_em TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+
+_migrados = set()
+_bancos_migrados = set()  # migrar_bancos: sem abrir conexão de novo no mesmo processo
+
+
+def _remover_indice_invalido(cursor, comando):
+    """CREATE INDEX CONCURRENTLY que falhou deixa o índice INVALID, e o IF NOT EXISTS o pularia."""
+    palavras = comando.split()
+    if 'CONCURRENTLY' not in palavras or palavras[0] != 'CREATE':
+        return
+    nome = palavras[palavras.index('EXISTS') + 1] if 'EXISTS' in palavras else palavras[palavras.index('CONCURRENTLY') + 1]
+    cursor.execute("""
+        SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = %s AND pg_table_is_visible(c.oid) AND NOT i.indisvalid
+    """, (nome,))
+    if cursor.fetchone():
+        logger.warning(f"⚠️ Índice {nome} inválido (criação interrompida); recriando")
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {nome}")
+
+
+def aplicar_comandos(cursor, migracao):
+    for comando in migracao.comandos:
+        _remover_indice_invalido(cursor, comando)
+        cursor.execute(comando)
+
+
+def pendentes(banco, aplicadas):
+    return [m for m in MIGRACOES if banco in m.bancos and m.versao not in aplicadas]
+
+
+def migrar(conn, banco):
+    """
+    Aplica as migrações que faltam no banco (`PRIMARIO` ou `DJANGO`). Uma vez por
+    processo e banco. Uma migração que falha é logada e fica pendente; as
+    seguintes são tentadas assim mesmo, e o robô segue com o esquema que tem.
+    Com outro processo migrando (trava ocupada), não espera: retorna False.
+    """
+    if conn.dsn in _migrados:
+        return True
+    # Uma tentativa por processo: uma migração que falha não é refeita a cada conexão
+    _migrados.add(conn.dsn)
+    if banco == DJANGO and FILTRO_PENDENTES != PREDICADO_INDICES_FILA:
+        logger.warning("⚠️ FILTRO_PENDENTES não bate com o predicado dos índices da fila (migração 3): "
+                       "as consultas do agendador vão varrer a tabela. Crie os índices numa migração nova")
+    autocommit = conn.autocommit
+    if not autocommit:
+        conn.rollback()
+    conn.autocommit = True
+    cursor = conn.cursor()
+    ok = True
+    try:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", (CHAVE_TRAVA,))
+        if not cursor.fetchone()[0]:
+            logger.info(f"🗄️ Migrações do banco {banco} em andamento em outro processo; seguindo com o esquema atual")
+            return False
+        try:
+            cursor.execute(SQL_TABELA_MIGRACOES)
+            cursor.execute("SELECT versao FROM migracoes_robo")
+            aplicadas = {linha[0] for linha in cursor.fetchall()}
+            for migracao in pendentes(banco, aplicadas):
+                logger.info(f"🗄️ Migração {migracao.versao} ({banco}): {migracao.descricao}")
+                try:
+                    aplicar_comandos(cursor, migracao)
+                except psycopg2.errors.UniqueViolation as e:
+                    logger.error(f"❌ Migração {migracao.versao} do banco {banco} parada por duplicatas: {e}. Para encontrá-las: "
+                                 "SELECT id_prospecto_hubsoft, COUNT(*) FROM prospectos GROUP BY 1 HAVING COUNT(*) > 1")
+                    ok = False
+                    continue
+                except psycopg2.Error as e:
+                    logger.error(f"❌ Erro na migração {migracao.versao} do banco {banco}: {e}")
+                    ok = False
+                    continue
+                cursor.execute(
+                    "INSERT INTO migracoes_robo (versao, descricao) VALUES (%s, %s) ON CONFLICT (versao) DO NOTHING",
+                    (migracao.versao, migracao.descricao)
+                )
+        finally:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (CHAVE_TRAVA,))
+        return ok
+    except Exception as e:
+        logger.error(f"❌ Erro nas migrações do banco {banco}: {e}")
+        return False
+    finally:
+        cursor.close()
+        conn.autocommit = autocommit
+
+
+def migrar_bancos(configs):
+    """
+    Migra cada banco de `configs` ((banco, config do psycopg2), ...) numa
+    conexão própria, fechada em seguida. Chamado uma vez na inicialização do
+    processo; banco fora do ar é logado e não impede o robô de subir.
+    """
+    ok = True
+    for banco, config in configs:
+        if banco in _bancos_migrados:
+            continue
+        _bancos_migrados.add(banco)
+        try:
+            conn = psycopg2.connect(**config)
+        except Exception as e:
+            logger.error(f"❌ Migrações do banco {banco} não aplicadas (sem conexão): {e}")
+            ok = False
+            continue
+        try:
+            ok = migrar(conn, banco) and ok
+        finally:
+            conn.close()
+    return ok
+
+
+def versoes_aplicadas(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT to_regclass('migracoes_robo') IS NOT NULL")
+    if not cursor.fetchone()[0]:
+        cursor.close()
+        return set()
+    cursor.execute("SELECT versao FROM migracoes_robo")
+    aplicadas = {linha[0] for linha in cursor.fetchall()}
+    cursor.close()
+    conn.rollback()
+    return aplicadas
+
+
+if __name__ == "__main__":
+    from main_refatorado import DB_CONFIG, DB_CONFIG_DJANGO
+
+    parser = argparse.ArgumentParser(description='Migrações do esquema do robô')
+    parser.add_argument('--status', action='store_true', help='Só mostra as migrações aplicadas e pendentes')
+    args = parser.parse_args()
+    configs = ((PRIMARIO, DB_CONFIG), (DJANGO, DB_CONFIG_DJANGO))
+    if not args.status:
+        migrar_bancos(configs)
+    for banco, config in configs:
+        conn = psycopg2.connect(**config)
+        try:
+            faltando = [m.versao for m in pendentes(banco, versoes_aplicadas(conn))]
+            print(f"{'✅' if not faltando else '⏳'} Banco {banco}: "
+                  f"{'em dia' if not faltando else f'pendentes {faltando}'}")
+        finally:
+            conn.close()
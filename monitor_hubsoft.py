@@ -0,0 +1,252 @@
+"""
+Monitor de erros do Hubsoft.
+
+Injeta na página um MutationObserver que registra toasts (md-toast), diálogos
+de erro, mensagens de validação exibidas (não as que o ngMessages deixa
+escondidas em campos ainda intocados) e redirecionamentos para o login numa fila JS
+(window.__roboMonitor). A fila é consultada a cada poll dos waits, permitindo
+abortar a etapa atual imediatamente com um código de erro estruturado em vez
+de esperar o timeout completo do WebDriverWait.
+"""
+import os
+import re
+import time
+import logging
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+logger = logging.getLogger(__name__)
+
+# Script injetado em toda carga de página (e reinjetado se a SPA o perder)
+SCRIPT_MONITOR = r"""
+(function () {
+    if (window.__roboMonitor) { return; }
+    var monitor = window.__roboMonitor = { fila: [] };
+    var vistos = new WeakSet();
+    // Mensagens de validação já no DOM mas ainda escondidas (campo obrigatório vazio e intocado)
+    var validacoesOcultas = [];
+
+    function texto(no) {
+        return ((no.innerText || no.textContent || '') + '').replace(/\s+/g, ' ').trim().slice(0, 500);
+    }
+
+    function registrar(tipo, no) {
+        if (vistos.has(no)) { return; }
+        vistos.add(no);
+        monitor.fila.push({ tipo: tipo, texto: texto(no), classes: (no.className || '') + '', ts: Date.now() });
+    }
+
+    // O ngMessages insere a mensagem de campo obrigatório assim que o campo fica vazio;
+    // o Material só a mostra (md-input-invalid) depois que o campo é tocado ou o formulário enviado
+    function validacaoExibida(el) {
+        var container = el.closest('md-input-container');
+        if (container && (container.classList.contains('md-input-invalid') ||
+                          container.querySelector('.ng-touched.ng-invalid'))) {
+            return true;
+        }
+        var estilo = window.getComputedStyle(el);
+        return el.offsetParent !== null && estilo.visibility !== 'hidden' && parseFloat(estilo.opacity) > 0 &&
+            !!el.closest('.ng-touched, .ng-submitted, .md-input-invalid');
+    }
+
+    function validacao(el) {
+        if (validacaoExibida(el)) { registrar('validacao', el); }
+        else if (validacoesOcultas.indexOf(el) < 0) { validacoesOcultas.push(el); }
+    }
+
+    monitor.revisar = function () {
+        validacoesOcultas = validacoesOcultas.filter(function (el) {
+            if (!el.isConnected) { return false; }
+            if (validacaoExibida(el)) { registrar('validacao', el); return false; }
+            return true;
+        });
+    };
+
+    function inspecionar(no) {
+        if (!no || no.nodeType !== 1) { return; }
+        var candidatos = [no].concat(Array.prototype.slice.call(
+            no.querySelectorAll('md-toast, md-dialog, .sweet-alert, .swal2-popup, [ng-message]')
+        ));
+        candidatos.forEach(function (el) {
+            var tag = el.tagName.toLowerCase();
+            if (tag === 'md-toast') {
+                registrar('toast', el);
+            } else if (tag === 'md-dialog') {
+                // O wizard de conversão também é um md-dialog: ignorar
+                if (!el.querySelector('hubsoft-cliente-wizard')) { registrar('dialogo', el); }
+            } else if (el.classList.contains('sweet-alert') || el.classList.contains('swal2-popup')) {
+                registrar('dialogo', el);
+            } else if (el.hasAttribute('ng-message')) {
+                validacao(el);
+            }
+        });
+    }
+
+    function iniciar() {
+        new MutationObserver(function (mutacoes) {
+            var classes = false;
+            mutacoes.forEach(function (m) {
+                if (m.type === 'attributes') { classes = true; }
+                else { Array.prototype.forEach.call(m.addedNodes, inspecionar); }
+            });
+            // Campo tocado/formulário enviado: mensagens escondidas podem ter aparecido
+            if (classes && validacoesOcultas.length) { monitor.revisar(); }
+        }).observe(document.documentElement, { childList: true, subtree: true, attributes: true, attributeFilter: ['class'] });
+    }
+
+    if (document.documentElement) { iniciar(); }
+    else { document.addEventListener('DOMContentLoaded', iniciar); }
+})();
+"""
+
+# Coleta (e esvazia) a fila a cada poll, reinjetando o monitor se necessário
+SCRIPT_COLETA = SCRIPT_MONITOR + r"""
+var monitor = window.__roboMonitor;
+if (monitor.revisar) { monitor.revisar(); }
+return { eventos: monitor.fila.splice(0, monitor.fila.length), caminho: location.pathname };
+"""
+
+# Códigos de erro estruturados, avaliados em ordem (primeiro que casar vence)
+PADROES_ERRO = [
+    ("SESSAO_EXPIRADA", re.compile(r"sess[aã]o.*(expir|encerrad)|n[aã]o autenticad|token.*(inv[aá]lid|expirad)|fa[cç]a login", re.I)),
+    ("LOGIN_INVALIDO", re.compile(r"senha.*(incorret|inv[aá]lid)|credenciai?s? inv[aá]lid|usu[aá]rio.*(n[aã]o encontrad|inv[aá]lid)", re.I)),
+    # "já"/"duplicado" colados ao documento: "Cliente CPF 123 cadastrado com sucesso" não é duplicidade
+    ("CPF_DUPLICADO", re.compile(
+        r"\b(cpf|cnpj|documento)\b\W*(informado\s+)?(j[aá]\b|duplicad)|\bj[aá] existe\b.*\b(cpf|cnpj|documento)\b", re.I)),
+    ("CAMPO_OBRIGATORIO", re.compile(r"obrigat[oó]ri|preencha|required", re.I)),
+    ("ERRO_VALIDACAO", re.compile(r"inv[aá]lid|incorret", re.I)),
+    # Só frases de erro: "erro"/"problema" soltos aparecem em textos inofensivos ("0 erros", "sem problemas")
+    ("ERRO_HUBSOFT", re.compile(
+        r"^\s*(erro|falha)\b|\b(erro|falha) (ao|na|no|de|inesperad|interno)|n[aã]o foi poss[ií]vel|ocorreu um (erro|problema)", re.I)),
+]
+
+# Classes de toast/diálogo que indicam erro mesmo sem texto reconhecível
+CLASSES_ERRO = re.compile(r"md-warn|error|erro|danger", re.I)
+
+# Toast de sucesso (ex.: resposta ao SALVAR do wizard). Com negação ou "já" no texto não conta
+PADRAO_SALVO = re.compile(os.environ.get('PADRAO_SALVO', r'sucesso|salv[oa]|cadastrad|convertid'), re.I)
+PADRAO_NAO_SALVO = re.compile(r"\bj[aá]\b|n[aã]o|duplicad|erro|falha", re.I)
+
+
+def toast_de_sucesso(evento):
+    """Toast que confirma a operação (sem classe de erro nem negação no texto)."""
+    texto = evento.get("texto") or ""
+    return (evento.get("tipo") == "toast" and bool(PADRAO_SALVO.search(texto))
+            and not PADRAO_NAO_SALVO.search(texto) and not CLASSES_ERRO.search(evento.get("classes") or ""))
+
+
+class ErroHubsoft(Exception):
+    """Falha determinística sinalizada pelo próprio Hubsoft (toast, diálogo, validação ou login)."""
+
+    def __init__(self, codigo, mensagem, tipo):
+        super().__init__(f"[{codigo}] {mensagem}")
+        self.codigo = codigo
+        self.mensagem = mensagem
+        self.tipo = tipo
+
+
+def classificar_evento(evento):
+    """Retorna o código de erro de um evento da fila, ou None se não for erro."""
+    if toast_de_sucesso(evento):
+        return None
+    texto = evento.get("texto") or ""
+    for codigo, padrao in PADROES_ERRO:
+        if padrao.search(texto):
+            return codigo
+    # Mensagens de validação e toasts marcados como erro sempre contam
+    if evento.get("tipo") == "validacao":
+        return "CAMPO_OBRIGATORIO"
+    if CLASSES_ERRO.search(evento.get("classes") or ""):
+        return "ERRO_HUBSOFT"
+    return None
+
+
+class MonitorHubsoft:
+    """Observa a página do Hubsoft e converte erros exibidos na UI em ErroHubsoft."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        # Só depois do login um retorno à tela de login significa sessão perdida
+        self.sessao_ativa = False
+
+    def instalar(self):
+        """Registra o script para toda nova página e o injeta na página atual."""
+        try:
+            self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": SCRIPT_MONITOR})
+        except Exception as e:
+            logger.error(f"Não foi possível registrar o monitor via CDP: {e}")
+        try:
+            self.driver.execute_script(SCRIPT_MONITOR)
+        except Exception as e:
+            logger.error(f"Não foi possível injetar o monitor na página: {e}")
+
+    def verificar(self):
+        """
+        Consome a fila de eventos e lança ErroHubsoft no primeiro erro encontrado.
+        Retorna os eventos consumidos que não eram erro (ex.: toast de sucesso).
+        """
+        try:
+            resultado = self.driver.execute_script(SCRIPT_COLETA) or {}
+        except Exception:
+            # Página em transição: a próxima verificação tenta de novo
+            return []
+
+        if self.sessao_ativa and "/login" in (resultado.get("caminho") or ""):
+            raise ErroHubsoft("SESSAO_EXPIRADA", "Redirecionado para a tela de login", "redirecionamento")
+
+        eventos = resultado.get("eventos") or []
+        for evento in eventos:
+            codigo = classificar_evento(evento)
+            if codigo:
+                raise ErroHubsoft(codigo, evento.get("texto") or "(sem texto)", evento.get("tipo"))
+        return eventos
+
+    def condicao(self, metodo):
+        """Envolve uma expected condition para checar o monitor a cada poll."""
+        def _condicao(driver):
+            self.verificar()
+            return metodo(driver)
+        return _condicao
+
+
+class EsperaMonitorada(WebDriverWait):
+    """
+    WebDriverWait que aborta imediatamente quando o monitor detecta um erro do Hubsoft.
+
+    presente()/clicavel() são a API de espera das etapas: no Selenium viram
+    until(EC...) com polling; em drivers com espera orientada a eventos
+    (backend_cdp.DriverCDP) usam o MutationObserver da página, sem polling.
+    """
+
+    def __init__(self, driver, timeout, monitor, **kwargs):
+        super().__init__(driver, timeout, **kwargs)
+        self.timeout = timeout
+        self.monitor = monitor
+
+    def until(self, method, message=""):
+        return super().until(self.monitor.condicao(method), message)
+
+    def presente(self, localizador):
+        return self._aguardar(localizador, clicavel=False)
+
+    def clicavel(self, localizador):
+        return self._aguardar(localizador, clicavel=True)
+
+    def _aguardar(self, localizador, clicavel):
+        if not hasattr(self._driver, 'aguardar_elemento'):
+            condicao = EC.element_to_be_clickable(localizador) if clicavel else EC.presence_of_element_located(localizador)
+            return self.until(condicao)
+        return self._aguardar_evento(localizador, clicavel)
+
+    def _aguardar_evento(self, localizador, clicavel):
+        limite = time.monotonic() + self.timeout
+        while True:
+            self.monitor.verificar()
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                raise TimeoutException(f"Elemento não {'clicável' if clicavel else 'encontrado'}: {localizador[1]}")
+            # Retorna None quando o monitor recebe um evento (ou a página navega): checar e esperar de novo
+            elemento = self._driver.aguardar_elemento(localizador, clicavel, restante)
+            if elemento is not None:
+                return elemento
@@ -0,0 +1,80 @@
+"""
+Política de novas tentativas: quando e quantas vezes um prospecto que falhou volta a rodar.
+
+Antes, um prospecto em erro podia ser pego de novo na hora, e uma instabilidade
+do Hubsoft fazia todos os workers gastarem as 3 tentativas em sequência. Agora:
+
+- cada falha grava proxima_tentativa_em = agora + backoff exponencial por
+  classe (RETENTATIVA_BASE_<CLASSE>_S, dobrando a cada tentativa, até
+  RETENTATIVA_MAX_S), com jitter para os workers não voltarem juntos;
+- cada classe de erro (ver classificador_falhas.py) tem seu orçamento de
+  tentativas (RETENTATIVAS_<CLASSE>); classes não retentáveis têm zero;
+- dentro da execução, as etapas idempotentes (login, navegação e filtro)
+  são repetidas até RETENTATIVAS_ETAPA vezes em falhas transitórias antes de a
+  tentativa inteira contar como perdida.
+"""
+import os
+import random
+import datetime
+from classificador_falhas import TRANSITORIO, SESSAO
+
+MAX_TENTATIVAS = 3  # Teto geral, também para erros gravados antes da classificação
+
+ORCAMENTO_POR_CLASSE = {
+    TRANSITORIO: int(os.environ.get('RETENTATIVAS_TRANSITORIO', str(MAX_TENTATIVAS))),
+    SESSAO: int(os.environ.get('RETENTATIVAS_SESSAO', '2')),
+}
+BASE_POR_CLASSE = {
+    TRANSITORIO: float(os.environ.get('RETENTATIVA_BASE_TRANSITORIO_S', '120')),
+    SESSAO: float(os.environ.get('RETENTATIVA_BASE_SESSAO_S', '300')),
+}
+RETENTATIVA_MAX_S = float(os.environ.get('RETENTATIVA_MAX_S', '3600'))
+
+# Repetições dentro da execução: etapa -> nome (só as que podem rodar de novo sem efeito colateral)
+ETAPAS_IDEMPOTENTES = {1: 'login', 2: 'navegacao', 3: 'filtro'}
+RETENTATIVAS_ETAPA = int(os.environ.get('RETENTATIVAS_ETAPA', '2'))
+ESPERA_ETAPA_S = float(os.environ.get('ESPERA_ETAPA_S', '2'))
+
+
+def orcamento(classe):
+    """Tentativas permitidas para um prospecto cuja última falha foi da `classe`."""
+    if classe is None:
+        return MAX_TENTATIVAS
+    return min(ORCAMENTO_POR_CLASSE.get(classe, 0), MAX_TENTATIVAS)
+
+
+def esgotado(classe, tentativas):
+    return (tentativas or 0) >= orcamento(classe)
+
+
+def proxima_tentativa(classe, tentativas, agora=None):
+    """Quando o prospecto pode rodar de novo, ou None se a classe/orçamento não permitem."""
+    if esgotado(classe, tentativas):
+        return None
+    agora = agora or datetime.datetime.now()
+    atraso = min(RETENTATIVA_MAX_S, BASE_POR_CLASSE.get(classe, BASE_POR_CLASSE[TRANSITORIO]) * 2 ** max((tentativas or 1) - 1, 0))
+    # Metade fixa, metade aleatória: espalha os workers sem zerar a espera
+    return agora + datetime.timedelta(seconds=random.uniform(atraso / 2, atraso))
+
+
+def repetir_etapa(numero, classe, repeticoes):
+    """Se a etapa que acabou de falhar deve ser repetida ainda nesta execução."""
+    return numero in ETAPAS_IDEMPOTENTES and classe == TRANSITORIO and repeticoes < RETENTATIVAS_ETAPA
+
+
+def espera_etapa(repeticao):
+    """Espera antes da repetição `repeticao` (1, 2, ...) de uma etapa: backoff com jitter total."""
+    return random.uniform(0, ESPERA_ETAPA_S * 2 ** (repeticao - 1))
+
+
+def predicado_sql():
+    """
+    Condição SQL de "pode rodar agora" sobre as colunas de prospectos:
+    orçamento da classe da última falha e backoff já vencido.
+    """
+    por_classe = " OR ".join(
+        f"(classe_erro = '{classe}' AND tentativas_processamento < {orcamento(classe)})"
+        for classe in ORCAMENTO_POR_CLASSE
+    )
+    return (f"(classe_erro IS NULL OR {por_classe}) "
+            f"AND (proxima_tentativa_em IS NULL OR proxima_tentativa_em <= now())")
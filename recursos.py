@@ -0,0 +1,155 @@
+"""
+Uso de memória e CPU de uma árvore de processos (Chrome e seus renderers), lido do /proc.
+
+RSS somado entre processos do Chrome conta várias vezes as páginas
+compartilhadas; PSS (smaps_rollup) divide essas páginas entre quem as usa e é
+o número certo para dimensionar servidor. Os dois são reportados.
+
+VigiaRecursos acompanha o Chrome de uma sessão: amostra a árvore em segundo
+plano, fecha as contas de cada prospecto (pico de memória, CPU gasta) e diz
+quando o navegador passou do limite e deve ser reciclado, o que só é feito
+entre um prospecto e outro, nunca no meio do wizard.
+"""
+import os
+import time
+import threading
+
+# Acima disso (PSS da árvore do Chrome, em MB) o navegador é reciclado entre prospectos
+LIMITE_MEMORIA_CHROME_MB = float(os.environ.get('LIMITE_MEMORIA_CHROME_MB', '1500'))
+INTERVALO_AMOSTRAGEM = float(os.environ.get('INTERVALO_AMOSTRAGEM_RECURSOS', '5'))
+
+TICKS_POR_SEGUNDO = os.sysconf('SC_CLK_TCK')
+
+
+def _ppids():
+    """pid -> ppid de todos os processos visíveis."""
+    pais = {}
+    for nome in os.listdir('/proc'):
+        if not nome.isdigit():
+            continue
+        try:
+            with open(f'/proc/{nome}/stat') as f:
+                # O nome do processo pode ter espaços: os campos começam depois do último ')'
+                campos = f.read().rsplit(')', 1)[1].split()
+            pais[int(nome)] = int(campos[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    return pais
+
+
+def arvore(pid):
+    """pid e todos os descendentes."""
+    pais = _ppids()
+    filhos = {}
+    for filho, pai in pais.items():
+        filhos.setdefault(pai, []).append(filho)
+    resultado, pendentes = [], [pid]
+    while pendentes:
+        atual = pendentes.pop()
+        resultado.append(atual)
+        pendentes.extend(filhos.get(atual, []))
+    return resultado
+
+
+def _memoria_kb(pid):
+    rss = pss = 0
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for linha in f:
+                if linha.startswith('Rss:'):
+                    rss = int(linha.split()[1])
+                elif linha.startswith('Pss:'):
+                    pss = int(linha.split()[1])
+        return rss, pss
+    except OSError:
+        pass
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for linha in f:
+                if linha.startswith('VmRSS:'):
+                    rss = int(linha.split()[1])
+    except OSError:
+        pass
+    return rss, rss
+
+
+def _cpu_segundos(pid):
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            campos = f.read().rsplit(')', 1)[1].split()
+        # utime e stime são os campos 14 e 15 do stat (11 e 12 depois do nome)
+        return (int(campos[11]) + int(campos[12])) / TICKS_POR_SEGUNDO
+    except (OSError, IndexError, ValueError):
+        return 0.0
+
+
+def amostrar(pid):
+    """Soma memória (MB) e CPU acumulada (s) do processo e descendentes."""
+    rss = pss = 0
+    cpu = 0.0
+    pids = arvore(pid)
+    for p in pids:
+        r, s = _memoria_kb(p)
+        rss += r
+        pss += s
+        cpu += _cpu_segundos(p)
+    return {'rss_mb': round(rss / 1024, 1), 'pss_mb': round(pss / 1024, 1),
+            'cpu_segundos': round(cpu, 2), 'processos': len(pids)}
+
+
+class VigiaRecursos:
+    """Amostra periodicamente o Chrome de uma sessão e mede o custo de cada prospecto."""
+
+    def __init__(self, pid, limite_mb=LIMITE_MEMORIA_CHROME_MB, intervalo=INTERVALO_AMOSTRAGEM):
+        self.pid = pid
+        self.limite_mb = limite_mb
+        self.lock = threading.Lock()
+        self.parar = threading.Event()
+        self.ultima = amostrar(pid) if pid else None
+        self.pico_mb = self.ultima['pss_mb'] if self.ultima else 0
+        self.inicio = None
+        if pid:
+            threading.Thread(target=self._amostrar, args=(intervalo,), name='vigia-recursos', daemon=True).start()
+
+    def _amostrar(self, intervalo):
+        while not self.parar.wait(intervalo):
+            amostra = amostrar(self.pid)
+            with self.lock:
+                self.ultima = amostra
+                self.pico_mb = max(self.pico_mb, amostra['pss_mb'])
+
+    def iniciar_prospecto(self):
+        if not self.pid:
+            return
+        amostra = amostrar(self.pid)
+        with self.lock:
+            self.ultima = amostra
+            self.pico_mb = amostra['pss_mb']
+        self.inicio = (time.monotonic(), amostra)
+
+    def fim_prospecto(self):
+        """Uso de recursos desde iniciar_prospecto(), ou None sem pid/sem início."""
+        if not self.pid or not self.inicio:
+            return None
+        t0, inicial = self.inicio
+        final = amostrar(self.pid)
+        with self.lock:
+            pico = max(self.pico_mb, final['pss_mb'])
+        duracao = max(time.monotonic() - t0, 0.001)
+        cpu = max(0.0, final['cpu_segundos'] - inicial['cpu_segundos'])
+        self.inicio = None
+        return {
+            'memoria_mb': final['pss_mb'],
+            'memoria_pico_mb': pico,
+            'rss_mb': final['rss_mb'],
+            'memoria_crescimento_mb': round(final['pss_mb'] - inicial['pss_mb'], 1),
+            'cpu_segundos': round(cpu, 2),
+            'cpu_percentual': round(cpu / duracao * 100, 1),
+            'processos': final['processos'],
+        }
+
+    def precisa_reciclar(self, uso):
+        return bool(uso) and uso['memoria_mb'] > self.limite_mb
+
+    def encerrar(self):
+        self.parar.set()
@@ -0,0 +1,492 @@
+"""
+Roteiros do wizard de conversão executados dentro da página.
+
+Cada tela do wizard (ETAPAS 6 a 9) vira uma lista de sub-ações (clicar,
+escolher opção em md-select) executada por um único execute_async_script:
+a rotina JS espera cada elemento ficar clicável com um MutationObserver,
+clica, aguarda o menu do md-select fechar, espera a próxima tela do wizard
+renderizar depois dos botões de avançar e faz as pausas de animação, tudo
+sem voltar ao Python. O retorno traz o resultado de cada sub-ação (nome,
+tempo de espera, erro), mantendo o diagnóstico fino que os waits davam.
+
+As opções de cada md-select são lidas na primeira vez que o menu abre e
+ficam no CatalogoOpcoes; dali em diante a escolha é feita pelo rótulo,
+gravando direto no ng-model quando possível (sem abrir o menu). O rótulo
+fixado vai para ARQUIVO_CATALOGO no fim da sessão, então as sessões
+seguintes (inclusive as de um prospecto só) já começam escolhendo por ele.
+
+Com WIZARD_VIA_ANGULAR=true, depois que cada tela rodou uma vez por cliques
+na sessão, as telas seguintes avançam pelo ng-click dos botões no escopo do
+componente e trocam as pausas fixas pelo whenStable do Angular. O valor de
+cada md-select gravado por atalho é comparado com o que o caminho por
+cliques gravou; havendo divergência, os atalhos são desligados na sessão e a
+sub-ação é refeita pelo menu.
+
+Se a próxima tela não renderizar dentro do timeout, o roteiro para com
+ErroRoteiro (motivo troca_de_tela) em vez de seguir clicando na tela errada.
+
+Se o monitor de erros registrar um evento no meio do roteiro, a rotina para
+e devolve o índice da próxima sub-ação: o Python checa o monitor (que lança
+ErroHubsoft se for erro) e retoma o roteiro de onde parou.
+"""
+import os
+import json
+import time
+import fcntl
+import logging
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# Rótulo fixo por campo do wizard, ex.: WIZARD_OPCAO_SEGUNDO_SELECT="Dia 25"
+ROTULOS_CONFIGURADOS = {
+    chave[len('WIZARD_OPCAO_'):].lower(): valor
+    for chave, valor in os.environ.items() if chave.startswith('WIZARD_OPCAO_') and valor
+}
+# Gravar a opção direto no ng-model do md-select quando o rótulo já é conhecido
+SELECAO_PELO_MODELO = os.environ.get('WIZARD_SELECAO_MODELO', 'true').lower() != 'false'
+# Caminho rápido opcional: navegação pelo escopo Angular do wizard, sem pausas fixas
+WIZARD_VIA_ANGULAR = os.environ.get('WIZARD_VIA_ANGULAR', 'false').lower() == 'true'
+# Rótulos fixados nas sessões anteriores (compartilhado entre workers, como o tempos_etapas.json)
+ARQUIVO_CATALOGO = os.environ.get('ARQUIVO_CATALOGO_OPCOES', 'stats/catalogo_opcoes.json')
+
+SCRIPT_ROTEIRO = r"""
+var passos = arguments[0], inicio = arguments[1], timeoutMs = arguments[2], rapido = arguments[3];
+var concluir = arguments[arguments.length - 1];
+var resultados = [];
+
+function porXpath(xpath) {
+    return document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+
+function clicavel(el) {
+    if (!el || !el.isConnected) { return null; }
+    var r = el.getBoundingClientRect();
+    var estilo = getComputedStyle(el);
+    if (!(r.width || r.height) || estilo.visibility === 'hidden' || estilo.display === 'none') { return null; }
+    if (el.disabled || el.getAttribute('aria-disabled') === 'true') { return null; }
+    return el;
+}
+
+function monitorComEventos() {
+    var monitor = window.__roboMonitor;
+    return monitor && monitor.fila.length > 0;
+}
+
+function menuAberto() {
+    return document.querySelector('.md-select-menu-container.md-active');
+}
+
+function normalizar(t) {
+    return ((t || '') + '').replace(/\s+/g, ' ').trim().toLowerCase();
+}
+
+// Container do menu de um md-select (o Angular Material liga os dois via aria-owns)
+function containerDe(sel) {
+    var id = sel.getAttribute('aria-owns');
+    return (id && document.getElementById(id)) || sel.querySelector('.md-select-menu-container');
+}
+
+function opcoesDe(container) {
+    if (!container) { return []; }
+    return Array.prototype.map.call(container.querySelectorAll('md-option'), function (o, i) {
+        return { rotulo: (o.textContent || '').replace(/\s+/g, ' ').trim(), valor: o.getAttribute('value'), posicao: i + 1, el: o };
+    });
+}
+
+function alvoEm(opcoes, passo) {
+    if (passo.rotulo) {
+        var rotulo = normalizar(passo.rotulo);
+        return opcoes.filter(function (o) { return normalizar(o.rotulo) === rotulo; })[0] || null;
+    }
+    return opcoes[(passo.posicao || 1) - 1] || null;
+}
+
+function semElemento(opcoes) {
+    return opcoes.map(function (o) { return { rotulo: o.rotulo, valor: o.valor, posicao: o.posicao }; });
+}
+
+// Atalho: grava a opção direto no ng-model, sem abrir o menu (só com rótulo já conhecido)
+function escolherPeloModelo(sel, passo) {
+    if (!passo.modelo || !passo.rotulo || !window.angular) { return null; }
+    try {
+        var ngModel = angular.element(sel).controller('ngModel');
+        var opcoes = opcoesDe(containerDe(sel));
+        var alvo = alvoEm(opcoes, passo);
+        var opcao = alvo && angular.element(alvo.el).controller('mdOption');
+        if (!ngModel || !opcao || opcao.value === undefined) { return null; }
+        angular.element(sel).scope().$apply(function () {
+            ngModel.$setViewValue(opcao.value);
+            ngModel.$render();
+        });
+        // Só vale se o md-select passou a exibir a opção escolhida
+        if (normalizar(sel.querySelector('md-select-value') && sel.querySelector('md-select-value').textContent).indexOf(normalizar(alvo.rotulo)) < 0) {
+            return null;
+        }
+        return { via: 'modelo', rotulo: alvo.rotulo, opcoes: semElemento(opcoes) };
+    } catch (e) {
+        return null;
+    }
+}
+
+function escolherPeloMenu(sel, passo) {
+    var opcoes;
+    // Retomada após evento do monitor: o menu pode já ter ficado aberto
+    if (!menuAberto()) { sel.click(); }
+    return aguardar(menuAberto)
+        .then(function () { return pausa(passo.pausa_menu); })
+        .then(function () {
+            return aguardar(function () {
+                opcoes = opcoesDe(menuAberto());
+                var alvo = alvoEm(opcoes, passo);
+                return alvo && clicavel(alvo.el) && alvo;
+            });
+        })
+        .then(function (alvo) {
+            alvo.el.click();
+            return aguardar(function () { return !menuAberto(); }).then(function () {
+                return { via: 'menu', rotulo: alvo.rotulo, opcoes: semElemento(opcoes) };
+            });
+        }, function (motivo) {
+            if (motivo === 'timeout' && passo.rotulo && opcoes && opcoes.length) {
+                throw 'opção "' + passo.rotulo + '" não existe no campo ' + passo.campo;
+            }
+            throw motivo;
+        });
+}
+
+// Resolve com o valor de teste() assim que for verdadeiro; rejeita com o motivo
+function aguardar(teste) {
+    return new Promise(function (resolve, reject) {
+        var valor = teste();
+        if (valor) { resolve(valor); return; }
+        var observador, relogio, timer;
+        function fim(v, motivo) {
+            observador.disconnect(); clearInterval(relogio); clearTimeout(timer);
+            if (motivo) { reject(motivo); } else { resolve(v); }
+        }
+        function checar() {
+            if (monitorComEventos()) { fim(null, 'monitor'); return; }
+            var v = teste();
+            if (v) { fim(v); }
+        }
+        observador = new MutationObserver(checar);
+        observador.observe(document.documentElement, { childList: true, subtree: true, attributes: true });
+        // Transições CSS mudam a geometria sem mutação no DOM
+        relogio = setInterval(checar, 100);
+        timer = setTimeout(function () { var v = teste(); if (v) { fim(v); } else { fim(null, 'timeout'); } }, timeoutMs);
+    });
+}
+
+function pausa(ms) {
+    return new Promise(function (resolve) { setTimeout(resolve, ms || 0); });
+}
+
+// Caminho rápido: avança pela própria função de navegação do componente (ng-click)
+function clicarPeloEscopo(el) {
+    var expressao = el.getAttribute('ng-click');
+    if (!rapido || !window.angular || !expressao) { return false; }
+    angular.element(el).scope().$apply(expressao);
+    return true;
+}
+
+// Espera o Angular ficar sem digest/$http/$timeout pendentes (no lugar das pausas fixas)
+function estavel() {
+    return new Promise(function (resolve) {
+        setTimeout(resolve, timeoutMs);
+        try { angular.getTestability(document.body).whenStable(resolve); } catch (e) { resolve(); }
+    });
+}
+
+function modeloDe(sel) {
+    try { return angular.toJson(angular.element(sel).controller('ngModel').$modelValue); } catch (e) { return null; }
+}
+
+// Clique que troca de tela: o nó de conteúdo da tela atual (XPath `tela`) fica
+// guardado até a próxima tela renderizar no lugar dele. Fica no window para
+// sobreviver a uma interrupção pelo monitor (o Python retoma o roteiro)
+function marcarTela(passo) {
+    var no = passo.tela && porXpath(passo.tela);
+    window.__roboTelaAnterior = no ? { xpath: passo.tela, no: no, passo: passo.nome } : null;
+}
+
+// Antes da próxima sub-ação: espera a nova tela no lugar da anterior. Resolve
+// com o nome do clique cuja tela não trocou dentro do timeout (ou null)
+function aguardarTroca() {
+    var anterior = window.__roboTelaAnterior;
+    if (!anterior) { return Promise.resolve(null); }
+    return aguardar(function () {
+        var atual = porXpath(anterior.xpath);
+        return atual && atual !== anterior.no && atual;
+    }).then(function () {
+        window.__roboTelaAnterior = null;
+        return null;
+    }, function (motivo) {
+        if (motivo !== 'timeout') { throw motivo; }
+        window.__roboTelaAnterior = null;
+        return anterior.passo;
+    });
+}
+
+function executar(passo) {
+    if (passo.acao === 'escolher') {
+        return aguardar(function () { return clicavel(porXpath(passo.xpath)); }).then(function (sel) {
+            return Promise.resolve(escolherPeloModelo(sel, passo) || escolherPeloMenu(sel, passo)).then(function (detalhe) {
+                detalhe.modelo = modeloDe(sel);
+                // O atalho pelo modelo tem que chegar no mesmo valor que o caminho por cliques chegou
+                if (detalhe.via === 'modelo' && passo.referencia && detalhe.modelo !== passo.referencia) { throw 'divergencia'; }
+                return detalhe;
+            });
+        });
+    }
+    return aguardar(function () { return clicavel(porXpath(passo.xpath)); }).then(function (el) {
+        marcarTela(passo);
+        var viaEscopo = clicarPeloEscopo(el);
+        if (!viaEscopo) { el.click(); }
+        return { via: viaEscopo ? 'escopo' : 'clique' };
+    });
+}
+
+function proximo(i) {
+    if (monitorComEventos()) { concluir({ resultados: resultados, proximo: i, motivo: 'monitor' }); return; }
+    var t0 = performance.now();
+    aguardarTroca().then(function (semTroca) {
+        if (semTroca) {
+            // Seguir clicaria nos elementos da tela errada (ou da anterior, ainda na página)
+            resultados.push({ nome: semTroca, acao: 'troca_de_tela', ok: false, ms: Math.round(performance.now() - t0),
+                              erro: 'a próxima tela do wizard não renderizou' });
+            concluir({ resultados: resultados, proximo: i, motivo: 'troca_de_tela' });
+            return;
+        }
+        if (i >= passos.length) { concluir({ resultados: resultados, proximo: i, motivo: null }); return; }
+        executarPasso(i);
+    }, function (motivo) {
+        concluir({ resultados: resultados, proximo: i, motivo: String(motivo) });
+    });
+}
+
+function executarPasso(i) {
+    var passo = passos[i], t0 = performance.now();
+    executar(passo).then(function (detalhe) {
+        var ms = Math.round(performance.now() - t0);
+        // Sem menu aberto não há animação de fechamento para esperar
+        var espera = rapido ? estavel() : pausa(detalhe.via === 'modelo' ? 0 : passo.pausa);
+        return espera.then(function () {
+            resultados.push({ nome: passo.nome, acao: passo.acao, ok: true, ms: ms, campo: passo.campo,
+                              via: detalhe.via, rotulo: detalhe.rotulo, opcoes: detalhe.opcoes, modelo: detalhe.modelo });
+            proximo(i + 1);
+        });
+    }, function (motivo) {
+        var ms = Math.round(performance.now() - t0);
+        if (motivo !== 'monitor') {
+            resultados.push({ nome: passo.nome, acao: passo.acao, ok: false, ms: ms, erro: String(motivo) });
+        }
+        concluir({ resultados: resultados, proximo: i, motivo: String(motivo) });
+    });
+}
+
+proximo(inicio);
+"""
+
+
+class ErroRoteiro(Exception):
+    """Sub-ação de um roteiro do wizard que não pôde ser concluída."""
+
+    def __init__(self, passo, motivo, resultados):
+        concluidas = ", ".join(f"{r['nome']} ({r['ms']}ms)" for r in resultados if r.get('ok'))
+        super().__init__(f"sub-ação '{passo}' falhou ({motivo}); concluídas: {concluidas or 'nenhuma'}")
+        self.passo = passo
+        self.motivo = motivo
+        self.resultados = resultados
+
+
+def clicar(nome, xpath, pausa=0, tela=None):
+    """
+    Sub-ação: espera o elemento ficar clicável, clica e pausa `pausa` segundos.
+    Com `tela` (XPath do conteúdo da tela atual do wizard), a sub-ação seguinte
+    só começa depois que a próxima tela renderizar no lugar desse conteúdo.
+    """
+    return {'nome': nome, 'acao': 'clicar', 'xpath': xpath, 'pausa': int(pausa * 1000), 'tela': tela}
+
+
+def escolher(campo, xpath, posicao=1, pausa=0, pausa_menu=0):
+    """
+    Sub-ação: escolhe uma opção do md-select `campo`. Usa o rótulo configurado
+    (WIZARD_OPCAO_<CAMPO>) ou, sem ele, a opção na `posicao` da primeira leitura.
+    """
+    return {'nome': campo, 'campo': campo, 'acao': 'escolher', 'xpath': xpath, 'posicao': posicao,
+            'pausa': int(pausa * 1000), 'pausa_menu': int(pausa_menu * 1000)}
+
+
+class CatalogoOpcoes:
+    """
+    Opções de cada md-select do wizard, com o rótulo escolhido persistido em arquivo.
+
+    Depois da primeira leitura a escolha fica fixada pelo rótulo (se o Hubsoft
+    reordenar a lista, continua indo na mesma opção) e pode ser gravada direto
+    no ng-model, sem abrir o menu. A referência do ng-model não é persistida:
+    o caminho rápido sempre é validado pelos cliques da própria sessão.
+    """
+
+    def __init__(self, rotulos=None, modelo=SELECAO_PELO_MODELO, rapido=WIZARD_VIA_ANGULAR, arquivo=ARQUIVO_CATALOGO):
+        self.rotulos = dict(rotulos if rotulos is not None else ROTULOS_CONFIGURADOS)
+        self.modelo = modelo
+        self.rapido = rapido
+        self.arquivo = arquivo
+        self.campos = {}  # campo -> {'opcoes': [...], 'rotulo': str, 'referencia': json do ng-model}
+        self.alterados = set()  # campos aprendidos ou alterados ainda não gravados no arquivo
+        self.roteiros_verificados = set()  # roteiros que já rodaram por cliques nesta sessão
+        for campo, salvo in self._ler().items():
+            self.campos[campo] = {'opcoes': salvo.get('opcoes') or [], 'rotulo': salvo.get('rotulo'), 'referencia': None}
+
+    def _ler(self):
+        if not self.arquivo:
+            return {}
+        try:
+            with open(self.arquivo, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.error(f"Catálogo de opções ilegível ({self.arquivo}): {e}")
+            return {}
+
+    def salvar(self):
+        """Grava os campos novos ou alterados, sem trocar o rótulo que outro worker já fixou."""
+        if not self.arquivo or not self.alterados:
+            return
+        try:
+            diretorio = os.path.dirname(self.arquivo) or '.'
+            os.makedirs(diretorio, exist_ok=True)
+            with open(f"{self.arquivo}.lock", 'w') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                dados = self._ler()
+                for campo in self.alterados:
+                    atual = self.campos[campo]
+                    dados[campo] = {'rotulo': dados.get(campo, {}).get('rotulo') or atual['rotulo'],
+                                    'opcoes': atual['opcoes']}
+                fd, temporario = tempfile.mkstemp(dir=diretorio, suffix='.tmp')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(dados, f, ensure_ascii=False)
+                os.replace(temporario, self.arquivo)
+            self.alterados.clear()
+        except Exception as e:
+            logger.error(f"Erro ao salvar catálogo de opções: {e}")
+
+    def rotulo(self, campo):
+        if campo in self.rotulos:
+            return self.rotulos[campo]
+        return self.campos.get(campo, {}).get('rotulo')
+
+    def preparar(self, passo):
+        if passo['acao'] != 'escolher':
+            return passo
+        referencia = self.campos.get(passo['campo'], {}).get('referencia')
+        # Atalho pelo ng-model só com a referência que os cliques desta sessão gravaram,
+        # a mesma condição do pode_usar_rapido: sem ela a divergência não seria detectada
+        return dict(passo, rotulo=self.rotulo(passo['campo']), modelo=self.modelo and bool(referencia),
+                    referencia=referencia)
+
+    def pode_usar_rapido(self, passos):
+        """
+        Caminho rápido só depois de o roteiro ter rodado uma vez por cliques na
+        sessão: é o valor que os cliques produziram que valida o caminho rápido.
+        """
+        return self.rapido and self._chave(passos) in self.roteiros_verificados and all(
+            self.campos.get(p['campo'], {}).get('referencia') for p in passos if p['acao'] == 'escolher'
+        )
+
+    def marcar_verificado(self, passos):
+        self.roteiros_verificados.add(self._chave(passos))
+
+    @staticmethod
+    def _chave(passos):
+        return tuple(p['nome'] for p in passos)
+
+    def desativar_atalhos(self, campo):
+        logger.warning(f"⚠️ Atalho pelo Angular divergiu dos cliques no campo {campo}; voltando aos cliques")
+        self.rapido = False
+        self.modelo = False
+
+    def atualizar(self, resultados):
+        for resultado in resultados:
+            campo, opcoes = resultado.get('campo'), resultado.get('opcoes')
+            if not campo or not opcoes:
+                continue
+            anterior = self.campos.get(campo)
+            if anterior is None:
+                logger.info(f"📚 Campo {campo}: {len(opcoes)} opções, escolhida '{resultado.get('rotulo')}'")
+                self.alterados.add(campo)
+            elif [o['rotulo'] for o in anterior['opcoes']] != [o['rotulo'] for o in opcoes]:
+                logger.warning(f"⚠️ Opções do campo {campo} mudaram no Hubsoft; mantendo '{anterior['rotulo']}'")
+                self.alterados.add(campo)
+            self.campos[campo] = {
+                'opcoes': opcoes,
+                'rotulo': anterior['rotulo'] if anterior else resultado.get('rotulo'),
+                # Referência de validação: sempre o valor que o caminho por cliques gravou
+                'referencia': (resultado.get('modelo') if resultado.get('via') == 'menu'
+                               else (anterior or {}).get('referencia')),
+            }
+
+
+def executar_roteiro(sessao, passos, timeout):
+    """
+    Executa as sub-ações na página com uma chamada ao navegador (mais uma por
+    evento do monitor) e retorna a lista de resultados por sub-ação. `timeout`
+    (segundos) limita a espera de cada elemento e de cada troca de tela.
+    """
+    driver, wait, monitor = sessao.driver, sessao.wait, sessao.monitor
+    catalogo = getattr(sessao, 'catalogo_opcoes', None)
+    rapido = catalogo is not None and catalogo.pode_usar_rapido(passos)
+    if catalogo is not None:
+        passos = [catalogo.preparar(p) for p in passos]
+    # Com as animações desativadas só as pausas de animação encolhem (ver animacoes.py): as do
+    # md-select e as de cliques com `tela`, cuja troca de tela já é esperada à parte. A pausa
+    # de um clique sem `tela` é a única espera pela resposta do Hubsoft e vale inteira
+    fator = getattr(sessao, 'fator_pausas', 1.0)
+    passos = [dict(p, pausa=int(p['pausa'] * fator), pausa_menu=int(p.get('pausa_menu', 0) * fator))
+              if p['acao'] == 'escolher' or p.get('tela') else p for p in passos]
+    # Cada sub-ação pode esperar até o timeout da etapa, mais as pausas
+    pausas = sum(p['pausa'] + p.get('pausa_menu', 0) for p in passos) / 1000.0
+    driver.set_script_timeout(timeout * len(passos) * 2 + pausas + 5)
+
+    resultados = []
+    indice = 0
+    limite = time.monotonic() + timeout * len(passos) * 2
+    while indice < len(passos):
+        retorno = driver.execute_async_script(SCRIPT_ROTEIRO, passos, indice, int(timeout * 1000), rapido) or {}
+        resultados.extend(retorno.get('resultados') or [])
+        indice = retorno.get('proximo', indice)
+        motivo = retorno.get('motivo')
+        # Evento na página (toast/diálogo): lança ErroHubsoft se for erro, senão retoma
+        monitor.verificar()
+        if motivo == 'divergencia':
+            # Refaz a sub-ação pelo menu, que sobrescreve o valor gravado pelo atalho
+            catalogo.desativar_atalhos(passos[indice]['nome'])
+            rapido = False
+            passos = [dict(p, modelo=False) if i == indice else p for i, p in enumerate(passos)]
+            continue
+        if motivo == 'troca_de_tela':
+            # A falha é do clique que devia trocar a tela, não da sub-ação seguinte
+            raise ErroRoteiro(resultados[-1]['nome'], motivo, resultados)
+        if motivo and motivo != 'monitor':
+            raise ErroRoteiro(passos[indice]['nome'], motivo, resultados)
+        if motivo == 'monitor' and time.monotonic() > limite:
+            raise ErroRoteiro(passos[indice]['nome'], 'timeout', resultados)
+
+    for resultado in resultados:
+        logger.debug(f"Sub-ação {resultado.get('nome')} ({resultado.get('via') or resultado.get('acao')})",
+                     extra={'duracao_ms': resultado.get('ms')})
+
+    if catalogo is not None:
+        catalogo.atualizar(resultados)
+        if not rapido:
+            catalogo.marcar_verificado(passos)
+
+    # Alimenta os timeouts adaptativos como cada wait individual fazia
+    historico = getattr(wait, 'historico', None)
+    if historico is not None:
+        for resultado in resultados:
+            if resultado.get('ok'):
+                historico.registrar(wait.etapa, resultado['ms'] / 1000.0)
+    return resultados
@@ -0,0 +1,212 @@
+"""
+Endpoint HTTP local de saúde, prontidão e capacidade do robô.
+
+O systemd só sabe se o processo Python está vivo. O agendador sobe aqui um
+http.server da biblioteca padrão (127.0.0.1:PORTA_SAUDE, 0 desliga) que
+responde:
+
+- GET /saude: 200 se algum worker ou o loop do agendador deu sinal nos
+  últimos LIMITE_SILENCIO_S segundos, 503 se o processo parece travado;
+- GET /pronto: 200 se o robô aceita trabalho (loop iniciado, disjuntores
+  fechados, sem drenagem em andamento), 503 com o motivo;
+- GET /estado: tudo em JSON: workers (estado, prospecto, ETAPA atual),
+  profundidade da fila, vazão dos últimos VAZAO_MINUTOS minutos,
+  navegadores abertos (memória via /proc) e disjuntores.
+
+O fluxo (main_refatorado/lote_abas/agendador) só atualiza este estado em
+memória; nada aqui toca o banco nem o navegador.
+
+    curl -s localhost:8765/estado | jq .
+"""
+import os
+import json
+import time
+import logging
+import threading
+import collections
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import disjuntor
+from recursos import amostrar
+
+logger = logging.getLogger(__name__)
+
+PORTA_SAUDE = int(os.environ.get('PORTA_SAUDE', '8765'))
+VAZAO_MINUTOS = float(os.environ.get('VAZAO_MINUTOS', '15'))
+LIMITE_SILENCIO_S = float(os.environ.get('LIMITE_SILENCIO_S', '900'))
+
+_lock = threading.Lock()
+_workers = {}  # nome da thread -> estado do worker
+_navegadores = {}  # pid do Chrome -> {'abas', 'desde'}
+_resultados = collections.deque(maxlen=10000)  # (instante, resultado)
+_fila = {}
+_daemon = {'iniciado': False, 'drenando': False, 'ultimo_sinal': time.time()}
+_servidor = None
+
+
+def _sinal():
+    _daemon['ultimo_sinal'] = time.time()
+
+
+def marcar(estado=None, **campos):
+    """Atualiza o worker da thread atual (estado: ocioso, abrindo_navegador, processando...)."""
+    nome = threading.current_thread().name
+    with _lock:
+        worker = _workers.setdefault(nome, {'estado': 'ocioso', 'prospecto': None, 'run_id': None, 'etapa': None})
+        if estado is not None and estado != worker['estado']:
+            worker['estado'] = estado
+            worker['desde'] = time.time()
+        worker.update(campos)
+        worker['atualizado'] = time.time()
+        _sinal()
+
+
+def remover():
+    with _lock:
+        _workers.pop(threading.current_thread().name, None)
+
+
+def registrar_resultado(resultado):
+    with _lock:
+        _resultados.append((time.time(), resultado))
+        _sinal()
+
+
+def navegador_aberto(pid):
+    if pid is None:
+        return
+    with _lock:
+        navegador = _navegadores.setdefault(pid, {'abas': 0, 'desde': time.time()})
+        navegador['abas'] += 1
+
+
+def navegador_fechado(pid):
+    with _lock:
+        navegador = _navegadores.get(pid)
+        if navegador:
+            navegador['abas'] -= 1
+            if navegador['abas'] <= 0:
+                del _navegadores[pid]
+
+
+def atualizar_fila(**profundidade):
+    """Profundidade da fila lida pelo agendador (prontos, pendentes, processando...)."""
+    with _lock:
+        _fila.clear()
+        _fila.update(profundidade, lida_em=time.time())
+        _daemon['iniciado'] = True
+        _sinal()
+
+
+def marcar_drenagem(drenando=True):
+    with _lock:
+        _daemon['drenando'] = drenando
+
+
+def _vazao(agora):
+    janela = VAZAO_MINUTOS * 60
+    contagem = collections.Counter(r for t, r in _resultados if agora - t <= janela)
+    total = sum(contagem.values())
+    return {'minutos': VAZAO_MINUTOS, 'total': total, 'por_minuto': round(total / VAZAO_MINUTOS, 2),
+            'por_resultado': dict(contagem)}
+
+
+def _navegadores_com_memoria():
+    navegadores = []
+    for pid, navegador in list(_navegadores.items()):
+        item = {'pid': pid, 'abas': navegador['abas'], 'aberto_ha_s': int(time.time() - navegador['desde'])}
+        try:
+            item.update(amostrar(pid))
+        except Exception:
+            pass
+        navegadores.append(item)
+    return navegadores
+
+
+def vivo():
+    return time.time() - _daemon['ultimo_sinal'] <= LIMITE_SILENCIO_S
+
+
+def pronto():
+    """(pronto, motivo)."""
+    if not _daemon['iniciado']:
+        return False, 'agendador ainda não iniciou o loop'
+    if _daemon['drenando']:
+        return False, 'drenando para encerrar'
+    abertos = [nome for nome, c in disjuntor.situacao().items() if c.get('estado') != disjuntor.FECHADO]
+    if abertos:
+        return False, f"disjuntor aberto: {', '.join(abertos)}"
+    return True, 'ok'
+
+
+def estado():
+    agora = time.time()
+    with _lock:
+        workers = {nome: dict(w, ha_s=int(agora - w.get('desde', agora))) for nome, w in _workers.items()}
+        fila = dict(_fila)
+        vazao = _vazao(agora)
+    esta_pronto, motivo = pronto()
+    return {
+        'pid': os.getpid(),
+        'vivo': vivo(),
+        'pronto': esta_pronto,
+        'motivo': motivo,
+        'drenando': _daemon['drenando'],
+        'ultimo_sinal_ha_s': int(agora - _daemon['ultimo_sinal']),
+        'workers': workers,
+        'fila': fila,
+        'vazao': vazao,
+        'navegadores': _navegadores_com_memoria(),
+        'disjuntores': disjuntor.situacao(),
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def _responder(self, codigo, corpo):
+        dados = json.dumps(corpo, ensure_ascii=False, default=str).encode()
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        try:
+            if self.path == '/saude':
+                ok = vivo()
+                self._responder(200 if ok else 503, {'vivo': ok})
+            elif self.path == '/pronto':
+                ok, motivo = pronto()
+                self._responder(200 if ok else 503, {'pronto': ok, 'motivo': motivo})
+            elif self.path == '/estado':
+                self._responder(200, estado())
+            else:
+                self._responder(404, {'erro': 'use /saude, /pronto ou /estado'})
+        except Exception as e:
+            self._responder(500, {'erro': str(e)})
+
+    def log_message(self, formato, *args):
+        logger.debug(f"{self.address_string()} {formato % args}")
+
+
+def iniciar(porta=PORTA_SAUDE):
+    """Sobe o servidor numa thread daemon (uma vez por processo)."""
+    global _servidor
+    if _servidor is not None or not porta:
+        return _servidor
+    try:
+        _servidor = ThreadingHTTPServer(('127.0.0.1', porta), _Handler)
+    except OSError as e:
+        logger.warning(f"⚠️ Endpoint de saúde indisponível na porta {porta}: {e}")
+        return None
+    _servidor.daemon_threads = True
+    threading.Thread(target=_servidor.serve_forever, name='servidor-saude', daemon=True).start()
+    logger.info(f"🩺 Endpoint de saúde em http://127.0.0.1:{porta} (/saude, /pronto, /estado)")
+    return _servidor
+
+
+def parar():
+    global _servidor
+    if _servidor is not None:
+        _servidor.shutdown()
+        _servidor.server_close()
+        _servidor = None
@@ -0,0 +1,167 @@
+"""
+Timeouts adaptativos por etapa.
+
+Cada wait registra quanto demorou, agrupado pela ETAPA em que ocorreu. Um
+wait que estoura entra como amostra censurada no valor do próprio timeout:
+com o Hubsoft mais lento, os timeouts levam o p99 ao timeout atual e o
+próximo cresce pelo fator (até o teto), em vez de ficar preso num histórico
+só de sucessos. O histórico fica num arquivo JSON local (compartilhado entre workers
+com lock) e guarda só as amostras mais recentes, então a política acompanha
+sozinha o Hubsoft ficando mais lento ou mais rápido.
+
+Timeout de cada etapa = p99 das esperas x fator, limitado por piso e teto.
+Enquanto não houver amostras suficientes, vale o timeout fixo antigo (15s).
+
+O mesmo arquivo guarda a duração total de cada etapa (DURACAO_ETAPAn, com
+sufixo _SEM_ANIMACAO quando as animações estavam desativadas). Para comparar:
+    python3 tempos_etapas.py
+"""
+import os
+import json
+import math
+import time
+import fcntl
+import logging
+import tempfile
+from collections import defaultdict
+from selenium.common.exceptions import TimeoutException
+from monitor_hubsoft import EsperaMonitorada
+
+logger = logging.getLogger(__name__)
+
+ARQUIVO_TEMPOS = os.environ.get('ARQUIVO_TEMPOS_ETAPAS', 'stats/tempos_etapas.json')
+MAX_AMOSTRAS = 200  # Janela deslizante por etapa
+MIN_AMOSTRAS = 20   # Abaixo disso usa o timeout padrão
+TIMEOUT_PADRAO = 15
+TIMEOUT_FATOR = float(os.environ.get('TIMEOUT_FATOR', '1.5'))
+TIMEOUT_PISO = float(os.environ.get('TIMEOUT_PISO', '5'))
+TIMEOUT_TETO = float(os.environ.get('TIMEOUT_TETO', '45'))
+POLL_PISO = 0.1
+POLL_TETO = 0.5  # Padrão do WebDriverWait
+
+
+def percentil(valores, p):
+    """Percentil por posição (nearest-rank) de uma lista de números."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, math.ceil(p / 100.0 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+class HistoricoTempos:
+    """Amostras de duração das esperas por etapa, persistidas em arquivo JSON."""
+
+    def __init__(self, arquivo=ARQUIVO_TEMPOS):
+        self.arquivo = arquivo
+        self.amostras = defaultdict(list, self._ler())
+        self.novas = defaultdict(list)  # Ainda não gravadas no arquivo
+
+    def _ler(self):
+        try:
+            with open(self.arquivo, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.error(f"Histórico de tempos ilegível ({self.arquivo}): {e}")
+            return {}
+
+    def registrar(self, etapa, duracao):
+        duracao = round(duracao, 3)
+        self.amostras[etapa].append(duracao)
+        del self.amostras[etapa][:-MAX_AMOSTRAS]
+        self.novas[etapa].append(duracao)
+
+    def salvar(self):
+        """Mescla as amostras novas com o que outros workers gravaram e salva."""
+        if not self.novas:
+            return
+        try:
+            diretorio = os.path.dirname(self.arquivo) or '.'
+            os.makedirs(diretorio, exist_ok=True)
+            with open(f"{self.arquivo}.lock", 'w') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                dados = self._ler()
+                for etapa, duracoes in self.novas.items():
+                    dados[etapa] = (dados.get(etapa, []) + duracoes)[-MAX_AMOSTRAS:]
+                fd, temporario = tempfile.mkstemp(dir=diretorio, suffix='.tmp')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(dados, f)
+                os.replace(temporario, self.arquivo)
+            self.amostras = defaultdict(list, dados)
+            self.novas.clear()
+        except Exception as e:
+            logger.error(f"Erro ao salvar histórico de tempos: {e}")
+
+
+class PoliticaTimeout:
+    """Define timeout e intervalo de poll de cada etapa a partir do histórico."""
+
+    def __init__(self, historico, fator=TIMEOUT_FATOR, piso=TIMEOUT_PISO, teto=TIMEOUT_TETO):
+        self.historico = historico
+        self.fator = fator
+        self.piso = piso
+        self.teto = teto
+
+    def timeout(self, etapa):
+        amostras = self.historico.amostras.get(etapa, [])
+        if len(amostras) < MIN_AMOSTRAS:
+            return TIMEOUT_PADRAO
+        return min(self.teto, max(self.piso, percentil(amostras, 99) * self.fator))
+
+    def intervalo_poll(self, etapa):
+        amostras = self.historico.amostras.get(etapa, [])
+        if len(amostras) < MIN_AMOSTRAS:
+            return POLL_TETO
+        return min(POLL_TETO, max(POLL_PISO, percentil(amostras, 50) / 5))
+
+    def espera(self, driver, monitor, etapa):
+        """Cria o wait da etapa já com timeout/poll adaptativos e cronometragem."""
+        return EsperaCronometrada(
+            driver, self.timeout(etapa), monitor, self.historico, etapa,
+            poll_frequency=self.intervalo_poll(etapa)
+        )
+
+
+class EsperaCronometrada(EsperaMonitorada):
+    """Wait monitorado que registra no histórico a duração de cada espera (timeouts como amostra censurada)."""
+
+    def __init__(self, driver, timeout, monitor, historico, etapa, **kwargs):
+        super().__init__(driver, timeout, monitor, **kwargs)
+        self.historico = historico
+        self.etapa = etapa
+
+    def until(self, method, message=""):
+        return self._cronometrar(super().until, method, message)
+
+    def _aguardar_evento(self, localizador, clicavel):
+        return self._cronometrar(super()._aguardar_evento, localizador, clicavel)
+
+    def _cronometrar(self, esperar, *args):
+        inicio = time.monotonic()
+        try:
+            resultado = esperar(*args)
+        except TimeoutException:
+            # A espera durou pelo menos o timeout; erros do Hubsoft (ErroHubsoft) não entram
+            self.historico.registrar(self.etapa, max(self.timeout, time.monotonic() - inicio))
+            raise
+        self.historico.registrar(self.etapa, time.monotonic() - inicio)
+        return resultado
+
+
+def comparar_animacoes(historico):
+    """Tabela p50/p95 da duração de cada etapa com e sem animações."""
+    print(f"{'etapa':<8}{'com animação (p50/p95 s)':>28}{'sem animação (p50/p95 s)':>28}{'ganho p50':>12}")
+    for numero in range(1, 10):
+        com = historico.amostras.get(f"DURACAO_ETAPA{numero}", [])
+        sem = historico.amostras.get(f"DURACAO_ETAPA{numero}_SEM_ANIMACAO", [])
+        if not com and not sem:
+            continue
+        colunas = [f"{percentil(v, 50):.2f} / {percentil(v, 95):.2f} ({len(v)})" if v else "-" for v in (com, sem)]
+        ganho = f"{percentil(com, 50) - percentil(sem, 50):+.2f}s" if com and sem else "-"
+        print(f"{numero:<8}{colunas[0]:>28}{colunas[1]:>28}{ganho:>12}")
+
+
+if __name__ == "__main__":
+    comparar_animacoes(HistoricoTempos())
@@ -0,0 +1,41 @@
+"""Espera por LISTEN/NOTIFY do agendador (aviso_fila.py)."""
+import threading
+from unittest import mock
+
+import aviso_fila
+import drenagem
+from aviso_fila import AvisoFila
+
+
+class ConexaoFalsa:
+    """Entrega um lote de NOTIFY por poll(), como o psycopg2 enche conn.notifies."""
+
+    def __init__(self, lotes):
+        self.lotes = list(lotes)
+        self.notifies = []
+
+    def poll(self):
+        if self.lotes:
+            self.notifies.extend(self.lotes.pop(0))
+
+
+def test_rajada_de_avisos_acorda_uma_vez_so(monkeypatch):
+    monkeypatch.setattr(drenagem, '_pedido', threading.Event())
+    # Nada pendente na entrada; o primeiro aviso chega e o resto da rajada vem durante o AGRUPAR_S
+    aviso = AvisoFila({})
+    aviso.conn = ConexaoFalsa([[], ['101'], ['102', '103']])
+    sleep = mock.MagicMock()
+    monkeypatch.setattr(aviso_fila.time, 'sleep', sleep)
+    monkeypatch.setattr(aviso_fila.select, 'select', lambda r, w, x, t: (r, [], []))
+
+    assert aviso.esperar(5) == 3
+    sleep.assert_called_once_with(aviso_fila.AGRUPAR_S)
+    assert aviso.conn.notifies == []
+
+
+def test_sem_aviso_volta_no_timeout(monkeypatch):
+    monkeypatch.setattr(drenagem, '_pedido', threading.Event())
+    aviso = AvisoFila({})
+    aviso.conn = ConexaoFalsa([])
+    monkeypatch.setattr(aviso_fila.select, 'select', lambda r, w, x, t: ([], [], []))
+    assert aviso.esperar(0.01) == 0
@@ -0,0 +1,31 @@
+"""Timeouts do backend CDP (backend_cdp.py)."""
+import asyncio
+from unittest import mock
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from backend_cdp import AbaCDP, ConexaoCDP, DriverCDP, TempoEsgotadoCDP
+
+
+def conexao_sem_resposta():
+    conexao = ConexaoCDP()
+    conexao.ws = mock.MagicMock()
+    conexao.writer = mock.MagicMock(drain=mock.AsyncMock())
+    return conexao
+
+
+def test_comando_sem_resposta_nao_fica_pendente():
+    conexao = conexao_sem_resposta()
+    with pytest.raises(TempoEsgotadoCDP):
+        asyncio.run(conexao.enviar('Runtime.evaluate', timeout=0.01))
+    assert conexao.pendentes == {}
+
+
+def test_driver_traduz_o_timeout_da_espera_para_o_selenium():
+    conexao = mock.MagicMock(enviar=mock.AsyncMock(side_effect=TempoEsgotadoCDP("Runtime.evaluate sem resposta em 5s")))
+    navegador = mock.MagicMock(conexao=conexao)
+    navegador.executar.side_effect = lambda coro, timeout=None: asyncio.run(coro)
+    # Chrome travado não vira "elemento ainda não apareceu" (None), que faria a espera recomeçar
+    with pytest.raises(TimeoutException):
+        DriverCDP(navegador, AbaCDP(conexao, 't', 's')).aguardar_elemento(('xpath', '//button'), True, 1)
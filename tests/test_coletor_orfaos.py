@@ -0,0 +1,33 @@
+"""Coletor de órfãos (coletor_orfaos.py): só recolhe o que o robô registrou."""
+import json
+import os
+
+import coletor_orfaos
+
+
+def test_sem_legado_so_perfis_registrados_e_chromedriver_do_robo(tmp_path, monkeypatch):
+    monkeypatch.setattr(coletor_orfaos.tempfile, 'tempdir', str(tmp_path))
+    antigo = tmp_path / 'tmpabc'
+    antigo.mkdir()
+    (antigo / 'Local State').touch()
+    os.utime(antigo, (0, 0))
+    abandonado = tmp_path / (coletor_orfaos.PREFIXO_PERFIL + 'x')
+    abandonado.mkdir()
+    (abandonado / coletor_orfaos.ARQUIVO_DONO).write_text(json.dumps({'dono': 1, 'inicio_dono': -1, 'pgid': None}))
+    # chromedriver adotado pelo init: 10 tem um Chrome filho no perfil registrado, 20 é de outro serviço
+    monkeypatch.setattr(coletor_orfaos, '_processos_proprios', lambda: {
+        10: (1, 10, ['/usr/bin/chromedriver']),
+        11: (10, 10, ['/opt/chrome/chrome', f'--user-data-dir={abandonado}']),
+        20: (1, 20, ['/usr/bin/chromedriver']),
+    })
+    mortos = []
+    monkeypatch.setattr(coletor_orfaos, '_matar', lambda pids: mortos.extend(pids))
+
+    assert coletor_orfaos.coletar() == {'perfis': 1, 'processos': 2}
+    assert sorted(mortos) == [10, 11]
+    assert sorted(os.listdir(tmp_path)) == ['tmpabc']
+
+    # A limpeza legada, explícita, leva também o perfil sem registro e o outro chromedriver
+    mortos.clear()
+    assert coletor_orfaos.coletar(legado=True)['perfis'] == 1
+    assert 20 in mortos and not antigo.exists()
@@ -0,0 +1,48 @@
+"""Máquina de estados do disjuntor compartilhado (disjuntor.py)."""
+from unittest import mock
+
+import disjuntor
+
+
+def test_abre_sonda_e_reabre_com_espera_dobrada(tmp_path, monkeypatch):
+    monkeypatch.setattr(disjuntor, 'ARQUIVO_DISJUNTOR', str(tmp_path / 'disjuntor.json'))
+    monkeypatch.setattr(disjuntor, 'ESPERA_S', 60)
+    agora = [1000.0]
+    monkeypatch.setattr(disjuntor.time, 'time', lambda: agora[0])
+    sonda = mock.MagicMock()
+    hubsoft = disjuntor.Disjuntor('hubsoft', sonda, limiar=2)
+
+    hubsoft.registrar_falha("login falhou")
+    assert hubsoft.liberado()
+    hubsoft.registrar_falha("login falhou")
+    assert disjuntor.situacao()['hubsoft']['estado'] == disjuntor.ABERTO
+    # Aberto: ninguém despacha nem sonda antes da espera
+    agora[0] += 59
+    assert not hubsoft.liberado()
+    sonda.assert_not_called()
+
+    # Espera vencida: este worker sonda e fica meio aberto
+    agora[0] += 2
+    assert hubsoft.liberado()
+    assert sonda.call_count == 1
+    assert disjuntor.situacao()['hubsoft']['estado'] == disjuntor.MEIO_ABERTO
+
+    # Primeira falha na meia abertura reabre com a espera dobrada
+    hubsoft.registrar_falha("login falhou de novo")
+    circuito = disjuntor.situacao()['hubsoft']
+    assert (circuito['estado'], circuito['espera']) == (disjuntor.ABERTO, 120)
+    agora[0] += 61
+    assert not hubsoft.liberado()
+
+    # Sonda que falha também reabre e dobra a espera
+    agora[0] += 60
+    sonda.side_effect = ConnectionError("recusada")
+    assert not hubsoft.liberado()
+    assert disjuntor.situacao()['hubsoft']['espera'] == 240
+
+    agora[0] += 241
+    sonda.side_effect = None
+    assert hubsoft.liberado()
+    hubsoft.registrar_sucesso()
+    circuito = disjuntor.situacao()['hubsoft']
+    assert (circuito['estado'], circuito['falhas'], circuito['espera']) == (disjuntor.FECHADO, 0, 60)
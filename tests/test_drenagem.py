@@ -0,0 +1,51 @@
+"""Drenagem no SIGTERM (drenagem.py) nas abas e na devolução do prospecto (main_refatorado.py)."""
+import queue
+import threading
+from unittest import mock
+
+import drenagem
+import main_refatorado
+from main_refatorado import ProspectoProcessor, consumir_fila
+
+
+def test_drenagem_do_processo_para_todas_as_abas(monkeypatch):
+    pedido = threading.Event()
+    monkeypatch.setattr(drenagem, '_pedido', pedido)
+    monkeypatch.setattr(main_refatorado, 'infraestrutura_bloqueada', lambda: False)
+    fila = queue.Queue()
+    for i in range(8):
+        fila.put(("X", str(i)))
+    processados = []
+
+    def processar(sessao, processor, nome_filtro, id_prospecto):
+        processados.append(id_prospecto)
+        pedido.set()  # SIGTERM chega ao agendador no meio do primeiro prospecto
+
+    def abrir():
+        sessao = mock.MagicMock()
+        sessao.vigia.precisa_reciclar.return_value = False
+        return sessao
+
+    monkeypatch.setattr(main_refatorado, 'processar_prospecto', processar)
+    abas = [threading.Thread(target=consumir_fila,
+                             args=(fila, abrir, mock.MagicMock(), mock.MagicMock(registros={}), {}))
+            for _ in range(2)]
+    for aba in abas:
+        aba.start()
+    for aba in abas:
+        aba.join(5)
+    # Cada aba termina no máximo o prospecto que já tinha pego
+    assert len(processados) <= 2 and fila.qsize() >= 6
+
+
+def test_devolver_respeita_status_do_banco_primario():
+    processor = ProspectoProcessor()
+    processor.conn, processor.conn_secondary = mock.MagicMock(), mock.MagicMock()
+    processor.current_prospecto_id, processor.current_secundario_id = 10, 20
+    processor.tentativa_atual = 2
+    processor.eventos = mock.MagicMock()
+    processor.devolver_prospecto("1518")
+    primario = processor.conn.cursor.return_value.execute.call_args[0][1]
+    django = processor.conn_secondary.cursor.return_value.execute.call_args[0][1]
+    assert primario == ('processando', 1, 10)
+    assert django == ('aguardando', 1, 20)
@@ -0,0 +1,37 @@
+"""
+Pré-filtro de elegibilidade (elegibilidade.py) e prospecto_elegivel (main_refatorado.py).
+
+Rodar da raiz do projeto:
+    PYTHONPATH=myenv/lib/python3.11/site-packages python3 -m pytest -q tests
+"""
+import datetime
+from unittest import mock
+
+from elegibilidade import ServicoElegibilidade
+from main_refatorado import prospecto_elegivel
+
+
+def classificar(linhas, ids):
+    """Classifica `ids` com um banco falso que devolve `linhas` na consulta = ANY(%s)."""
+    conn = mock.MagicMock()
+    conn.cursor.return_value.fetchall.return_value = linhas
+    return ServicoElegibilidade(conn).classificar(ids)
+
+
+def test_nao_retentavel_com_id_inteiro():
+    # main() recebe o ID como int; as chaves do resultado são str
+    elegibilidade = classificar([('1518', 10, 1, 'erro', 'dados', None)], [1518])
+    assert elegibilidade.situacao(1518) == "nao_retentavel"
+    assert prospecto_elegivel("X", 1518, elegibilidade) is False
+
+
+def test_executavel_com_id_inteiro():
+    elegibilidade = classificar([], [1520])
+    assert prospecto_elegivel("X", 1520, elegibilidade) is True
+
+
+def test_adiado_com_id_inteiro():
+    proxima = datetime.datetime.now() + datetime.timedelta(minutes=10)
+    elegibilidade = classificar([('1519', 11, 1, 'erro', 'transitorio', proxima)], [1519])
+    assert elegibilidade.situacao(1519) == "adiado"
+    assert prospecto_elegivel("X", 1519, elegibilidade) is False
@@ -0,0 +1,35 @@
+"""Pré-verificação de prospecto já convertido (main_refatorado.py)."""
+from unittest import mock
+
+import pytest
+
+import classificador_falhas
+import main_refatorado
+from main_refatorado import ja_convertido, itens_sem_converter
+from monitor_hubsoft import ErroHubsoft
+
+
+def test_nao_convertido_nao_e_sinal_de_conversao():
+    assert ja_convertido({'celulas': ['1518', 'FULANO DE TAL', 'Não convertido'], 'cliente': None}) is None
+
+
+def test_situacao_convertido_exata_e_cliente_vinculado():
+    assert ja_convertido({'celulas': ['1518', 'FULANO', ' Convertido ']})
+    assert ja_convertido({'celulas': ['1518', 'FULANO'], 'cliente': '#/cliente/visualizar/77'})
+
+
+def test_menu_sem_opcao_nao_conclui_como_sucesso():
+    situacao = {'celulas': ['1518', 'FULANO', 'Aguardando'], 'cliente': None,
+                'itens_menu': ['Editar', 'Excluir']}
+    assert itens_sem_converter(situacao) == ['Editar', 'Excluir']
+    assert ja_convertido(situacao) is None
+
+    sessao = mock.MagicMock()
+    sessao.driver.execute_script.return_value = situacao
+    processor = mock.MagicMock()
+    with mock.patch.object(main_refatorado, 'executar_etapa') as etapa:
+        with pytest.raises(ErroHubsoft) as erro:
+            main_refatorado.processar_prospecto(sessao, processor, "FULANO", 1518)
+    assert classificador_falhas.classificar(erro.value) == classificador_falhas.DADOS
+    assert [c.args[4] for c in etapa.call_args_list] == [3, 4]
+    processor.salvar_prospecto.assert_not_called()
@@ -0,0 +1,45 @@
+"""Token bucket compartilhado (limitador_taxa.py) sobre uma conexão falsa."""
+from unittest import mock
+
+import pytest
+
+import drenagem
+import limitador_taxa
+from limitador_taxa import LimitadorTaxa
+
+
+def limitador_com_fichas(monkeypatch, *fichas):
+    """Limitador cujo UPDATE do balde devolve `fichas` em sequência (login: 6/min, rajada 2)."""
+    conn = mock.MagicMock(closed=False)
+    conn.cursor.return_value.fetchone.side_effect = [(f,) for f in fichas]
+    monkeypatch.setattr(limitador_taxa.psycopg2, 'connect', lambda **config: conn)
+    return LimitadorTaxa({}, orcamentos={'login': (6 / 60.0, 2.0)}), conn.cursor.return_value
+
+
+def test_balde_negativo_espera_a_vez_pela_taxa(monkeypatch):
+    esperas = []
+    monkeypatch.setattr(drenagem, 'esperar', lambda segundos: esperas.append(segundos) or False)
+    limitador, cursor = limitador_com_fichas(monkeypatch, 1.0, -1.5)
+
+    # Com ficha no balde passa direto; o balde semeado com a rajada só uma vez
+    assert limitador.aguardar('login') == 0
+    # 1,5 ficha reservada além do balde a 0,1 ficha/s: 15s até a vez desta
+    assert limitador.aguardar('login') == pytest.approx(15.0)
+    assert esperas == [pytest.approx(15.0)]
+    inserts = [c for c in cursor.execute.call_args_list if 'INSERT' in c.args[0]]
+    assert len(inserts) == 1 and inserts[0].args[1] == ('login', 2.0)
+    assert cursor.execute.call_args_list[-1].args[1] == (pytest.approx(15.0), 'login')
+    assert limitador.resumo()['login'] == {'consumos': 2, 'esperas': 1, 'segundos': pytest.approx(15.0)}
+
+
+def test_drenagem_no_meio_da_espera_interrompe(monkeypatch):
+    monkeypatch.setattr(drenagem, 'esperar', lambda segundos: True)
+    monkeypatch.setattr(drenagem, 'restante', lambda: 5.0)
+    limitador, _ = limitador_com_fichas(monkeypatch, -3.0)
+    with pytest.raises(drenagem.InterrompidoPorDrenagem):
+        limitador.aguardar('login')
+
+
+def test_banco_fora_libera_a_acao(monkeypatch):
+    monkeypatch.setattr(limitador_taxa.psycopg2, 'connect', mock.MagicMock(side_effect=OSError("recusada")))
+    assert LimitadorTaxa({}).aguardar('login') == 0.0
@@ -0,0 +1,46 @@
+"""Várias abas num único Chrome (lote_abas.py)."""
+from unittest import mock
+
+import lote_abas
+
+
+def test_chrome_acima_do_limite_e_reciclado_inteiro(monkeypatch):
+    navegadores = []
+
+    class Navegador:
+        def __init__(self, *args):
+            self.reciclar = False
+            self.fechado = False
+            navegadores.append(self)
+
+        def fechar(self):
+            self.fechado = True
+
+    def trabalhador(navegador, fila, elegibilidade, resultados):
+        # Como o consumir_fila: pega prospectos até a fila esvaziar ou o navegador pedir reciclagem.
+        # O primeiro Chrome passa do limite já no primeiro prospecto
+        while not navegador.reciclar and not fila.empty():
+            nome_filtro, id_prospecto = fila.get_nowait()
+            resultados[id_prospecto] = "sucesso"
+            navegador.reciclar = len(navegadores) == 1
+
+    monkeypatch.setenv('USUARIO', 'u')
+    monkeypatch.setenv('SENHA', 's')
+    monkeypatch.setattr(lote_abas, 'NavegadorCompartilhado', Navegador)
+    monkeypatch.setattr(lote_abas, 'trabalhador', trabalhador)
+    monkeypatch.setattr(lote_abas, 'infraestrutura_liberada', lambda: True)
+    monkeypatch.setattr(lote_abas, 'infraestrutura_bloqueada', lambda: False)
+    monkeypatch.setattr(lote_abas, 'ProspectoProcessor', mock.MagicMock)
+    monkeypatch.setattr(lote_abas, 'ServicoElegibilidade', mock.MagicMock())
+    monkeypatch.setattr(lote_abas, 'prospecto_elegivel', lambda *a: True)
+
+    resultados = lote_abas.processar_lote_abas([("A", 1), ("B", 2), ("C", 3)], abas=1)
+    assert resultados == {'1': 'sucesso', '2': 'sucesso', '3': 'sucesso'}
+    assert len(navegadores) == 2 and all(n.fechado for n in navegadores)
+
+
+def test_aba_nao_recicla_sozinha():
+    navegador = lote_abas.NavegadorCompartilhado.__new__(lote_abas.NavegadorCompartilhado)
+    navegador.reciclar = False
+    navegador.vigia = mock.MagicMock(limite_mb=3000, ultima={'pss_mb': 3500})
+    assert navegador.precisa_reciclar() is True
@@ -0,0 +1,33 @@
+"""Migrações do esquema (migracoes.py)."""
+from unittest import mock
+
+import migracoes
+
+
+def conexao_falsa(trava_livre):
+    conn = mock.MagicMock(dsn=f"dbname=teste_{trava_livre}", autocommit=False)
+    conn.cursor.return_value.fetchone.return_value = (trava_livre,)
+    return conn
+
+
+def test_trava_ocupada_segue_sem_esperar_nem_migrar():
+    conn = conexao_falsa(False)
+    assert migracoes.migrar(conn, migracoes.DJANGO) is False
+    comandos = [c.args[0] for c in conn.cursor.return_value.execute.call_args_list]
+    assert comandos == ["SELECT pg_try_advisory_lock(%s)"]
+    assert conn.autocommit is False
+
+
+def test_indices_da_fila_com_predicado_congelado():
+    sql = " ".join(" ".join(c.split()) for c in next(m for m in migracoes.MIGRACOES if m.versao == 3).comandos)
+    assert "WHERE " + migracoes.PREDICADO_INDICES_FILA in sql
+    # Com a configuração padrão a consulta do agendador usa os índices
+    assert migracoes.FILTRO_PENDENTES == migracoes.PREDICADO_INDICES_FILA
+
+
+def test_migracoes_nao_dependem_de_outros_modulos():
+    # Editar limitador_taxa/aviso_fila/eventos_prospecto não pode mudar uma migração aplicada
+    with open(migracoes.__file__, encoding='utf-8') as f:
+        codigo = f.read()
+    for modulo in ('limitador_taxa', 'aviso_fila', 'eventos_prospecto'):
+        assert f"from {modulo} import" not in codigo and f"import {modulo}" not in codigo
@@ -0,0 +1,36 @@
+"""Classificação dos eventos do monitor de erros do Hubsoft (monitor_hubsoft.py)."""
+from monitor_hubsoft import classificar_evento
+
+
+def evento(texto, tipo='toast', classes=''):
+    return {'tipo': tipo, 'texto': texto, 'classes': classes}
+
+
+def test_frases_de_erro_do_hubsoft():
+    assert classificar_evento(evento("Erro ao salvar o cliente")) == "ERRO_HUBSOFT"
+    assert classificar_evento(evento("Não foi possível concluir a operação")) == "ERRO_HUBSOFT"
+    assert classificar_evento(evento("Falha na comunicação com o servidor")) == "ERRO_HUBSOFT"
+
+
+def test_textos_inofensivos_nao_sao_erro():
+    assert classificar_evento(evento("Importação concluída: 0 erros")) is None
+    assert classificar_evento(evento("Nenhum problema encontrado")) is None
+    assert classificar_evento(evento("Registro salvo com sucesso")) is None
+
+
+def test_classe_de_erro_sem_texto_reconhecivel():
+    assert classificar_evento(evento("Atenção", classes='md-toast md-warn')) == "ERRO_HUBSOFT"
+
+
+def test_validacao_exibida_e_campo_obrigatorio():
+    assert classificar_evento(evento("Este campo é obrigatório", tipo='validacao')) == "CAMPO_OBRIGATORIO"
+    assert classificar_evento(evento("", tipo='validacao')) == "CAMPO_OBRIGATORIO"
+
+
+def test_toast_de_sucesso_com_documento_nao_e_duplicidade():
+    assert classificar_evento(evento("Cliente CPF 123 cadastrado com sucesso")) is None
+    assert classificar_evento(evento("CPF já cadastrado")) == "CPF_DUPLICADO"
+    assert classificar_evento(evento("CPF duplicado")) == "CPF_DUPLICADO"
+    assert classificar_evento(evento("Já existe um cliente com este CPF")) == "CPF_DUPLICADO"
+    # Com classe de erro, o texto de sucesso não salva o evento
+    assert classificar_evento(evento("Cadastrado", classes='md-warn')) == "ERRO_HUBSOFT"
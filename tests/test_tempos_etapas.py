@@ -0,0 +1,26 @@
+"""Timeouts adaptativos por etapa (tempos_etapas.py)."""
+from unittest import mock
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from tempos_etapas import HistoricoTempos, PoliticaTimeout, EsperaCronometrada, MIN_AMOSTRAS
+
+
+def test_timeouts_seguidos_aumentam_o_timeout(tmp_path):
+    historico = HistoricoTempos(str(tmp_path / 'tempos.json'))
+    for _ in range(MIN_AMOSTRAS):
+        historico.registrar('ETAPA5', 0.01)
+    politica = PoliticaTimeout(historico, fator=1.5, piso=0.001, teto=1)
+    monitor = mock.MagicMock()
+    monitor.condicao.side_effect = lambda condicao: condicao
+
+    timeouts = [politica.timeout('ETAPA5')]
+    for _ in range(3):
+        # Hubsoft mais lento que o timeout atual: toda espera estoura
+        espera = EsperaCronometrada(mock.MagicMock(), timeouts[-1], monitor, historico, 'ETAPA5', poll_frequency=0.001)
+        with pytest.raises(TimeoutException):
+            espera.until(lambda driver: False)
+        assert historico.amostras['ETAPA5'][-1] >= round(timeouts[-1], 3)  # registrar arredonda em ms
+        timeouts.append(politica.timeout('ETAPA5'))
+    assert timeouts == sorted(timeouts) and timeouts[-1] > timeouts[0] * 3
@@ -0,0 +1,96 @@
+"""Roteiros do wizard (roteiro_wizard.py) e resposta ao SALVAR (main_refatorado.py)."""
+from unittest import mock
+
+import pytest
+
+import classificador_falhas
+import main_refatorado
+from monitor_hubsoft import ErroHubsoft
+from roteiro_wizard import executar_roteiro, clicar, escolher, CatalogoOpcoes, ErroRoteiro
+
+
+def sessao_falsa(fator_pausas=0.25):
+    sessao = mock.MagicMock(fator_pausas=fator_pausas, catalogo_opcoes=None)
+    sessao.wait.historico = None
+    sessao.driver.execute_async_script.side_effect = lambda script, passos, inicio, *a: {
+        'resultados': [{'nome': p['nome'], 'acao': p['acao'], 'ok': True, 'ms': 5} for p in passos[inicio:]],
+        'proximo': len(passos), 'motivo': None}
+    return sessao
+
+
+def test_so_pausas_de_animacao_encolhem():
+    sessao = sessao_falsa()
+    executar_roteiro(sessao, [escolher("campo", "//md-select", pausa=1, pausa_menu=1),
+                              clicar("salvar", "//button", pausa=2),
+                              clicar("avancar", "//button", pausa=2, tela="//div")], 10)
+    passos, _, timeout_ms = sessao.driver.execute_async_script.call_args[0][1:4]
+    assert (passos[0]['pausa'], passos[0]['pausa_menu']) == (250, 250)
+    # Sem `tela` a pausa é a única espera pela resposta do Hubsoft: vale inteira
+    assert passos[1]['pausa'] == 2000
+    # Com `tela` a troca de tela é esperada na página; sobra a pausa de animação
+    assert passos[2]['pausa'] == 500 and passos[2]['tela'] == "//div"
+    assert timeout_ms == 10000
+
+
+def test_tela_que_nao_trocou_interrompe_o_roteiro():
+    sessao = sessao_falsa()
+    sessao.driver.execute_async_script.side_effect = None
+    sessao.driver.execute_async_script.return_value = {
+        'resultados': [{'nome': 'avancar', 'acao': 'clicar', 'ok': True, 'ms': 5},
+                       {'nome': 'avancar', 'acao': 'troca_de_tela', 'ok': False, 'ms': 10000}],
+        'proximo': 1, 'motivo': 'troca_de_tela'}
+    with pytest.raises(ErroRoteiro) as erro:
+        executar_roteiro(sessao, [clicar("avancar", "//button", tela="//div"), clicar("proximo", "//button")], 10)
+    assert (erro.value.passo, erro.value.motivo) == ('avancar', 'troca_de_tela')
+    assert sessao.driver.execute_async_script.call_count == 1
+    assert classificador_falhas.classificar(erro.value) == classificador_falhas.TRANSITORIO
+
+
+def test_toast_de_erro_tardio_no_salvar_impede_concluido():
+    sessao = mock.MagicMock()
+    sessao.monitor.verificar.side_effect = [[], [], ErroHubsoft("CPF_DUPLICADO", "CPF já cadastrado", "toast")]
+    with mock.patch.object(main_refatorado.time, 'sleep'):
+        with pytest.raises(ErroHubsoft):
+            main_refatorado.aguardar_resposta_salvar(sessao)
+
+
+def test_toast_de_sucesso_encerra_espera_do_salvar():
+    sessao = mock.MagicMock()
+    sessao.monitor.verificar.side_effect = [[], [{'tipo': 'toast', 'texto': 'Cliente cadastrado com sucesso'}]]
+    with mock.patch.object(main_refatorado.time, 'sleep'):
+        assert main_refatorado.aguardar_resposta_salvar(sessao) is True
+    assert sessao.monitor.verificar.call_count == 2
+
+
+def test_rotulo_aprendido_vale_para_a_proxima_sessao(tmp_path):
+    arquivo = str(tmp_path / 'catalogo.json')
+    catalogo = CatalogoOpcoes(rotulos={}, arquivo=arquivo)
+    catalogo.atualizar([{'campo': 'segundo_select', 'rotulo': 'Dia 25', 'via': 'menu', 'modelo': '25',
+                         'opcoes': [{'rotulo': 'Dia 10'}, {'rotulo': 'Dia 25'}]}])
+    catalogo.salvar()
+
+    # Nova sessão (ex.: modo de um prospecto só): escolhe pelo rótulo desde a primeira tela
+    passo = CatalogoOpcoes(rotulos={}, arquivo=arquivo).preparar(escolher("segundo_select", "//md-select", posicao=2))
+    assert passo['rotulo'] == 'Dia 25'
+    # A referência do ng-model só vale na sessão que a validou pelos cliques
+    assert passo['referencia'] is None
+    # e sem ela o md-select é escolhido pelo menu, não gravado direto no modelo
+    assert passo['modelo'] is False
+
+
+def test_atalho_pelo_modelo_so_com_referencia_da_sessao():
+    catalogo = CatalogoOpcoes(rotulos={'segundo_select': 'Dia 25'}, modelo=True, arquivo=None)
+    assert catalogo.preparar(escolher("segundo_select", "//md-select"))['modelo'] is False
+
+    catalogo.atualizar([{'campo': 'segundo_select', 'rotulo': 'Dia 25', 'via': 'menu', 'modelo': '25',
+                         'opcoes': [{'rotulo': 'Dia 10'}, {'rotulo': 'Dia 25'}]}])
+    passo = catalogo.preparar(escolher("segundo_select", "//md-select"))
+    assert (passo['modelo'], passo['referencia']) == (True, '25')
+
+
+def test_toast_de_sucesso_com_cpf_conclui_o_salvar():
+    sessao = mock.MagicMock()
+    sessao.monitor = main_refatorado.MonitorHubsoft(mock.MagicMock())
+    sessao.monitor.driver.execute_script.return_value = {
+        'eventos': [{'tipo': 'toast', 'texto': 'Cliente CPF 123 cadastrado com sucesso'}], 'caminho': '/prospectos'}
+    assert main_refatorado.aguardar_resposta_salvar(sessao) is True